@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Throughput of the ContentMetrics engines over a batch of handles.
+
+Generates --handles synthetic corpora of --tweets-per-handle tweets (posts,
+replies, quotes and retweets with URLs, tags, emoji and long-form threads)
+and counts them three ways:
+
+  scalar   count_styles per handle, the per-tweet token scan
+  batch    batch_counts over all handles in this process (NumPy)
+  pooled   batch_content_metrics over --processes worker processes
+
+All three must give the same metrics. Fails if the batch engine counts
+fewer than --min-rate tweets per minute on one core.
+
+Usage:
+    python benchmarks/batch_metrics.py [--handles 50] [--tweets-per-handle 4000]
+        [--processes 4] [--repeat 3] [--min-rate 5000000]
+"""
+
+import argparse
+import random
+import time
+
+from rooki_ai.models.tweet import Tweet
+from rooki_ai.utils.batch_metrics import batch_content_metrics, batch_counts
+from rooki_ai.utils.style_metrics import count_styles
+
+SENTENCES = [
+    "Shipping the new onboarding flow today.",
+    "Took three rewrites and a lot of coffee, but activation is up 18% in the beta cohort!",
+    "Don\u2019t ship on Fridays.",
+    "Join us at 5pm for the live demo \U0001F680",
+    "Stop guessing and measure it",
+    "What would you build with 10,000 free credits?",
+    "Huge thanks to @rooki_ai for the e-mail tips \U0001F64F\U0001F3FD",
+    "Read the full write-up https://rooki.ai/blog/onboarding-v2.",
+    "v3.5 is live\u2026 finally",
+    "Our team \U0001F468\u200d\U0001F469\u200d\U0001F467 made it to the finals \U0001F1FA\U0001F1F8",
+    "Check the docs at www.rooki.ai/docs",
+    "Love this \u2764\ufe0f",
+    "#buildinpublic #indiehackers",
+    "$BTC is doing $BTC things again.",
+]
+TYPES = ("post", "post", "reply", "reply", "quote", "retweet")
+
+
+def make_corpora(handles: int, per_handle: int, seed: int = 7):
+    rng = random.Random(seed)
+    corpora = {}
+    for h in range(handles):
+        tweets = []
+        for i in range(per_handle):
+            # Mostly short tweets, with a long-form thread now and then
+            count = rng.randint(8, 14) if i % 15 == 0 else rng.randint(1, 4)
+            text = rng.choice((" ", "\n")).join(rng.choice(SENTENCES) for _ in range(count))
+            tweets.append(Tweet(str(h * per_handle + i), text, rng.choice(TYPES), ""))
+        corpora[f"handle_{h}"] = tweets
+    return corpora
+
+
+def best_of(repeat: int, fn):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def metrics_of(counts):
+    return {
+        key: {field: style.metrics() for field, style in styles.items()}
+        for key, styles in counts.items()
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--handles", type=int, default=50)
+    parser.add_argument("--tweets-per-handle", type=int, default=4000)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-rate", type=float, default=5_000_000)
+    args = parser.parse_args()
+
+    corpora = make_corpora(args.handles, args.tweets_per_handle)
+    total = args.handles * args.tweets_per_handle
+
+    engines = {
+        "scalar": lambda: metrics_of({key: count_styles(tweets) for key, tweets in corpora.items()}),
+        "batch": lambda: metrics_of(batch_counts(corpora)),
+        "pooled": lambda: batch_content_metrics(corpora, processes=args.processes),
+    }
+    results = {name: best_of(args.repeat, fn) for name, fn in engines.items()}
+
+    print(f"{args.handles} handles, {total} tweets")
+    for name, (seconds, _) in results.items():
+        label = f"{name} ({args.processes} processes)" if name == "pooled" else name
+        print(f"  {label:<22} {seconds:7.3f} s {total / seconds * 60 / 1e6:8.2f}M tweets/min")
+
+    expected = results["scalar"][1]
+    for name in ("batch", "pooled"):
+        if results[name][1] != expected:
+            print(f"FAIL: {name} metrics differ from the scalar engine")
+            return 1
+
+    rate = total / results["batch"][0] * 60
+    if rate < args.min_rate:
+        print(f"FAIL: batch engine counted {rate:,.0f} tweets/min, want >= {args.min_rate:,.0f}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
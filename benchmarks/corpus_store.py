@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+"""
+Repeat-read benchmark for the local tweet corpus store.
+
+Serves a synthetic JSONL corpus of --size-mb from a local HTTP server (with
+an ETag) and times:
+
+  fetch     download and parse the JSON every time (the old tool behaviour)
+  cold      first CorpusStore.open_sync: download, hash and build the file
+  records   warm open_sync plus rebuilding every record, what the tool returns
+  columns   warm open_sync plus reading every text and summing likes
+
+Fails if a warm columnar read is not at least --min-speedup times faster
+than fetching the corpus again.
+
+Usage:
+    python benchmarks/corpus_store.py [--size-mb 50] [--repeat 5] [--min-speedup 10]
+"""
+
+import argparse
+import http.server
+import json
+import tempfile
+import threading
+import time
+
+from rooki_ai.utils.corpus_store import CorpusStore
+from rooki_ai.utils.json_stream import iter_url_records
+
+TWEET_TEXT = (
+    "Shipping the new onboarding flow today. Took three rewrites and a lot of "
+    "coffee, but activation is up 18% in the beta cohort #buildinpublic"
+)
+
+
+def make_corpus(size_mb: int) -> bytes:
+    lines, size, i = [], 0, 0
+    while size < size_mb * 1024 * 1024:
+        line = json.dumps(
+            {
+                "id": str(10**18 + i),
+                "text": TWEET_TEXT,
+                "created_at": "2024-05-01T12:00:00Z",
+                "public_metrics": {
+                    "like_count": i % 977,
+                    "retweet_count": i % 89,
+                    "reply_count": i % 31,
+                },
+                "type": "post",
+            }
+        )
+        lines.append(line)
+        size += len(line) + 1
+        i += 1
+    return "\n".join(lines).encode()
+
+
+def serve(body: bytes) -> http.server.ThreadingHTTPServer:
+    etag = '"corpus"'
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-speedup", type=float, default=10)
+    args = parser.parse_args()
+
+    body = make_corpus(args.size_mb)
+    server = serve(body)
+    url = f"http://127.0.0.1:{server.server_port}/corpus.jsonl"
+
+    def fetch():
+        return sum(1 for _ in iter_url_records(url))
+
+    def records():
+        with store.open_sync(url) as corpus:
+            return sum(1 for _ in corpus.records())
+
+    def columns():
+        with store.open_sync(url) as corpus:
+            chars = sum(len(text) for text in corpus.texts())
+            return chars + sum(corpus.column("likes"))
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            store = CorpusStore(directory=directory)
+            started = time.perf_counter()
+            store.open_sync(url).close()
+            results = {"cold": time.perf_counter() - started}
+            results["fetch"] = best_of(args.repeat, fetch)
+            results["records"] = best_of(args.repeat, records)
+            results["columns"] = best_of(args.repeat, columns)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    size_mb = len(body) / (1024 * 1024)
+    print(f"corpus: {size_mb:.0f} MB jsonl, store: {store.stats()}")
+    for name in ("fetch", "cold", "records", "columns"):
+        seconds = results[name]
+        print(
+            f"  {name:<8} {seconds:7.3f} s {size_mb / seconds:8.1f} MB/s "
+            f"{results['fetch'] / seconds:6.1f}x"
+        )
+
+    speedup = results["fetch"] / results["columns"]
+    if speedup < args.min_speedup:
+        print(f"FAIL: warm columnar read is {speedup:.1f}x faster than a fetch, want {args.min_speedup:g}x")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+Import-time budget for the API entry point.
+
+Runs `python -X importtime -c "import rooki_ai.fast"` in a fresh interpreter,
+fails if the cumulative import time exceeds the budget, and fails if any of
+the heavy crew/LLM/database packages were imported eagerly. Those must only
+load on first use (or in the WARMUP_ON_STARTUP background import).
+tests/test_import_time.py enforces the same budget under `pytest -m slow`.
+
+Usage:
+    python benchmarks/import_time.py [--module rooki_ai.fast] [--budget-ms 1500]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+# Packages that must not be imported just to serve /healthz
+DEFERRED_PACKAGES = (
+    "crewai",
+    "litellm",
+    "dedalus_labs",
+    "asyncpg",
+    "psycopg2",
+    "jsonschema",
+)
+
+
+def measure(module: str):
+    """
+    Import `module` in a subprocess and parse the -X importtime report.
+
+    Returns:
+        tuple: (total cumulative microseconds, {top-level package: cumulative us})
+    """
+    # Find rooki_ai in this checkout's src/ without needing an install
+    src = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    pythonpath = os.pathsep.join(filter(None, (src, os.environ.get("PYTHONPATH"))))
+    env = {**os.environ, "PYTHONPATH": pythonpath, "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{proc.stderr}")
+
+    total = 0
+    packages = {}
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        cumulative = int(cumulative)
+        stripped = name.strip()
+        # Top-level entries (no leading indentation) add up to the total
+        if name[1:2] != " ":
+            total += cumulative
+        top = stripped.split(".")[0]
+        packages[top] = max(packages.get(top, 0), cumulative)
+    return total, packages
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="rooki_ai.fast")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(os.environ.get("IMPORT_TIME_BUDGET_MS", "1500")),
+    )
+    args = parser.parse_args()
+
+    total_us, packages = measure(args.module)
+    total_ms = total_us / 1000
+    print(f"import {args.module}: {total_ms:.0f} ms (budget {args.budget_ms:g} ms)")
+
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:10]
+    for name, cumulative in slowest:
+        print(f"  {name:<24} {cumulative / 1000:8.1f} ms")
+
+    failures = []
+    eager = [name for name in DEFERRED_PACKAGES if name in packages]
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+    if total_ms > args.budget_ms:
+        failures.append(f"{total_ms:.0f} ms is over the {args.budget_ms:g} ms budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
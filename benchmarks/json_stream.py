@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""
+Peak-memory check for the streaming tweet corpus parser.
+
+Writes a synthetic corpus of --size-mb (JSON array or JSONL) and parses it
+in fresh interpreters two ways: the old whole-body approach (bytes, decoded
+text, split lines, list of dicts) and rooki_ai.utils.json_stream, which only
+counts the records it yields. Fails if the streaming parse peaks above
+--max-peak-mb of resident memory. tests/test_json_stream.py runs the same
+check on a 200 MB corpus under `pytest -m slow`.
+
+Usage:
+    python benchmarks/json_stream.py [--size-mb 300] [--format jsonl] [--max-peak-mb 96]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+TWEET_TEXT = (
+    "Shipping the new onboarding flow today. Took three rewrites and a lot of "
+    "coffee, but activation is up 18% in the beta cohort #buildinpublic"
+)
+
+
+def write_fixture(path: str, size_mb: int, fmt: str):
+    """Write synthetic tweets until the file reaches `size_mb`."""
+    target = size_mb * 1024 * 1024
+    written, i = 0, 0
+    with open(path, "w") as f:
+        if fmt == "json":
+            f.write("[")
+        while written < target:
+            record = json.dumps(
+                {
+                    "id": str(10**18 + i),
+                    "text": TWEET_TEXT,
+                    "created_at": "2024-05-01T12:00:00Z",
+                    "public_metrics": {
+                        "like_count": i % 977,
+                        "retweet_count": i % 89,
+                        "reply_count": i % 31,
+                    },
+                    "type": "post",
+                }
+            )
+            if fmt == "json":
+                record = ("," if i else "") + record
+            else:
+                record += "\n"
+            f.write(record)
+            written += len(record)
+            i += 1
+        if fmt == "json":
+            f.write("]")
+
+
+def parse(path: str, mode: str) -> int:
+    """Parse the fixture in this process and return the record count."""
+    if mode == "stream":
+        from rooki_ai.utils.json_stream import iter_file_records
+
+        return sum(1 for _ in iter_file_records(path))
+
+    # What TweetHistoryStorageTool used to do with the response body
+    with open(path, "rb") as f:
+        content = f.read()
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        lines = content.decode().strip().split("\n")
+        data = [json.loads(line) for line in lines if line.strip()]
+    return len(data)
+
+
+def measure(path: str, mode: str):
+    """Run `parse` in a fresh interpreter; return (records, seconds, peak RSS in MB)."""
+    proc = subprocess.run(
+        [sys.executable, __file__, "--child", mode, path],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"{mode} parse failed:\n{proc.stderr}")
+    records, seconds, peak_mb = proc.stdout.split()
+    return int(records), float(seconds), float(peak_mb)
+
+
+def child(mode: str, path: str) -> int:
+    started = time.perf_counter()
+    records = parse(path, mode)
+    elapsed = time.perf_counter() - started
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    print(records, elapsed, peak_mb)
+    return 0
+
+
+def main() -> int:
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        return child(sys.argv[2], sys.argv[3])
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=300)
+    parser.add_argument("--format", choices=("json", "jsonl"), default="jsonl")
+    parser.add_argument("--max-peak-mb", type=float, default=96)
+    parser.add_argument(
+        "--skip-baseline", action="store_true", help="Only run the streaming parse"
+    )
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=f".{args.format}")
+    os.close(fd)
+    try:
+        write_fixture(path, args.size_mb, args.format)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"fixture: {size_mb:.0f} MB {args.format}")
+
+        modes = ("stream",) if args.skip_baseline else ("stream", "load")
+        results = {mode: measure(path, mode) for mode in modes}
+    finally:
+        os.unlink(path)
+
+    for mode, (records, seconds, peak_mb) in results.items():
+        print(
+            f"  {mode:<7} {records:>9} records {seconds:7.2f} s "
+            f"{size_mb / seconds:7.1f} MB/s  peak {peak_mb:7.1f} MB"
+        )
+
+    records, _, peak_mb = results["stream"]
+    failures = []
+    if "load" in results and results["load"][0] != records:
+        failures.append(f"stream parsed {records} records, load {results['load'][0]}")
+    if peak_mb > args.max_peak_mb:
+        failures.append(f"stream peak {peak_mb:.0f} MB is over {args.max_peak_mb:g} MB")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
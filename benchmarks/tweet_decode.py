@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+Decode time and memory per tweet: raw dicts vs Tweet records.
+
+Generates --count scraper-style tweets (user object, entities, media and the
+other keys storage exports carry) as JSONL and decodes them three ways:
+
+  dict     json.loads per line, the List[Dict[str, Any]] the tools returned
+  tweet    json.loads then Tweet.from_dict, keeping only the Tweet
+  columns  Corpus.tweets() from a corpus store file, no JSON at all
+
+Memory is what the decoded list holds (tracemalloc), time the best of
+--repeat runs. Fails if a Tweet list needs more than --max-memory-ratio of
+the memory of the dict list.
+
+Usage:
+    python benchmarks/tweet_decode.py [--count 200000] [--repeat 3] [--max-memory-ratio 0.5]
+"""
+
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from rooki_ai.models.tweet import decode_tweets
+from rooki_ai.utils.corpus_store import Corpus, CorpusBuilder
+
+TWEET_TEXT = (
+    "Shipping the new onboarding flow today. Took three rewrites and a lot of "
+    "coffee, but activation is up 18% in the beta cohort #buildinpublic"
+)
+
+
+def make_lines(count: int):
+    lines = []
+    for i in range(count):
+        lines.append(
+            json.dumps(
+                {
+                    "id": str(10**18 + i),
+                    "text": TWEET_TEXT,
+                    "type": ("post", "reply", "quote")[i % 3],
+                    "created_at": "2024-05-01T12:00:00Z",
+                    "lang": "en",
+                    "source": "Twitter Web App",
+                    "conversation_id": str(10**18 + i - i % 7),
+                    "possibly_sensitive": False,
+                    "public_metrics": {
+                        "like_count": i % 977,
+                        "retweet_count": i % 89,
+                        "reply_count": i % 31,
+                        "quote_count": i % 7,
+                        "impression_count": i % 50021,
+                    },
+                    "entities": {
+                        "hashtags": [{"start": 132, "end": 146, "tag": "buildinpublic"}],
+                        "urls": [],
+                    },
+                    "author": {
+                        "id": "1497769093964783617",
+                        "username": "rooki",
+                        "name": "Rooki",
+                        "verified": False,
+                        "followers_count": 1234,
+                    },
+                    "media": [],
+                }
+            )
+        )
+    return lines
+
+
+def decode_dicts(lines):
+    return [json.loads(line) for line in lines]
+
+
+def decode_records(lines):
+    return list(decode_tweets(map(json.loads, lines)))
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def retained_bytes(fn) -> int:
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return retained
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-memory-ratio", type=float, default=0.5)
+    args = parser.parse_args()
+
+    lines = make_lines(args.count)
+    builder = CorpusBuilder()
+    builder.extend(map(json.loads, lines))
+    fd, path = tempfile.mkstemp(suffix=".corpus")
+    os.close(fd)
+    try:
+        builder.write(path)
+        del builder
+        with Corpus(path) as corpus:
+            paths = {
+                "dict": lambda: decode_dicts(lines),
+                "tweet": lambda: decode_records(lines),
+                "columns": lambda: list(corpus.tweets()),
+            }
+            results = {
+                name: (best_of(args.repeat, fn), retained_bytes(fn)) for name, fn in paths.items()
+            }
+    finally:
+        os.unlink(path)
+
+    print(f"{args.count} tweets, {sum(map(len, lines)) / args.count:.0f} bytes of JSON each")
+    for name, (seconds, retained) in results.items():
+        print(
+            f"  {name:<8} {seconds:7.3f} s {args.count / seconds / 1000:8.0f}k tweets/s "
+            f"{retained / args.count:7.0f} B/tweet"
+        )
+
+    ratio = results["tweet"][1] / results["dict"][1]
+    if ratio > args.max_memory_ratio:
+        print(f"FAIL: Tweet records use {ratio:.2f} of the dict memory, want <= {args.max_memory_ratio:g}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,27 @@
+-- Unique index behind `@unique` on Voice.x_handle (knowledge/schema.txt).
+-- The Voice table is owned by the Prisma app: copy this directory into its
+-- prisma/migrations/ and apply it with `prisma migrate deploy` before
+-- deploying a rooki-ai build that upserts Voice rows.
+
+-- Keep the most recently updated row per handle; point categories of the
+-- duplicates at it so the cascade below does not drop them
+WITH ranked AS (
+    SELECT id, x_handle,
+           first_value(id) OVER (
+               PARTITION BY x_handle ORDER BY "updatedAt" DESC, "createdAt" DESC, id
+           ) AS keep_id
+    FROM "Voice"
+    WHERE x_handle IS NOT NULL
+)
+UPDATE "SuggestedCategory" AS c
+SET "voiceId" = ranked.keep_id
+FROM ranked
+WHERE c."voiceId" = ranked.id AND ranked.id <> ranked.keep_id;
+
+DELETE FROM "Voice" AS v
+USING "Voice" AS newer
+WHERE v.x_handle = newer.x_handle
+  AND (newer."updatedAt", newer."createdAt", v.id) > (v."updatedAt", v."createdAt", newer.id);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "Voice_x_handle_key" ON "Voice"("x_handle");
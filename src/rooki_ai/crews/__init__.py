@@ -1,5 +1,29 @@
-from .category.category import CategoryDraftCrew
-from .route.route import RouteCrew
-from .voice_profile.voice_profile import VoiceProfileCrew
+import importlib
+from typing import TYPE_CHECKING
 
-__all__ = ["VoiceProfileCrew", "RouteCrew", "CategoryDraftCrew"]
+if TYPE_CHECKING:
+    from .category.category import CategoryDraftCrew
+    from .factory import CrewFactory, get_crew
+    from .route.route import RouteCrew
+    from .voice_profile.voice_profile import VoiceProfileCrew
+
+# Crews import crewai and their tools; defer that until a crew is first used
+_LAZY_IMPORTS = {
+    "CategoryDraftCrew": ".category.category",
+    "CrewFactory": ".factory",
+    "get_crew": ".factory",
+    "RouteCrew": ".route.route",
+    "VoiceProfileCrew": ".voice_profile.voice_profile",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = ["VoiceProfileCrew", "RouteCrew", "CategoryDraftCrew", "CrewFactory", "get_crew"]
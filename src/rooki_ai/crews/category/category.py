@@ -1,3 +1,4 @@
+import asyncio
 import os
 from typing import List
 
@@ -6,6 +7,7 @@ from crewai.agents.agent_builder.base_agent import BaseAgent
 from crewai.project import CrewBase, agent, before_kickoff, crew, task
 
 from rooki_ai.tools import GetTrendingTweetsTool, SupabaseGetVoiceTool, TweetMCPTool
+from rooki_ai.utils.trending import TRENDING_TWEETS_URL, get_trending_feed
 
 
 def _get_env_var(var_name, default=None):
@@ -27,34 +29,68 @@ class CategoryDraftCrew:
 
     agents: List[BaseAgent]
     tasks: List[Task]
-    _inputs: dict = {}
-
-    def __init__(self, inputs):
-        self._inputs = inputs
+    _tools: dict = None
+
+    @staticmethod
+    async def prefetch_context(user_id: str) -> dict:
+        """
+        Load the voice profile and trending tweets concurrently on the event
+        loop, through the tools' async implementations.
+
+        Pass the result along with the kickoff inputs so `setup_ctx` doesn't
+        fetch them again from the crew's worker thread.
+        """
+
+        async def voice_profile():
+            try:
+                return await SupabaseGetVoiceTool()._arun(user_id)
+            except Exception:
+                return None
+
+        async def trending_tweets():
+            snapshot = get_trending_feed().snapshot()
+            if snapshot is not None:
+                return list(snapshot.tweets)
+            try:
+                return await GetTrendingTweetsTool()._arun(TRENDING_TWEETS_URL) or []
+            except Exception as e:
+                print(f"Error fetching trending tweets: {str(e)}")
+                return []
+
+        profile, tweets = await asyncio.gather(voice_profile(), trending_tweets())
+        return {"voice_profile": profile, "trending_tweets": tweets}
 
     @before_kickoff
     def setup_ctx(self, inputs):
-        user_message = self._inputs.get("user_message", "")
-        user_id = self._inputs.get("user_id", "")
-
-        # fetch once
-        try:
-            voice_profile = SupabaseGetVoiceTool(user_id=user_id).run() or None
-        except Exception:
-            voice_profile = None
-
-        try:
-            print("Fetching trending tweets...")
-            trending_tweets = (
-                GetTrendingTweetsTool().run(
-                    url="https://raw.githubusercontent.com/RookiAi/rooki-app/refs/heads/main/public/tweets/Ycombinator.json"
-                )
-                or []
-            )
-            print("After fetching trending tweets...")
-        except Exception as e:
-            print(f"Error fetching trending tweets: {str(e)}")
-            trending_tweets = []
+        # Per-run values come from the kickoff inputs so one built crew can be
+        # copied for every request (see rooki_ai.crews.factory)
+        user_message = inputs.get("user_message", "")
+        user_id = inputs.get("user_id", "")
+
+        # fetch once, unless prefetch_context already did
+        if "voice_profile" in inputs:
+            voice_profile = inputs["voice_profile"]
+        else:
+            try:
+                voice_profile = SupabaseGetVoiceTool(user_id=user_id).run() or None
+            except Exception:
+                voice_profile = None
+
+        snapshot = get_trending_feed().snapshot()
+        if "trending_tweets" in inputs:
+            trending_tweets = inputs.pop("trending_tweets")
+        elif snapshot is not None:
+            # Ranked by engagement in the background; no network on this path
+            print(f"Using trending snapshot ({snapshot.age_seconds:.0f}s old)")
+            trending_tweets = list(snapshot.tweets)
+        else:
+            try:
+                print("Fetching trending tweets...")
+                trending_tweets = GetTrendingTweetsTool().run(url=TRENDING_TWEETS_URL) or []
+                print("After fetching trending tweets...")
+            except Exception as e:
+                print(f"Error fetching trending tweets: {str(e)}")
+                trending_tweets = []
 
         brand_constraints = {
             "mention_rooki": True,
@@ -65,7 +101,8 @@ class CategoryDraftCrew:
 
         inputs["user_id"] = user_id
         inputs["user_message"] = user_message
-        inputs["voice_profile"] = voice_profile
+        # The Voice row holds datetimes, which crewai won't interpolate
+        inputs["voice_profile"] = repr(voice_profile)
         inputs["trending_topics"] = trending_tweets[:5]
         inputs["brand_constraints"] = brand_constraints
         inputs["mcp_server"] = "hinsonsidan/tweet-mcp"
@@ -73,14 +110,16 @@ class CategoryDraftCrew:
         return inputs
 
     def _initialize_tools(self):
-        tweet_mcp_tool = TweetMCPTool()
-        return {
-            "tweet_context_agent": [
-                tweet_mcp_tool,
-            ],
-            "tweet_draft_agent": [],
-            "tweet_refine_agent": [],
-        }
+        if self._tools is None:
+            tweet_mcp_tool = TweetMCPTool()
+            self._tools = {
+                "tweet_context_agent": [
+                    tweet_mcp_tool,
+                ],
+                "tweet_draft_agent": [],
+                "tweet_refine_agent": [],
+            }
+        return self._tools
 
     @agent
     def tweet_context_agent(self) -> Agent:
@@ -108,40 +147,21 @@ class CategoryDraftCrew:
 
     @task
     def get_tweet_context(self) -> Task:
-        user_id = self._inputs.get("user_id", "")
-        user_message = self._inputs.get("user_message", "")
-        voice_profile = self._inputs.get("voice_profile")
-        trending_topics = self._inputs.get("trending_topics", [])
-        brand_constraints = self._inputs.get("brand_constraints", {})
-
-        # Format the context values as strings to include in the task description
-        user_id_str = repr(user_id)
-        user_message_str = repr(user_message)
-        voice_profile_str = repr(voice_profile)
-        trending_topics_str = repr(trending_topics[:5] if trending_topics else [])
-        brand_constraints_str = repr(brand_constraints)
-
-        # Generate example MCP tweet content outside the task
-        try:
-            example_tweet = "Example tweet for startup founders and entrepreneurs."
-            # Don't make direct calls that might trigger event loop issues
-        except Exception as e:
-            print(f"Failed to generate example tweet: {e}")
-            example_tweet = "Example tweet content unavailable."
-
+        # The {placeholders} are filled from the inputs prepared by setup_ctx
+        # when the crew is kicked off
         return Task(
             config=self.tasks_config["get_tweet_context"],  # YAML has expected_output
             description=(
-                f"""
+                """
             CONTEXT EXTRACTION TASK
             
             Build a TweetContext@v1 JSON using these specific values:
-            - user_id: {user_id_str}
-            - user_message: {user_message_str}
-            - voice_profile: {voice_profile_str}
-            - trending_topics: {trending_topics_str}
-            - example_tweet: "{example_tweet}"
-            - brand_constraints: {brand_constraints_str}
+            - user_id: '{user_id}'
+            - user_message: '{user_message}'
+            - voice_profile: {voice_profile}
+            - trending_topics: {trending_topics}
+            - example_tweet: "Example tweet for startup founders and entrepreneurs."
+            - brand_constraints: {brand_constraints}
             
             Rules:
             1. Include all the above fields exactly as provided
@@ -152,7 +172,7 @@ class CategoryDraftCrew:
             ```
             Thought: I need to generate tweet examples to understand patterns
             Action: TweetMCPTool
-            Action Input: {{"input_prompt": "Generate a tweet about {user_message_str}"}}
+            Action Input: {"input_prompt": "Generate a tweet about '{user_message}'"}
             ```
             
             Use the MCP tool results to help craft a relevant insights_summary.
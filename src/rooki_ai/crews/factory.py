@@ -0,0 +1,56 @@
+import threading
+from typing import Dict, Type
+
+from crewai import Crew
+
+
+class CrewFactory:
+    """Builds each crew once per process and hands out per-run copies.
+
+    Instantiating a @CrewBase class re-reads its agents.yaml/tasks.yaml and
+    `.crew()` rebuilds every Agent, Task and tool. The factory does that once
+    per crew class and keeps the result as a template that is never kicked
+    off. `get` returns `template.copy()`: fresh Agent and Task objects (so
+    per-run state such as interpolated descriptions, outputs and callbacks
+    stays isolated) that share the template's LLMs and tool instances.
+
+    Crews used through the factory must take their per-run values from the
+    kickoff inputs (`{placeholder}` interpolation or `@before_kickoff`), not
+    from constructor arguments, and their tools must be safe to share.
+    """
+
+    def __init__(self):
+        self._templates: Dict[type, Crew] = {}
+        self._lock = threading.Lock()
+
+    def get(self, crew_class: Type) -> Crew:
+        """Return a fresh copy of `crew_class`'s crew, ready for `kickoff`."""
+        template = self._template(crew_class)
+        crew = template.copy()
+        # Lists of callables aren't guaranteed to survive Crew.copy's model_dump
+        crew.before_kickoff_callbacks = list(template.before_kickoff_callbacks)
+        crew.after_kickoff_callbacks = list(template.after_kickoff_callbacks)
+        return crew
+
+    def clear(self):
+        """Drop cached templates, e.g. after editing a crew's YAML config."""
+        with self._lock:
+            self._templates.clear()
+
+    def _template(self, crew_class: Type) -> Crew:
+        template = self._templates.get(crew_class)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(crew_class)
+                if template is None:
+                    template = crew_class().crew()
+                    self._templates[crew_class] = template
+        return template
+
+
+_factory = CrewFactory()
+
+
+def get_crew(crew_class: Type) -> Crew:
+    """Return a per-run copy of `crew_class`'s crew from the process-wide factory."""
+    return _factory.get(crew_class)
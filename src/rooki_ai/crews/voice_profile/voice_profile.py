@@ -1,17 +1,29 @@
 from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
+from crewai.project import CrewBase, agent, before_kickoff, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
+from functools import lru_cache
 from typing import List
 import os
 
-from rooki_ai.tools import TweetHistoryStorageTool, SupabaseUserTweetsStorageUrlTool, JSONSchemaValidatorTool
+from rooki_ai.tools import TweetHistoryStorageTool, SupabaseUserTweetsStorageUrlTool, JSONSchemaValidatorTool, StyleMetricsTool, TextNormalizeTool
 from rooki_ai.models import VoiceProfileResponse, VoiceTone
+from rooki_ai.utils.style_metrics import format_metrics, handle_metrics
 
 def _get_env_var(var_name, default=None):
     """Get environment variable or return default."""
     env = os.environ.get(var_name, default)
     return env
 
+@lru_cache(maxsize=None)
+def _voice_tone_schema():
+    """VoiceTone JSON schema, generated once per process."""
+    return VoiceTone.model_json_schema()
+
+@lru_cache(maxsize=None)
+def _voice_profile_response_schema():
+    """VoiceProfileResponse JSON schema, generated once per process."""
+    return VoiceProfileResponse.model_json_schema()
+
 @CrewBase
 class VoiceProfileCrew():
     """Voice Guide Generator Crew
@@ -25,9 +37,23 @@ class VoiceProfileCrew():
 
     agents: List[BaseAgent]
     tasks: List[Task]
+    _tools: dict = None
+
+    @before_kickoff
+    def setup_metrics(self, inputs):
+        # ContentMetrics are counted in code, not by an agent; run_voice_profile
+        # passes them in, other entry points (train, test) compute them here
+        if "content_metrics" not in inputs:
+            inputs["content_metrics"] = format_metrics(handle_metrics(inputs["x_handle"]))
+        return inputs
 
     def _initialize_tools(self):
-        """Initialize tools for agents."""
+        """Initialize tools for agents, once per crew instance."""
+        if self._tools is None:
+            self._tools = self._build_tools()
+        return self._tools
+
+    def _build_tools(self):
         # supabase_url = "https://sextklfkiyceqnptxejr.supabase.co/storage/v1/object/public/tweets/1497769093964783617/tweets_1497769093964783617_2025-08-22T17-53-32-251Z.json"
         # # supabase_url = _get_env_var('SUPABASE_URL')
         # supabase_key = _get_env_var('SUPABASE_KEY')
@@ -37,25 +63,25 @@ class VoiceProfileCrew():
         supabase_tool = SupabaseUserTweetsStorageUrlTool() 
         tweet_history_tool = TweetHistoryStorageTool()
         # jsonl_reader_tool = JSONLReaderTool()
-        # text_normalize_tool = TextNormalizeTool()
+        text_normalize_tool = TextNormalizeTool()
         
-        # # Tools for metrics_agent
-        # style_metrics_tool = StyleMetricsTool()
+        # Tools for metrics_agent
+        style_metrics_tool = StyleMetricsTool()
         # influencer_metrics_tool = InfluencerMetricsTool()
         
         # Tools for synth_agent
         # template_library_tool = TemplateLibraryTool()
         voice_json_schema_validator_tool = JSONSchemaValidatorTool(
-            schema=VoiceTone.model_json_schema()
+            schema=_voice_tone_schema()
         )
 
         response_json_schema_validator_tool = JSONSchemaValidatorTool(
-            schema=VoiceProfileResponse.model_json_schema()
+            schema=_voice_profile_response_schema()
         )
         
         return {
-            'corpus_agent': [supabase_tool, tweet_history_tool],
-            'metrics_agent': [voice_json_schema_validator_tool],
+            'corpus_agent': [supabase_tool, tweet_history_tool, text_normalize_tool],
+            'metrics_agent': [style_metrics_tool, voice_json_schema_validator_tool],
             'synth_agent': [response_json_schema_validator_tool]
             # 'corpus_agent': [supabase_tool, jsonl_reader_tool, text_normalize_tool],
             # 'metrics_agent': [style_metrics_tool, influencer_metrics_tool],
@@ -115,50 +141,9 @@ class VoiceProfileCrew():
                - quotes: Array of quote tweet objects
                
             Your response should be the complete tweet_data object, preserving all original data.
-            """
-        )
-
-    @task
-    def load_corpus_task(self) -> Task:
-        """Task for loading and normalizing the Twitter corpus."""
-        return Task(
-            config=self.tasks_config['load_corpus_task'],
-            expected_output="CorpusOut",
-            description="""
-            You are analyzing the Twitter profile for user {x_handle}.
-            
-            First, use the SupabaseUserTweetsStorageUrlTool to fetch the storage URL for this Twitter handle:
-            storage_url = SupabaseUserTweetsStorageUrlTool(x_handle="{x_handle}")
-            
-            Then, use the TweetHistoryStorageTool to fetch the tweet history data using that URL:
-            tweet_data = TweetHistoryStorageTool(storage_url=storage_url)
-
-            posts = tweet_data["posts"]
-            replies = tweet_data["replies"]
-            quotes = tweet_data["quotes"]
-            
-            Compute style metrics for the entire corpus. Additionally, compute specific ContentMetrics for each content type:
-            
-            IMPORTANT: Before finalizing your response, you MUST validate your output using:
-            validation_result = JSONSchemaValidatorTool(data=your_voice_guide_suggestion)
-
-            1. Analyze posts to compute post_metrics with:
-            - avg_sentence_len: float - Average sentence length (words per sentence)
-            - imperative_pct: float - Percentage of sentences using imperative voice (0.0 to 1.0) 
-            - emoji_rate: float - Rate of emoji usage per word
-            
-            2. Analyze replies to compute reply_metrics with the same fields.
-            3. Analyze quotes to compute quoted_metrics with the same fields.
-            4. Analyze tweets longer than 280 characters to compute long_form_text_metrics with the same fields.
-
-            If any of these content types have no data, set their metrics to 0.
-
-            Your response should include both the StyleProfile and the separate ContentMetrics for each content type.
-            Return as a JSON object with the StyleProfile fields plus these additional fields:
-            - post_metrics: ContentMetrics object
-            - reply_metrics: ContentMetrics object
-            - quoted_metrics: ContentMetrics object  
-            - long_form_text_metrics: ContentMetrics object
+            When you need cleaned text samples (URLs removed, whitespace collapsed, emojis and
+            hashtags kept), get them with TextNormalizeTool(storage_url=storage_url) instead of
+            cleaning the text yourself.
             """
         )
 
@@ -172,6 +157,12 @@ class VoiceProfileCrew():
             You are analyzing the Twitter profile for user {x_handle}.
             
             Use the tweet_data that were computed in the previous task.
+            Sentence length, imperative usage and emoji rate per content type were
+            computed from the full corpus:
+            {content_metrics}
+            Use these figures, or the StyleMetricsTool, rather than estimating them.
+            Calculate hashtag rate and link rate, and determine the overall cadence style.
+            If influencer metrics are provided, blend them into the analysis with appropriate weights.
             """
         )
 
@@ -203,10 +194,11 @@ class VoiceProfileCrew():
             You are analyzing the Twitter profile for user {x_handle}.
             
             Use the tweet_data that were computed in the previous task.
-            Use the style profile and content metrics that were computed in the previous task.
-            The compute_metrics_task result contains a StyleProfile and ContentMetrics for each content type:
+            Use the style profile that was computed in the previous task.
+            The ContentMetrics for each content type were computed from the full corpus:
+            {content_metrics}
             - post_metrics: ContentMetrics for posts
-            - reply_metrics: ContentMetrics for replies  
+            - reply_metrics: ContentMetrics for replies
             - quoted_metrics: ContentMetrics for quotes
             - long_form_text_metrics: ContentMetrics for tweets longer than 280 characters
             
@@ -231,12 +223,12 @@ class VoiceProfileCrew():
             - tone: string - VoiceTone - Use the VoiceTone from the previous task
             - pillars: list of PillarItem - Each with "pillar" (string) and "weighting" (number)
             - guardrails: list of GuardrailItem - Each with "type" ("do" or "dont") and "guardrail" (string)
-            - post_metrics: ContentMetrics - Use the post_metrics from the previous task
-            - reply_metrics: ContentMetrics - Use the reply_metrics from the previous task
-            - quoted_metrics: ContentMetrics - Use the quoted_metrics from the previous task
-            - long_form_text_metrics: ContentMetrics - Use the long_form_text_metrics from the previous task
+            - post_metrics: ContentMetrics - Use the post_metrics given above
+            - reply_metrics: ContentMetrics - Use the reply_metrics given above
+            - quoted_metrics: ContentMetrics - Use the quoted_metrics given above
+            - long_form_text_metrics: ContentMetrics - Use the long_form_text_metrics given above
             
-            Do not recalculate the metrics - use the pre-computed metrics from the previous task.
+            Do not recalculate the metrics - copy the pre-computed values unchanged.
         """
         )
 
@@ -248,7 +240,7 @@ class VoiceProfileCrew():
         
         return Crew(
             agents=[self.corpus_agent(), self.metrics_agent(), self.synth_agent()],
-            tasks=[self.fetch_data_task(), self.load_corpus_task(), self.compute_metrics_task(), self.compute_voices_task(), self.synthesize_voice_guide_task()],
+            tasks=[self.fetch_data_task(), self.compute_metrics_task(), self.compute_voices_task(), self.synthesize_voice_guide_task()],
             process=Process.sequential,
             memory=memory,
             max_rpm=max_rpm,
@@ -1,26 +1,115 @@
+import asyncio
+import json
 import logging
 import os
-from typing import Dict, Optional
-
-from fastapi import FastAPI, Header, HTTPException, status
-from pydantic import BaseModel
-
-from rooki_ai.crews.voice_profile.voice_profile import VoiceProfileCrew
-from rooki_ai.flows.coach import CoachFlow
-from rooki_ai.models import VoiceProfileRequest, VoiceProfileResponse
-from rooki_ai.models.api import StandupCoachResponse
-from rooki_ai.utils.update_voice_config_in_supabase import (
-    update_voice_config_in_supabase,
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Union
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, Header, HTTPException, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from rooki_ai.jobs import JobConflict, PostgresJobStore, get_job_store
+from rooki_ai.jobs.idempotency import CachedResponse, IdempotencyCache, Producer
+from rooki_ai.jobs.scheduler import (
+    TIMED_OUT_STAGE,
+    JobTimeout,
+    SchedulerError,
+    SchedulerSaturated,
+    SchedulerUnavailable,
+    get_scheduler,
 )
+from rooki_ai.jobs.singleflight import SingleFlight
+from rooki_ai.jobs.voice_profile import run_voice_profile
+from rooki_ai.jobs.write_behind import get_voice_writer
+from rooki_ai.models import (
+    Job,
+    JobAccepted,
+    VoiceProfileBatchAccepted,
+    VoiceProfileBatchItem,
+    VoiceProfileResponse,
+)
+from rooki_ai.models.api import StandupCoachResponse
+from rooki_ai.utils.db import get_db
+from rooki_ai.utils.get_storage_urls import get_storage_urls
+from rooki_ai.utils.corpus_store import get_corpus_store
+from rooki_ai.utils.http_cache import get_http_cache
+from rooki_ai.utils.http_client import get_http_client
+from rooki_ai.utils.message_history import get_message_history
+from rooki_ai.utils.runtime import get_runtime
+from rooki_ai.utils.trending import get_trending_feed
+from rooki_ai.utils.voice_cache import get_voice_cache
+
+load_dotenv()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Voice Guide API")
+# Import the crew stack in the background at startup instead of on the first
+# request that needs it
+WARMUP_ON_STARTUP = os.environ.get("WARMUP_ON_STARTUP", "false").lower() == "true"
+
+# Keep ranked trending snapshots in memory so coach requests never fetch them
+TRENDING_REFRESH = os.environ.get("TRENDING_REFRESH", "true").lower() == "true"
+
+
+def _warm_up():
+    """Import crewai, litellm and the crews/flows so the first run doesn't pay for it."""
+    import rooki_ai.crews.category.category  # noqa: F401
+    import rooki_ai.crews.voice_profile.voice_profile  # noqa: F401
+    import rooki_ai.flows.coach  # noqa: F401
+    import litellm  # noqa: F401
+
+    logger.info("Crew stack imported")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the shared execution layer on startup and drain it on shutdown."""
+    runtime = get_runtime()
+    # Route asyncio.to_thread and run_in_executor(None, ...) through the same pool
+    asyncio.get_running_loop().set_default_executor(runtime.executor)
+    if WARMUP_ON_STARTUP:
+        runtime.submit(_warm_up)
+    if TRENDING_REFRESH:
+        get_trending_feed().start()
+    yield
+    get_scheduler().close()
+    await get_trending_feed().aclose()
+    # Flush queued Voice writes while the pool is still open
+    await get_voice_writer().aclose()
+    await get_db().aclose()
+    await get_http_client().aclose()
+    runtime.shutdown()
 
-# In-memory store to track concurrent jobs
-voice_guide_jobs = {}
+
+app = FastAPI(title="Voice Guide API", lifespan=lifespan)
+
+VOICE_PROFILE_JOB = "voice_profile"
+COACH_JOB = "coach"
+
+# Store to track concurrent jobs; in-memory unless JOB_BACKEND=postgres
+voice_guide_jobs = get_job_store()
+
+# With the Postgres backend this process only enqueues jobs and polls for
+# their results; `rooki_ai.worker` processes run them
+USE_JOB_QUEUE = isinstance(voice_guide_jobs, PostgresJobStore)
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+
+# Strong references to background tasks so they aren't garbage collected
+_background_tasks: Set[asyncio.Task] = set()
+
+# Concurrent voice profile requests for the same handle and config share a run
+voice_profile_flights = SingleFlight()
+
+# Responses replayed for requests that carry an Idempotency-Key header
+idempotency_cache = IdempotencyCache()
+
+# Crew runs a single batch request may have in flight at once
+VOICE_PROFILE_BATCH_CONCURRENCY = int(os.environ.get("VOICE_PROFILE_BATCH_CONCURRENCY", "3"))
+MAX_BATCH_HANDLES = int(os.environ.get("MAX_BATCH_HANDLES", "100"))
 
 # # Retry configuration
 # MAX_RETRIES = int(os.environ.get("VOICE_PROFILE_MAX_RETRIES", "3"))
@@ -32,6 +121,11 @@ class VoiceProfileRequest(BaseModel):
     config: Optional[Dict[str, int]] = None
 
 
+class VoiceProfileBatchRequest(BaseModel):
+    x_handles: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_HANDLES)
+    config: Optional[Dict[str, int]] = None
+
+
 class StandupCoachRequestBody(BaseModel):
     user_id: str
     user_message: str
@@ -63,240 +157,478 @@ def verify_api_key(
     return x_api_key
 
 
-@app.post("/v1/voice/profile", response_model=VoiceProfileResponse)
+def _voice_profile_http_error(e: Exception) -> HTTPException:
+    """Map a voice profile run failure onto an HTTP error."""
+    # Handle various error types
+    if "Invalid format" in str(e):
+        return HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Invalid format: {str(e)}",
+        )
+    elif "Invalid manifest" in str(e) or "invalid influencer" in str(e).lower():
+        return HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid data: {str(e)}",
+        )
+    else:
+        logger.error(f"Error generating voice profile: {e}")
+        return HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internal server error: {str(e)}",
+        )
+
+
+def _failed_job_http_error(job: Job) -> HTTPException:
+    """Map a failed voice profile job onto a 504 if it timed out, else as its error."""
+    if job.stage == TIMED_OUT_STAGE:
+        return HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=job.error)
+    return _voice_profile_http_error(Exception(job.error))
+
+
+async def _idempotent(
+    api_key: str,
+    idempotency_key: Optional[str],
+    scope: str,
+    body: BaseModel,
+    produce: Producer,
+) -> JSONResponse:
+    """
+    Run `produce` once per (API key, Idempotency-Key, body) and replay its
+    response to retries. Requests without the header always run.
+    """
+    if not idempotency_key:
+        result = await produce()
+        return JSONResponse(status_code=result.status_code, content=result.body)
+
+    key = IdempotencyCache.fingerprint(
+        api_key, idempotency_key, scope, body.model_dump_json().encode()
+    )
+    result, replayed = await idempotency_cache.run(key, produce)
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return JSONResponse(
+        status_code=result.status_code, content=result.body, headers=headers
+    )
+
+
+def _scheduler_http_error(e: SchedulerError) -> HTTPException:
+    """Map a scheduler admission failure onto a 429/503 with Retry-After."""
+    return HTTPException(
+        status_code=e.status_code,
+        detail=e.detail,
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+async def _run_voice_profile_job(
+    ticket, job_id: str, x_handle: str, pillar: int, guardrail: int, save=None
+):
+    """Execute a voice profile job in a worker thread and record its outcome.
+
+    Returns the VoiceProfileResponse, or None if the run failed (the reason is
+    stored on the job, with stage TIMED_OUT_STAGE for a timeout). `save`
+    overrides how the voice config is persisted.
+    """
+    voice_guide_jobs.update(job_id, stage="waiting for worker")
+    try:
+        response = await get_scheduler().run(
+            ticket,
+            run_voice_profile,
+            x_handle,
+            pillar,
+            guardrail,
+            on_stage=lambda stage: voice_guide_jobs.update(job_id, stage=stage),
+            save=save,
+            on_start=lambda: voice_guide_jobs.update(
+                job_id, status="running", stage="starting"
+            ),
+        )
+    except Exception as e:
+        logger.error(f"Voice profile job {job_id} for {x_handle} failed: {e}")
+        stage = TIMED_OUT_STAGE if isinstance(e, JobTimeout) else "failed"
+        voice_guide_jobs.update(job_id, status="failed", stage=stage, error=str(e))
+        return None
+
+    voice_guide_jobs.update(
+        job_id, status="succeeded", stage="done", result=response.model_dump()
+    )
+    return response
+
+
+@app.post(
+    "/v1/voice/profile",
+    response_model=Union[JobAccepted, VoiceProfileResponse],
+    status_code=status.HTTP_202_ACCEPTED,
+)
 async def create_voice_profile(
     request: VoiceProfileRequest,
+    wait: bool = Query(
+        False, description="Block until the profile is generated instead of returning a job"
+    ),
     x_api_key: str = Header(..., description="API Key for authentication"),
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", description="Dedupe retries of the same request"
+    ),
 ):
     """
     Create a voice profile for a Twitter handle.
 
+    By default the crew run is submitted as a background job and a 202 with
+    the job id is returned; poll `GET /v1/voice/profile/jobs/{job_id}` for the
+    result. With `wait=true` the request blocks until the profile is ready.
+
+    Retries carrying the same `Idempotency-Key` and body get the original
+    response (the same job id) instead of starting another crew run.
+    Concurrent requests for the same handle and config share one crew run
+    and get the same job id.
+
     Args:
         request: Voice profile request with Twitter handle and optional config
+        wait: Whether to wait for the run to finish
         x_api_key: API key for authentication
+        idempotency_key: Optional key identifying retries of this request
 
     Returns:
-        VoiceProfileResponse: The generated voice profile
+        JobAccepted | VoiceProfileResponse: The submitted job, or the generated
+        voice profile when `wait` is set
 
     Raises:
-        HTTPException: If there's an error creating the voice profile
+        HTTPException: If a run with a different config is already active for
+        the handle (409), the crew workers are saturated (429/503), or if
+        there's an error creating the voice profile in wait mode
     """
     # Verify API key
     verify_api_key(x_api_key)
 
-    # Check for concurrent runs
-    if (
-        request.x_handle in voice_guide_jobs
-        and voice_guide_jobs[request.x_handle]["status"] == "running"
-    ):
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail=f"Another compute run is already active for {request.x_handle}",
-        )
+    return await _idempotent(
+        x_api_key,
+        idempotency_key,
+        f"voice_profile:wait={wait}",
+        request,
+        lambda: _submit_voice_profile(request, wait),
+    )
+
+
+async def _submit_voice_profile(request: VoiceProfileRequest, wait: bool) -> CachedResponse:
+    """
+    Submit a voice profile job and, in wait mode, wait for its result.
 
+    A request matching a run already in flight (same handle, pillar and
+    guardrail counts) joins that run instead of starting another one.
+    """
     pillar = request.config.get("pillar", 3) if request.config else 3
     guardrail = request.config.get("guardrail", 3) if request.config else 3
+    if USE_JOB_QUEUE:
+        return await _enqueue_voice_profile(request.x_handle, pillar, guardrail, wait)
+
+    flight_key = (request.x_handle, pillar, guardrail)
+
+    flight = voice_profile_flights.join(flight_key)
+    if flight is not None:
+        task, job_id = flight
+        logger.info(f"Joining in-flight voice profile run {job_id} for {request.x_handle}")
+    else:
+        # Check for concurrent runs with a different config
+        if voice_guide_jobs.find_active(VOICE_PROFILE_JOB, request.x_handle):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Another compute run is already active for {request.x_handle}",
+            )
 
-    try:
-        # Run the crew to generate the voice guide
-        # Construct inputs for the crew
-        inputs = {
-            "x_handle": request.x_handle,
-            "pillar": pillar,
-            "guardrail": guardrail,
-        }
-
+        # Admission control: reject before creating any work when saturated
         try:
-            result = VoiceProfileCrew().crew().kickoff(inputs=inputs)
-            print(f"Voice guide generated for {request.x_handle}: {result}")
-            if not result:
-                raise HTTPException(
-                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                    detail="Failed to generate voice profile",
-                )
+            ticket = get_scheduler().reserve(VOICE_PROFILE_JOB)
+        except SchedulerError as e:
+            raise _scheduler_http_error(e)
 
-            import json
-
-            if isinstance(result.raw, str):
-                try:
-                    result_dict = json.loads(result.raw)
-                except json.JSONDecodeError:
-                    # If JSON parsing fails, try to extract the JSON part
-                    import re
-
-                    json_match = re.search(r"({[\s\S]*})", result.raw)
-                    if json_match:
-                        try:
-                            result_dict = json.loads(json_match.group(1))
-                        except:
-                            raise HTTPException(
-                                status_code=500, detail="Failed to parse crew output"
-                            )
-                    else:
-                        raise HTTPException(
-                            status_code=500, detail="Failed to parse crew output"
-                        )
-            else:
-                # If result.raw is already a dict, use it directly
-                result_dict = result.raw
-
-            positioning = result_dict.get("positioning", "N/A")
-            tone = result_dict.get("tone", "N/A")
-            voice_config = {
-                "positioning": positioning,
-                "tone": tone,
-                "pillars": result_dict["pillars"],
-                "guardrails": result_dict["guardrails"],
-                "metrics": {
-                    "post": {
-                        **result_dict["post_metrics"],
-                        "avg_sentence_len": result_dict["post_metrics"].get(
-                            "avg_sentence_len", 15
-                        ),
-                        "imperative_pct": result_dict["post_metrics"].get(
-                            "imperative_pct", 20
-                        ),
-                        "emoji_rate": result_dict["post_metrics"].get(
-                            "emoji_rate", 0.05
-                        ),
-                    },
-                    "reply": {
-                        **result_dict["reply_metrics"],
-                        "avg_sentence_len": result_dict["reply_metrics"].get(
-                            "avg_sentence_len", 10
-                        ),
-                        "imperative_pct": result_dict["reply_metrics"].get(
-                            "imperative_pct", 15
-                        ),
-                        "emoji_rate": result_dict["reply_metrics"].get(
-                            "emoji_rate", 0.03
-                        ),
-                    },
-                    "quoted": {
-                        **result_dict["quoted_metrics"],
-                        "avg_sentence_len": result_dict["quoted_metrics"].get(
-                            "avg_sentence_len", 12
-                        ),
-                        "imperative_pct": result_dict["quoted_metrics"].get(
-                            "imperative_pct", 18
-                        ),
-                        "emoji_rate": result_dict["quoted_metrics"].get(
-                            "emoji_rate", 0.02
-                        ),
-                    },
-                    "long_form": {
-                        **result_dict["long_form_text_metrics"],
-                        "avg_sentence_len": result_dict["long_form_text_metrics"].get(
-                            "avg_sentence_len", 20
-                        ),
-                        "imperative_pct": result_dict["long_form_text_metrics"].get(
-                            "imperative_pct", 10
-                        ),
-                        "emoji_rate": result_dict["long_form_text_metrics"].get(
-                            "emoji_rate", 0.01
-                        ),
-                    },
-                },
-            }
-
-            # Construct response using the parsed dictionary
-            response = VoiceProfileResponse(
-                positioning=result_dict["positioning"],
-                tone=result_dict["tone"],
-                pillars=result_dict["pillars"],
-                guardrails=result_dict["guardrails"],
-                post_metrics={
-                    **result_dict["post_metrics"],
-                    "avg_sentence_len": result_dict["post_metrics"].get(
-                        "avg_sentence_len", 15
-                    ),
-                    "imperative_pct": result_dict["post_metrics"].get(
-                        "imperative_pct", 20
-                    ),
-                    "emoji_rate": result_dict["post_metrics"].get("emoji_rate", 0.05),
-                },
-                reply_metrics={
-                    **result_dict["reply_metrics"],
-                    "avg_sentence_len": result_dict["reply_metrics"].get(
-                        "avg_sentence_len", 10
-                    ),
-                    "imperative_pct": result_dict["reply_metrics"].get(
-                        "imperative_pct", 15
-                    ),
-                    "emoji_rate": result_dict["reply_metrics"].get("emoji_rate", 0.03),
-                },
-                quoted_metrics={
-                    **result_dict["quoted_metrics"],
-                    "avg_sentence_len": result_dict["quoted_metrics"].get(
-                        "avg_sentence_len", 12
-                    ),
-                    "imperative_pct": result_dict["quoted_metrics"].get(
-                        "imperative_pct", 18
-                    ),
-                    "emoji_rate": result_dict["quoted_metrics"].get("emoji_rate", 0.02),
-                },
-                long_form_text_metrics={
-                    **result_dict["long_form_text_metrics"],
-                    "avg_sentence_len": result_dict["long_form_text_metrics"].get(
-                        "avg_sentence_len", 20
-                    ),
-                    "imperative_pct": result_dict["long_form_text_metrics"].get(
-                        "imperative_pct", 10
-                    ),
-                    "emoji_rate": result_dict["long_form_text_metrics"].get(
-                        "emoji_rate", 0.01
-                    ),
-                },
+        try:
+            job_id = voice_guide_jobs.create(VOICE_PROFILE_JOB, request.x_handle).id
+            task = voice_profile_flights.launch(
+                flight_key,
+                _run_voice_profile_job(ticket, job_id, request.x_handle, pillar, guardrail),
+                context=job_id,
             )
+        except BaseException:
+            get_scheduler().release(ticket)
+            raise
+
+    if not wait:
+        job = voice_guide_jobs.get(job_id)
+        accepted = JobAccepted(
+            job_id=job.id,
+            status=job.status,
+            status_url=f"/v1/voice/profile/jobs/{job.id}",
+        )
+        return CachedResponse(status.HTTP_202_ACCEPTED, accepted.model_dump(mode="json"))
+
+    # Shield the run so a client disconnect doesn't cancel the job itself
+    result = await asyncio.shield(task)
+    if result is None:
+        raise _failed_job_http_error(voice_guide_jobs.get(job_id))
+
+    return CachedResponse(status.HTTP_200_OK, result.model_dump(mode="json"))
+
+
+async def _enqueue_job(kind: str, key: str, payload: Dict[str, Any]) -> Job:
+    """Put a job on the Postgres queue, refusing when the backlog is full."""
+    depth = await asyncio.to_thread(voice_guide_jobs.queue_depth, [kind])
+    if depth >= get_scheduler().max_queued:
+        raise _scheduler_http_error(
+            SchedulerSaturated(f"Too many queued {kind} jobs; try again later", 30)
+        )
+    return await asyncio.to_thread(voice_guide_jobs.create, kind, key, payload)
+
 
-            # Update the voice config in Supabase
-            update_success = update_voice_config_in_supabase(
-                request.x_handle,
-                result_dict["positioning"],
-                result_dict["tone"],
-                voice_config,
+async def _wait_for_job(job_id: str) -> Job:
+    """Poll the job store until a queued job finishes or times out."""
+    deadline = asyncio.get_running_loop().time() + get_scheduler().timeout
+    while True:
+        job = await asyncio.to_thread(voice_guide_jobs.get, job_id)
+        if not job.is_active:
+            return job
+        if asyncio.get_running_loop().time() > deadline:
+            raise JobTimeout(f"{job.kind} job {job_id} did not finish in time")
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+
+
+async def _enqueue_voice_profile(
+    x_handle: str, pillar: int, guardrail: int, wait: bool
+) -> CachedResponse:
+    """Queue-backed counterpart of the in-process voice profile submission."""
+    payload = {"x_handle": x_handle, "pillar": pillar, "guardrail": guardrail}
+
+    job = await asyncio.to_thread(voice_guide_jobs.find_active, VOICE_PROFILE_JOB, x_handle)
+    if job is None:
+        try:
+            job = await _enqueue_job(VOICE_PROFILE_JOB, x_handle, payload)
+        except JobConflict:
+            # Another API node enqueued a run for this handle in the meantime
+            job = await asyncio.to_thread(
+                voice_guide_jobs.find_active, VOICE_PROFILE_JOB, x_handle
             )
 
-            if not update_success:
-                logger.warning(
-                    f"Failed to update voice config in Supabase for {request.x_handle}"
-                )
+    # Join a matching run in flight on any node; a different config conflicts
+    if job is None or job.payload != payload:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Another compute run is already active for {x_handle}",
+        )
 
-            return response
-        except Exception as e:
-            raise Exception(f"An error occurred while running the crew: {e}")
+    if not wait:
+        accepted = JobAccepted(
+            job_id=job.id,
+            status=job.status,
+            status_url=f"/v1/voice/profile/jobs/{job.id}",
+        )
+        return CachedResponse(status.HTTP_202_ACCEPTED, accepted.model_dump(mode="json"))
+
+    try:
+        job = await _wait_for_job(job.id)
+    except JobTimeout as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    if job.status == "failed":
+        raise _failed_job_http_error(job)
+    return CachedResponse(status.HTTP_200_OK, job.result)
+
+
+@app.post(
+    "/v1/voice/profile/batch",
+    response_model=VoiceProfileBatchAccepted,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_voice_profile_batch(
+    request: VoiceProfileBatchRequest,
+    x_api_key: str = Header(..., description="API Key for authentication"),
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", description="Dedupe retries of the same request"
+    ),
+):
+    """
+    Create voice profiles for several Twitter handles with a shared config.
+
+    Every handle gets its own job, polled like a single submission through
+    `GET /v1/voice/profile/jobs/{job_id}`. At most
+    VOICE_PROFILE_BATCH_CONCURRENCY crew runs of the batch execute at once,
+    within the scheduler's overall limit. Storage URLs of all handles are
+    looked up with one query and handles without a tweet corpus fail right
+    away. Generated configs reach the Voice table through the write-behind
+    queue, which batches them.
 
+    A handle that already has a run in flight with the same config joins it;
+    one with a different config is reported with an error and no job.
+
+    Args:
+        request: Handles to profile and the optional shared config
+        x_api_key: API key for authentication
+        idempotency_key: Optional key identifying retries of this request
+
+    Returns:
+        VoiceProfileBatchAccepted: One entry per distinct handle
+    """
+    verify_api_key(x_api_key)
+
+    return await _idempotent(
+        x_api_key,
+        idempotency_key,
+        "voice_profile_batch",
+        request,
+        lambda: _submit_voice_profile_batch(request),
+    )
+
+
+async def _submit_voice_profile_batch(request: VoiceProfileBatchRequest) -> CachedResponse:
+    """Create one job per distinct handle and start the batch in the background."""
+    pillar = request.config.get("pillar", 3) if request.config else 3
+    guardrail = request.config.get("guardrail", 3) if request.config else 3
+    x_handles = list(dict.fromkeys(request.x_handles))
+
+    if USE_JOB_QUEUE:
+        # Workers pick the jobs up individually and write their own results
+        items = [
+            await _enqueue_batch_item(x_handle, pillar, guardrail) for x_handle in x_handles
+        ]
+        accepted = VoiceProfileBatchAccepted(jobs=items)
+        return CachedResponse(status.HTTP_202_ACCEPTED, accepted.model_dump(mode="json"))
+
+    try:
+        storage_urls = await asyncio.to_thread(get_storage_urls, x_handles)
     except Exception as e:
-        # Handle various error types
-        if "Invalid format" in str(e):
-            raise HTTPException(
-                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-                detail=f"Invalid format: {str(e)}",
+        logger.warning(f"Batch storage URL lookup failed; crews will look them up: {e}")
+        storage_urls = None
+
+    semaphore = asyncio.Semaphore(VOICE_PROFILE_BATCH_CONCURRENCY)
+    items = []
+    runs = []
+    for x_handle in x_handles:
+        flight_key = (x_handle, pillar, guardrail)
+        flight = voice_profile_flights.join(flight_key)
+        if flight is not None:
+            items.append(_batch_item(x_handle, flight[1]))
+            continue
+
+        if voice_guide_jobs.find_active(VOICE_PROFILE_JOB, x_handle):
+            items.append(
+                VoiceProfileBatchItem(
+                    x_handle=x_handle,
+                    error=f"Another compute run is already active for {x_handle}",
+                )
             )
-        elif "Invalid manifest" in str(e) or "invalid influencer" in str(e).lower():
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=f"Invalid data: {str(e)}",
+            continue
+
+        job_id = voice_guide_jobs.create(VOICE_PROFILE_JOB, x_handle).id
+        if storage_urls is not None and not storage_urls.get(x_handle):
+            voice_guide_jobs.update(
+                job_id,
+                status="failed",
+                stage="failed",
+                error=f"No tweet corpus found for x_handle: {x_handle}",
             )
         else:
-            logger.error(f"Error generating voice profile: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Internal server error: {str(e)}",
+            voice_guide_jobs.update(job_id, stage="waiting for batch slot")
+            runs.append(
+                voice_profile_flights.launch(
+                    flight_key,
+                    _run_batch_voice_profile(semaphore, job_id, x_handle, pillar, guardrail),
+                    context=job_id,
+                )
             )
+        items.append(_batch_item(x_handle, job_id))
+
+    logger.info(f"Started voice profile batch: {len(runs)} of {len(x_handles)} handles")
+
+    accepted = VoiceProfileBatchAccepted(jobs=items)
+    return CachedResponse(status.HTTP_202_ACCEPTED, accepted.model_dump(mode="json"))
+
+
+def _batch_item(x_handle: str, job_id: str) -> VoiceProfileBatchItem:
+    job = voice_guide_jobs.get(job_id)
+    return VoiceProfileBatchItem(
+        x_handle=x_handle,
+        job_id=job.id,
+        status=job.status,
+        status_url=f"/v1/voice/profile/jobs/{job.id}",
+    )
+
+
+async def _enqueue_batch_item(x_handle: str, pillar: int, guardrail: int) -> VoiceProfileBatchItem:
+    """Queue one handle of a batch, reporting a refusal on the item itself."""
+    try:
+        result = await _enqueue_voice_profile(x_handle, pillar, guardrail, wait=False)
+    except HTTPException as e:
+        return VoiceProfileBatchItem(x_handle=x_handle, error=e.detail)
+    return VoiceProfileBatchItem(x_handle=x_handle, **result.body)
+
+
+async def _run_batch_voice_profile(
+    semaphore: asyncio.Semaphore,
+    job_id: str,
+    x_handle: str,
+    pillar: int,
+    guardrail: int,
+):
+    """Run one handle of a batch once a batch slot and a scheduler slot are free."""
+    async with semaphore:
+        while True:
+            try:
+                ticket = get_scheduler().reserve(VOICE_PROFILE_JOB)
+                break
+            except SchedulerSaturated as e:
+                # Other traffic fills the queue; wait for room rather than fail
+                await asyncio.sleep(e.retry_after)
+            except SchedulerUnavailable as e:
+                voice_guide_jobs.update(job_id, status="failed", stage="failed", error=e.detail)
+                return None
+
+        return await _run_voice_profile_job(ticket, job_id, x_handle, pillar, guardrail)
+
+
+@app.get("/v1/voice/profile/jobs/{job_id}", response_model=Job)
+async def get_voice_profile_job(
+    job_id: str,
+    x_api_key: str = Header(..., description="API Key for authentication"),
+):
+    """
+    Report the status, stage and result of a voice profile job.
+
+    Args:
+        job_id: Id returned when the job was submitted
+        x_api_key: API key for authentication
+
+    Returns:
+        Job: The job record; `result` holds the VoiceProfileResponse once the
+        job has succeeded and `error` the failure reason if it failed
+
+    Raises:
+        HTTPException: If no such job exists
+    """
+    verify_api_key(x_api_key)
+
+    job = await asyncio.to_thread(voice_guide_jobs.get, job_id)
+    if job is None or job.kind != VOICE_PROFILE_JOB:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown voice profile job: {job_id}",
+        )
+    return job
 
 
 @app.post("/v1/standup/coach", response_model=StandupCoachResponse)
 async def standup_coach(
     request: StandupCoachRequestBody,
     x_api_key: str = Header(..., description="API Key for authentication"),
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", description="Dedupe retries of the same request"
+    ),
 ):
     """
     Process a standup coaching request and return guidance.
 
+    Retries carrying the same `Idempotency-Key` and body get the original
+    response instead of running the flow again.
+
     Args:
         request: Standup coach request with user_id and user_message
         x_api_key: API key for authentication
+        idempotency_key: Optional key identifying retries of this request
 
     Returns:
         StandupCoachResponse: The coaching response
@@ -307,6 +639,17 @@ async def standup_coach(
     # Verify API key
     verify_api_key(x_api_key)
 
+    return await _idempotent(
+        x_api_key,
+        idempotency_key,
+        "standup_coach",
+        request,
+        lambda: _run_standup_coach(request),
+    )
+
+
+async def _run_standup_coach(request: StandupCoachRequestBody) -> CachedResponse:
+    """Run the CoachFlow for a request through the scheduler."""
     try:
         # Prepare inputs for the CoachFlow
         inputs = {
@@ -316,28 +659,177 @@ async def standup_coach(
 
         logger.info(f"Processing standup coach request for user {request.user_id}")
 
+        if USE_JOB_QUEUE:
+            job = await _enqueue_job(COACH_JOB, request.user_id, inputs)
+            job = await _wait_for_job(job.id)
+            if job.status == "failed":
+                if job.stage == TIMED_OUT_STAGE:
+                    raise JobTimeout(job.error)
+                raise Exception(job.error)
+            return CachedResponse(status.HTTP_200_OK, job.result)
+
+        from rooki_ai.flows.coach import CoachFlow
+
         # Initialize and run the CoachFlow
         flow = CoachFlow()
 
-        # Use concurrent.futures to run the flow.kickoff in a separate thread
-        # This avoids the asyncio.run() in a running event loop issue
-        import asyncio
-        import concurrent.futures
-
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            # Run the kickoff method in a separate thread to avoid event loop conflicts
-            result = await asyncio.get_event_loop().run_in_executor(
-                executor, lambda: flow.kickoff(inputs)
-            )
+        # The flow is async, so the scheduler runs it on this loop and only
+        # caps concurrency; crew runs inside it still take a worker thread
+        result = await get_scheduler().submit(COACH_JOB, flow.kickoff_async, inputs)
 
         logger.info(
             f"Successfully processed standup coach request for user {request.user_id}"
         )
 
-        return result
+        return CachedResponse(status.HTTP_200_OK, result.model_dump(mode="json"))
+    except HTTPException:
+        raise
+    except SchedulerError as e:
+        raise _scheduler_http_error(e)
+    except JobTimeout as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
     except Exception as e:
         logger.error(f"Error processing standup coach request: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing standup coach request: {str(e)}",
         )
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/v1/standup/coach/stream")
+async def standup_coach_stream(
+    request: StandupCoachRequestBody,
+    x_api_key: str = Header(..., description="API Key for authentication"),
+):
+    """
+    Streaming variant of /v1/standup/coach using Server-Sent Events.
+
+    Emits an `accepted` event immediately, then flow progress as it happens:
+    `context_loaded`, `route`, `task_completed` for each CategoryDraftCrew
+    task and `token` for each LLM token of the chat and overview routes. The
+    final StandupCoachResponse is sent as a `result` event, or an `error`
+    event if the flow fails.
+
+    Args:
+        request: Standup coach request with user_id and user_message
+        x_api_key: API key for authentication
+
+    Returns:
+        StreamingResponse: A text/event-stream of flow events
+
+    Raises:
+        HTTPException: If the crew workers are saturated (429/503)
+    """
+    verify_api_key(x_api_key)
+
+    inputs = {
+        "user_id": request.user_id,
+        "user_message": request.user_message,
+    }
+
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def sink(event: str, payload: Dict[str, Any]):
+        # Called on this loop, or from a crew's worker thread for task events
+        loop.call_soon_threadsafe(events.put_nowait, (event, payload))
+
+    from rooki_ai.flows.coach import CoachFlow
+
+    flow = CoachFlow(event_sink=sink)
+
+    # Admission control happens before the stream starts so clients still get
+    # a proper 429/503 status
+    try:
+        ticket = get_scheduler().reserve(COACH_JOB)
+    except SchedulerError as e:
+        raise _scheduler_http_error(e)
+
+    logger.info(f"Streaming standup coach request for user {request.user_id}")
+
+    async def run_flow():
+        try:
+            result = await get_scheduler().run(ticket, flow.kickoff_async, inputs)
+            events.put_nowait(("result", result.model_dump(mode="json")))
+        except Exception as e:
+            logger.error(f"Error processing standup coach stream: {str(e)}")
+            events.put_nowait(("error", {"detail": str(e)}))
+        finally:
+            events.put_nowait(None)
+
+    try:
+        task = asyncio.create_task(run_flow())
+    except BaseException:
+        get_scheduler().release(ticket)
+        raise
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+    async def stream() -> AsyncIterator[str]:
+        yield _sse("accepted", {"user_id": request.user_id})
+        while True:
+            try:
+                item = await asyncio.wait_for(events.get(), timeout=15)
+            except asyncio.TimeoutError:
+                # Comment frame keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            if item is None:
+                break
+            yield _sse(*item)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness probe; answers without touching crews, LLMs or the database."""
+    return {"status": "ok"}
+
+
+@app.get("/v1/scheduler/stats")
+async def scheduler_stats(
+    x_api_key: str = Header(..., description="API Key for authentication"),
+):
+    """
+    Report crew worker utilisation: running jobs, queue depth, wait and run
+    times, plus thread pool usage of the shared runtime, database pool usage,
+    the Voice write-behind queue, the Voice and message history caches and
+    outbound HTTP latency per host, how often fetches were served from the
+    HTTP disk cache, the age of the trending snapshots and how often tweet
+    corpora were opened from the local corpus store.
+
+    Args:
+        x_api_key: API key for authentication
+
+    Returns:
+        dict: Scheduler counters and timings, with thread pool stats under
+        "pool", database pool stats under "db", queued Voice writes under
+        "voice_writes", Voice cache hit ratio and staleness under
+        "voice_cache", chat history buffers under "message_history" and
+        fetch latencies under "http", disk cache outcomes under
+        "http_cache", trending snapshot ages under "trending" and corpus
+        store outcomes under "corpus"
+    """
+    verify_api_key(x_api_key)
+    return {
+        **get_scheduler().stats(),
+        "pool": get_runtime().stats(),
+        "db": get_db().stats(),
+        "voice_writes": get_voice_writer().stats(),
+        "voice_cache": get_voice_cache().stats(),
+        "message_history": get_message_history().stats(),
+        "http": get_http_client().stats(),
+        "http_cache": get_http_cache().stats(),
+        "trending": get_trending_feed().stats(),
+        "corpus": get_corpus_store().stats(),
+    }
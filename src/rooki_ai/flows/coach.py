@@ -1,16 +1,10 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from crewai.flow.flow import Flow, listen, start
-from dotenv import load_dotenv
-from litellm import completion
 from pydantic import BaseModel, Field
 
-from rooki_ai.crews import RouteCrew
-from rooki_ai.crews.category.category import CategoryDraftCrew
 from rooki_ai.models.api import FocusState, StandupCoachResponse, StatePatch
-from rooki_ai.utils.get_chat_background import get_chat_background
-
-load_dotenv()
+from rooki_ai.utils.get_chat_background import get_chat_background_async
 
 
 class CoachState(BaseModel):
@@ -18,11 +12,56 @@ class CoachState(BaseModel):
     user_message: str | None = None
 
 
+# Receives (event_name, payload) as the flow progresses; called on the event
+# loop running the flow, or from the crew's worker thread for task events
+EventSink = Callable[[str, Dict[str, Any]], None]
+
+
 class CoachFlow(Flow[CoachState]):
+    """Route a coach message and reply to it.
+
+    Every step is async: run it with `kickoff_async` on an event loop, where
+    database reads, HTTP fetches and LLM calls are awaited. Only crew runs,
+    which crewai executes synchronously, take a worker thread. `kickoff`
+    still works from threads without a running loop.
+    """
+
     model = "gpt-4o-mini"
 
+    def __init__(self, event_sink: Optional[EventSink] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._event_sink = event_sink
+
+    def _emit(self, event: str, payload: Dict[str, Any]):
+        """Report progress to the event sink, if one is attached."""
+        if self._event_sink is None:
+            return
+        try:
+            self._event_sink(event, payload)
+        except Exception as e:
+            print(f"Error emitting {event} event: {str(e)}")
+
+    async def _complete(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Run a chat completion, streaming tokens to the event sink when attached.
+        """
+        # litellm is slow to import; only routes that call an LLM directly pay for it
+        from litellm import acompletion
+
+        if self._event_sink is None:
+            response = await acompletion(model=self.model, messages=messages)
+            return response["choices"][0]["message"]["content"]
+
+        parts = []
+        async for chunk in await acompletion(model=self.model, messages=messages, stream=True):
+            token = chunk.choices[0].delta.content
+            if token:
+                parts.append(token)
+                self._emit("token", {"text": token})
+        return "".join(parts)
+
     @start()
-    def identify_route(self):
+    async def identify_route(self):
         print("Starting flow")
         # Debug the entire state to see what's available
         print(f"Full state: {vars(self.state)}")
@@ -32,7 +71,15 @@ class CoachFlow(Flow[CoachState]):
         user_message = getattr(self.state, "user_message", None)
         print(f"User ID: {user_id}, User Message: {user_message}")
 
-        chat_background = get_chat_background(user_id)
+        # Awaited so the flow's loop isn't blocked on the database
+        chat_background = await get_chat_background_async(user_id)
+        self._emit(
+            "context_loaded",
+            {
+                "messages": len(chat_background["messages"]),
+                "suggested_categories": len(chat_background["suggested_categories"]),
+            },
+        )
 
         # Include user_id and user_message in the inputs passed to RouteCrew
         crew_inputs = {
@@ -46,16 +93,18 @@ class CoachFlow(Flow[CoachState]):
         print(f"Passing to RouteCrew: {crew_inputs}")
 
         # The route is now directly a string like "overview_agent", "category_agent", or "chat_agent"
+        # from rooki_ai.crews import RouteCrew
         # route = RouteCrew().crew().kickoff(inputs=crew_inputs)
         route = "category_agent"  # Temporary hardcoded route for testing
         print(f"Selected route: {route}")
+        self._emit("route", {"route": route})
 
         # Return both the context and the route string
         route_with_context = {"context": crew_inputs, "route": route}
         return route_with_context
 
     @listen(identify_route)
-    def reply(self, route_with_context):
+    async def reply(self, route_with_context):
         route_obj = route_with_context["route"]
         context = route_with_context["context"]
         user_id = getattr(self.state, "user_id", None)
@@ -67,11 +116,11 @@ class CoachFlow(Flow[CoachState]):
             route = str(route_obj).strip().lower()
 
         if route == "category_agent":
-            return self._handle_category_agent(context, user_id)
+            return await self._handle_category_agent(context, user_id)
         elif route == "chat_agent":
-            return self._handle_chat_agent(context, user_id)
+            return await self._handle_chat_agent(context, user_id)
         elif route == "overview_agent":
-            return self._handle_overview_agent(context, user_id)
+            return await self._handle_overview_agent(context, user_id)
         else:
             # Fallback for unexpected route values
             return StandupCoachResponse(
@@ -81,18 +130,27 @@ class CoachFlow(Flow[CoachState]):
                 keyboard=[],
             )
 
-    def _handle_category_agent(self, context, user_id):
+    async def _handle_category_agent(self, context, user_id):
         """
         Handle category-specific content execution via a crew.
         """
+        from rooki_ai.crews.category.category import CategoryDraftCrew
+        from rooki_ai.crews.factory import get_crew
+
         try:
             user_message = context.get("user_message", "")
             # Create and execute the category crew
             inputs = {
                 "user_id": user_id,
                 "user_message": user_message,
+                **await CategoryDraftCrew.prefetch_context(user_id),
             }
-            result = CategoryDraftCrew(inputs).crew().kickoff(inputs=inputs)
+            crew = get_crew(CategoryDraftCrew)
+            crew.task_callback = lambda output: self._emit(
+                "task_completed",
+                {"task": output.name, "agent": output.agent, "output": output.raw},
+            )
+            result = await crew.kickoff_async(inputs=inputs)
 
             # Handle various result types
             if result is None:
@@ -124,16 +182,15 @@ class CoachFlow(Flow[CoachState]):
                 state_patch=StatePatch(focus=FocusState(kind="category")),
             )
 
-    def _handle_chat_agent(self, context, user_id):
+    async def _handle_chat_agent(self, context, user_id):
         """
         Handle general chat interactions via a direct LLM call.
         """
         print(f"Executing chat agent LLM for user {user_id}")
 
         # Execute LLM call for chat response
-        response = completion(
-            model=self.model,
-            messages=[
+        chat_response = await self._complete(
+            [
                 {
                     "role": "system",
                     "content": "You are an marketing intern talking to your manager about your work.",
@@ -142,11 +199,9 @@ class CoachFlow(Flow[CoachState]):
                     "role": "user",
                     "content": f"Provide a comprehensive overview based on this context: {context}. Reply in conversational tone (no programming details about context). Keep answer short and precise",
                 },
-            ],
+            ]
         )
 
-        chat_response = response["choices"][0]["message"]["content"]
-
         return StandupCoachResponse(
             message=chat_response,
             actions=[],
@@ -155,16 +210,15 @@ class CoachFlow(Flow[CoachState]):
             state_patch=StatePatch(focus=FocusState(kind="chat")),
         )
 
-    def _handle_overview_agent(self, context, user_id):
+    async def _handle_overview_agent(self, context, user_id):
         """
         Handle overview requests via a direct LLM call with summary-oriented prompting.
         """
         print(f"Executing overview agent LLM for user {user_id}")
 
         # Execute LLM call for overview response
-        response = completion(
-            model=self.model,
-            messages=[
+        overview_response = await self._complete(
+            [
                 {
                     "role": "system",
                     "content": "You are an marketing intern talking to your manager about your work.",
@@ -173,11 +227,9 @@ class CoachFlow(Flow[CoachState]):
                     "role": "user",
                     "content": f"Provide a comprehensive overview based on this context: {context}. Reply in conversational tone (no programming details about context). Keep answer short and precise",
                 },
-            ],
+            ]
         )
 
-        overview_response = response["choices"][0]["message"]["content"]
-
         return StandupCoachResponse(
             message=overview_response,
             actions=[],
@@ -0,0 +1,28 @@
+import os
+
+from .pg_store import JobConflict, PostgresJobStore
+from .scheduler import CrewScheduler, get_scheduler
+from .store import JobStore
+
+
+def get_job_store():
+    """
+    Return the job store selected by JOB_BACKEND.
+
+    "memory" (default) keeps jobs in this process and runs them here;
+    "postgres" shares them through the crew_jobs table so separate
+    `rooki_ai.worker` processes can execute them.
+    """
+    if os.environ.get("JOB_BACKEND", "memory").lower() == "postgres":
+        return PostgresJobStore()
+    return JobStore()
+
+
+__all__ = [
+    "CrewScheduler",
+    "JobConflict",
+    "JobStore",
+    "PostgresJobStore",
+    "get_job_store",
+    "get_scheduler",
+]
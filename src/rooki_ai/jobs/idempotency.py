@@ -0,0 +1,230 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from rooki_ai.utils.db import Database, database_errors, get_db
+
+logger = logging.getLogger(__name__)
+
+CREATE_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS public.idempotency_cache (
+    key         TEXT PRIMARY KEY,
+    status_code INTEGER,
+    body        JSONB,
+    claimed_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+    expires_at  TIMESTAMPTZ NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idempotency_cache_expires_at_idx
+    ON public.idempotency_cache (expires_at);
+"""
+
+# Take the key if it is new, expired, or claimed by a run that looks dead
+CLAIM_QUERY = """
+INSERT INTO public.idempotency_cache AS c (key, claimed_at, expires_at)
+VALUES ($1, now(), now() + make_interval(secs => $2))
+ON CONFLICT (key) DO UPDATE
+    SET status_code = NULL, body = NULL, claimed_at = now(),
+        expires_at = EXCLUDED.expires_at
+    WHERE c.expires_at < now()
+       OR (c.status_code IS NULL AND c.claimed_at < now() - make_interval(secs => $3))
+RETURNING key
+"""
+
+SELECT_QUERY = """
+SELECT status_code, body FROM public.idempotency_cache
+WHERE key = $1 AND expires_at >= now()
+"""
+
+STORE_QUERY = """
+UPDATE public.idempotency_cache
+SET status_code = $1, body = $2, expires_at = now() + make_interval(secs => $3)
+WHERE key = $4
+"""
+
+RELEASE_QUERY = """
+DELETE FROM public.idempotency_cache WHERE key = $1 AND status_code IS NULL
+"""
+
+PURGE_QUERY = "DELETE FROM public.idempotency_cache WHERE expires_at < now()"
+
+
+class CachedResponse(NamedTuple):
+    status_code: int
+    body: Any
+
+
+Producer = Callable[[], Awaitable[CachedResponse]]
+
+
+class IdempotencyCache:
+    """Two-tier result cache for requests carrying an Idempotency-Key header.
+
+    Entries are keyed by a hash of the API key, the Idempotency-Key and the
+    request body, so a key reused with a different payload runs afresh. An
+    in-memory LRU serves repeats on the same worker; the Postgres table
+    `idempotency_cache` shares results (and in-flight claims) across workers.
+    A repeat of a request that is still running attaches to that run instead
+    of starting another one. Only successful responses are stored.
+
+    Without DATABASE_URL, or if Postgres is unreachable, the cache degrades to
+    the in-memory tier.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        db: Optional[Database] = None,
+    ):
+        if ttl_seconds is None:
+            ttl_seconds = int(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "86400"))
+        if max_entries is None:
+            max_entries = int(os.environ.get("IDEMPOTENCY_CACHE_SIZE", "1024"))
+
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._db = db or get_db()
+        # A claim older than a full job timeout belongs to a crashed worker
+        self._stale_claim_seconds = float(os.environ.get("JOB_TIMEOUT_SECONDS", "300")) + 60
+        self._poll_interval = 1.0
+
+        self._entries: "OrderedDict[str, Tuple[float, CachedResponse]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._table_ready = False
+
+    @staticmethod
+    def fingerprint(api_key: str, idempotency_key: str, scope: str, body: bytes) -> str:
+        """Derive the cache key; the raw API key is never stored."""
+        digest = hashlib.sha256()
+        for part in (api_key.encode(), idempotency_key.encode(), scope.encode(), body):
+            digest.update(hashlib.sha256(part).digest())
+        return digest.hexdigest()
+
+    async def run(self, key: str, produce: Producer) -> Tuple[CachedResponse, bool]:
+        """
+        Return the stored response for `key`, or run `produce` and store its result.
+
+        Returns:
+            Tuple of the response and whether it was replayed from the cache
+            (or from another caller's in-flight run)
+        """
+        cached = self._get_local(key)
+        if cached is not None:
+            return cached, True
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            stored = await self._claim(key)
+            if stored is not None:
+                result, replayed = stored, True
+            else:
+                try:
+                    result = await produce()
+                except BaseException:
+                    await self._db_call(self._release, key)
+                    raise
+                replayed = False
+                await self._db_call(self._store, key, result)
+
+            self._put_local(key, result)
+            future.set_result(result)
+            return result, replayed
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e)
+                # Mark retrieved so lone failures don't log "never retrieved"
+                future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _get_local(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def _put_local(self, key: str, response: CachedResponse):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _claim(self, key: str) -> Optional[CachedResponse]:
+        """
+        Claim `key` in Postgres. Returns None if this caller should run the
+        request, or the response stored by another worker. Waits while another
+        worker holds a live claim.
+        """
+        while True:
+            state = await self._db_call(self._claim_in_db, key)
+            if state is None or state == "claimed":
+                return None
+            if isinstance(state, CachedResponse):
+                return state
+            await asyncio.sleep(self._poll_interval)
+
+    async def _db_call(self, func, *args):
+        if not self._db.configured:
+            return None
+        try:
+            return await func(*args)
+        except database_errors() as e:
+            logger.warning(f"Idempotency cache unavailable, using memory only: {e}")
+            return None
+
+    async def _ensure_table(self):
+        if not self._table_ready:
+            await self._db.execute(CREATE_TABLE_QUERY)
+            self._table_ready = True
+
+    async def _claim_in_db(self, key: str):
+        await self._ensure_table()
+
+        async def claim(conn):
+            claimed = await conn.fetchval(
+                CLAIM_QUERY, key, float(self.ttl_seconds), self._stale_claim_seconds
+            )
+            if claimed is not None:
+                return "claimed", None
+            return "taken", await conn.fetchrow(SELECT_QUERY, key)
+
+        state, row = await self._db.run(claim)
+        if state == "claimed":
+            return "claimed"
+        if row is None or row["status_code"] is None:
+            return "pending"
+        return CachedResponse(status_code=row["status_code"], body=row["body"])
+
+    async def _store(self, key: str, response: CachedResponse):
+        await self._ensure_table()
+
+        async def store(conn):
+            await conn.execute(
+                STORE_QUERY,
+                response.status_code,
+                response.body,
+                float(self.ttl_seconds),
+                key,
+            )
+            await conn.execute(PURGE_QUERY)
+
+        await self._db.run(store)
+
+    async def _release(self, key: str):
+        await self._ensure_table()
+        await self._db.execute(RELEASE_QUERY, key)
@@ -0,0 +1,186 @@
+import os
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+from rooki_ai.models.jobs import Job
+from rooki_ai.utils.db import Database, get_db
+
+CREATE_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS public.crew_jobs (
+    id           TEXT PRIMARY KEY,
+    kind         TEXT NOT NULL,
+    key          TEXT NOT NULL,
+    payload      JSONB NOT NULL DEFAULT '{}'::jsonb,
+    status       TEXT NOT NULL DEFAULT 'queued',
+    stage        TEXT NOT NULL DEFAULT 'queued',
+    result       JSONB,
+    error        TEXT,
+    worker_id    TEXT,
+    heartbeat_at TIMESTAMPTZ,
+    created_at   TIMESTAMPTZ NOT NULL DEFAULT now(),
+    started_at   TIMESTAMPTZ,
+    finished_at  TIMESTAMPTZ
+);
+CREATE INDEX IF NOT EXISTS crew_jobs_queued_idx
+    ON public.crew_jobs (kind, created_at) WHERE status = 'queued';
+CREATE UNIQUE INDEX IF NOT EXISTS crew_jobs_active_voice_profile_idx
+    ON public.crew_jobs (kind, key)
+    WHERE status IN ('queued', 'running') AND kind = 'voice_profile';
+"""
+
+JOB_COLUMNS = (
+    "id, kind, key, payload, status, stage, result, error, "
+    "created_at, started_at, finished_at"
+)
+
+INSERT_QUERY = f"""
+INSERT INTO public.crew_jobs (id, kind, key, payload)
+VALUES ($1, $2, $3, $4)
+RETURNING {JOB_COLUMNS}
+"""
+
+SELECT_QUERY = f"SELECT {JOB_COLUMNS} FROM public.crew_jobs WHERE id = $1"
+
+SELECT_ACTIVE_QUERY = f"""
+SELECT {JOB_COLUMNS} FROM public.crew_jobs
+WHERE kind = $1 AND key = $2 AND status IN ('queued', 'running')
+ORDER BY created_at
+LIMIT 1
+"""
+
+# Workers on any node pick the oldest queued job; SKIP LOCKED keeps them from
+# blocking on (or double-claiming) a row another worker is taking
+CLAIM_QUERY = f"""
+UPDATE public.crew_jobs
+SET status = 'running', stage = 'starting', worker_id = $1,
+    started_at = now(), heartbeat_at = now()
+WHERE id = (
+    SELECT id FROM public.crew_jobs
+    WHERE status = 'queued' AND kind = ANY($2)
+    ORDER BY created_at
+    FOR UPDATE SKIP LOCKED
+    LIMIT 1
+)
+RETURNING {JOB_COLUMNS}
+"""
+
+HEARTBEAT_QUERY = """
+UPDATE public.crew_jobs SET heartbeat_at = now()
+WHERE worker_id = $1 AND status = 'running'
+"""
+
+REAP_QUERY = """
+UPDATE public.crew_jobs
+SET status = 'failed', stage = 'failed', error = 'Worker stopped responding',
+    finished_at = now()
+WHERE status = 'running' AND heartbeat_at < now() - make_interval(secs => $1)
+"""
+
+QUEUE_DEPTH_QUERY = """
+SELECT count(*) FROM public.crew_jobs WHERE status = 'queued' AND kind = ANY($1)
+"""
+
+PURGE_QUERY = """
+DELETE FROM public.crew_jobs
+WHERE finished_at < now() - make_interval(secs => $1)
+"""
+
+
+class JobConflict(Exception):
+    """Another active job already exists for the same kind and key."""
+
+
+class PostgresJobStore:
+    """Job store shared by every API and worker process through Postgres.
+
+    Mirrors the JobStore interface and adds the queue operations used by
+    `rooki_ai.worker`: `claim`, `heartbeat` and `reap`. Jobs live in the
+    `crew_jobs` table, created on first use. A partial unique index allows at
+    most one active voice profile job per handle across all nodes. Queries
+    go through the shared connection pool (`rooki_ai.utils.db`).
+    """
+
+    def __init__(self, db: Optional[Database] = None, retention_seconds: Optional[int] = None):
+        if retention_seconds is None:
+            retention_seconds = int(os.environ.get("JOB_RETENTION_SECONDS", "3600"))
+        self._db = db or get_db()
+        self._retention_seconds = retention_seconds
+        self._table_ready = False
+
+    def create(self, kind: str, key: str, payload: Optional[Dict[str, Any]] = None) -> Job:
+        """
+        Enqueue a new job for `key`.
+
+        Raises:
+            JobConflict: If an active voice profile job already exists for `key`
+        """
+        from asyncpg.exceptions import UniqueViolationError
+
+        try:
+            row = self._fetchrow(INSERT_QUERY, uuid.uuid4().hex, kind, key, payload or {})
+        except UniqueViolationError:
+            raise JobConflict(f"Another {kind} job is already active for {key}")
+        return self._to_job(row)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self._fetchrow(SELECT_QUERY, job_id)
+        return self._to_job(row) if row else None
+
+    def find_active(self, kind: str, key: str) -> Optional[Job]:
+        row = self._fetchrow(SELECT_ACTIVE_QUERY, kind, key)
+        return self._to_job(row) if row else None
+
+    def update(self, job_id: str, **fields) -> Job:
+        """Apply `fields` to a job, stamping start/finish times on transitions."""
+        status = fields.get("status")
+        assignments = []
+        values: List[Any] = []
+        for name, value in fields.items():
+            values.append(value)
+            assignments.append(f"{name} = ${len(values)}")
+        if status == "running" and "started_at" not in fields:
+            assignments.append("started_at = now()")
+        elif status in ("succeeded", "failed") and "finished_at" not in fields:
+            assignments.append("finished_at = now()")
+
+        query = (
+            f"UPDATE public.crew_jobs SET {', '.join(assignments)} "
+            f"WHERE id = ${len(values) + 1} RETURNING {JOB_COLUMNS}"
+        )
+        row = self._fetchrow(query, *values, job_id)
+        return self._to_job(row)
+
+    def claim(self, kinds: Sequence[str], worker_id: str) -> Optional[Job]:
+        """Atomically take the oldest queued job of one of `kinds`, if any."""
+        row = self._fetchrow(CLAIM_QUERY, worker_id, list(kinds))
+        return self._to_job(row) if row else None
+
+    def heartbeat(self, worker_id: str):
+        """Mark every job running on `worker_id` as alive."""
+        self._ensure_table()
+        self._db.execute_sync(HEARTBEAT_QUERY, worker_id)
+
+    def reap(self, stale_seconds: float):
+        """Fail running jobs whose worker stopped heartbeating, and purge old ones."""
+        self._ensure_table()
+        self._db.execute_sync(REAP_QUERY, float(stale_seconds))
+        self._db.execute_sync(PURGE_QUERY, float(self._retention_seconds))
+
+    def queue_depth(self, kinds: Sequence[str]) -> int:
+        self._ensure_table()
+        return self._db.fetchval_sync(QUEUE_DEPTH_QUERY, list(kinds))
+
+    def _ensure_table(self):
+        if not self._table_ready:
+            self._db.execute_sync(CREATE_TABLE_QUERY)
+            self._table_ready = True
+
+    def _fetchrow(self, query: str, *args):
+        self._ensure_table()
+        return self._db.fetchrow_sync(query, *args)
+
+    @staticmethod
+    def _to_job(row) -> Job:
+        job = dict(row)
+        job["payload"] = job["payload"] or {}
+        return Job(**job)
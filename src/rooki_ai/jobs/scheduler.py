@@ -0,0 +1,267 @@
+import asyncio
+import functools
+import logging
+import math
+import os
+import time
+from typing import Any, Callable, Dict, Optional
+
+from rooki_ai.utils.runtime import get_runtime
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerError(Exception):
+    """Base class for admission failures; carries the HTTP status to surface."""
+
+    status_code = 503
+
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class SchedulerSaturated(SchedulerError):
+    """Every worker slot is busy and the wait queue is full."""
+
+    status_code = 429
+
+
+class SchedulerUnavailable(SchedulerError):
+    """The scheduler is shutting down or a job waited too long for a slot."""
+
+    status_code = 503
+
+
+class JobTimeout(Exception):
+    """A job exceeded JOB_TIMEOUT_SECONDS while running."""
+
+
+# Stage recorded on a job that failed with JobTimeout, so those waiting on it
+# can answer 504 rather than 500
+TIMED_OUT_STAGE = "timed out"
+
+
+class Ticket:
+    """A reserved place in the scheduler's wait queue."""
+
+    __slots__ = ("kind", "enqueued_at", "released")
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.enqueued_at = time.monotonic()
+        self.released = False
+
+
+class CrewScheduler:
+    """Process-wide admission control for crew and flow runs.
+
+    At most `max_concurrent` jobs run at once (MAX_CONCURRENT_JOBS) and at most
+    `max_queued` more may wait for a slot (MAX_QUEUED_JOBS). Anything beyond
+    that is rejected up front with a retry hint rather than piling up in memory.
+
+    Coroutine functions run as tasks on the caller's event loop, so many jobs
+    can be in flight without a thread each; a task that exceeds its timeout
+    is cancelled. Blocking callables run in a worker thread. A thread can't be
+    interrupted, so when a job exceeds its timeout the caller gets
+    `JobTimeout` straight away but the slot stays held until the thread
+    actually returns; this keeps the concurrency cap honest towards the LLM
+    provider.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: Optional[int] = None,
+        max_queued: Optional[int] = None,
+        timeout: Optional[float] = None,
+        queue_timeout: Optional[float] = None,
+    ):
+        if max_concurrent is None:
+            max_concurrent = int(os.environ.get("MAX_CONCURRENT_JOBS", "5"))
+        if max_queued is None:
+            max_queued = int(os.environ.get("MAX_QUEUED_JOBS", str(max_concurrent * 4)))
+        if timeout is None:
+            timeout = float(os.environ.get("JOB_TIMEOUT_SECONDS", "300"))
+        if queue_timeout is None:
+            queue_timeout = float(os.environ.get("JOB_QUEUE_TIMEOUT_SECONDS", str(timeout)))
+
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._closed = False
+        self._waiting = 0
+        self._running = 0
+
+        self._admitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._failed = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+        self._run_max = 0.0
+
+    def reserve(self, kind: str = "crew") -> Ticket:
+        """
+        Claim a place in the wait queue without awaiting.
+
+        Call this on the request path so saturation is reported to the client
+        before any background work is scheduled.
+
+        Raises:
+            SchedulerUnavailable: If the scheduler has been closed
+            SchedulerSaturated: If all slots and queue places are taken
+        """
+        if self._closed:
+            raise SchedulerUnavailable("Server is shutting down", self._retry_after())
+
+        if self._running + self._waiting >= self.max_concurrent + self.max_queued:
+            self._rejected += 1
+            raise SchedulerSaturated(
+                f"Too many concurrent {kind} jobs; try again later",
+                self._retry_after(),
+            )
+
+        self._waiting += 1
+        self._admitted += 1
+        return Ticket(kind)
+
+    def release(self, ticket: Ticket):
+        """Give back a reserved queue place that will not be run."""
+        if not ticket.released:
+            ticket.released = True
+            self._waiting -= 1
+
+    async def run(
+        self,
+        ticket: Ticket,
+        func: Callable[..., Any],
+        *args,
+        on_start: Optional[Callable[[], None]] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Wait for a free slot, then run `func(*args, **kwargs)`: awaited as a
+        task on this loop if it is a coroutine function, otherwise on the
+        shared runtime thread pool.
+
+        Raises:
+            SchedulerUnavailable: If no slot frees up within the queue timeout
+            JobTimeout: If the job runs longer than the job timeout
+        """
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            raise SchedulerUnavailable(
+                f"Timed out waiting for a free {ticket.kind} worker",
+                self._retry_after(),
+            )
+        finally:
+            self.release(ticket)
+
+        waited = time.monotonic() - ticket.enqueued_at
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        self._running += 1
+        started = time.monotonic()
+
+        loop = asyncio.get_running_loop()
+        is_coroutine = asyncio.iscoroutinefunction(func)
+        try:
+            if is_coroutine:
+                future = asyncio.ensure_future(func(*args, **kwargs))
+            else:
+                future = loop.run_in_executor(
+                    get_runtime().executor, functools.partial(func, *args, **kwargs)
+                )
+        except BaseException:
+            self._finish(started, failed=True)
+            raise
+        future.add_done_callback(
+            lambda f: self._finish(
+                started, failed=f.cancelled() or f.exception() is not None
+            )
+        )
+
+        if on_start is not None:
+            on_start()
+
+        try:
+            # Shield so a cancelled caller doesn't drop the accounting for a
+            # job that is still running
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self._timeouts += 1
+            if is_coroutine:
+                # Unlike a thread, a task can be stopped; that frees its slot
+                future.cancel()
+            logger.warning(f"{ticket.kind} job exceeded {self.timeout:g}s timeout")
+            raise JobTimeout(f"{ticket.kind} job timed out after {self.timeout:g}s")
+
+    async def submit(self, kind: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Reserve a queue place and run `func` once a slot is free."""
+        ticket = self.reserve(kind)
+        return await self.run(ticket, func, *args, **kwargs)
+
+    def has_capacity(self) -> bool:
+        """Whether a newly submitted job would start without queueing."""
+        return not self._closed and self._running + self._waiting < self.max_concurrent
+
+    def close(self):
+        """Stop admitting new jobs; running and queued jobs are left to finish."""
+        self._closed = True
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, wait and run times for capacity planning."""
+        started = self._completed + self._failed + self._running
+        finished = self._completed + self._failed
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "running": self._running,
+            "queue_depth": self._waiting,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "completed": self._completed,
+            "failed": self._failed,
+            "timeouts": self._timeouts,
+            "avg_wait_seconds": self._wait_total / started if started else 0.0,
+            "max_wait_seconds": self._wait_max,
+            "avg_run_seconds": self._run_total / finished if finished else 0.0,
+            "max_run_seconds": self._run_max,
+        }
+
+    def _finish(self, started: float, failed: bool):
+        elapsed = time.monotonic() - started
+        self._run_total += elapsed
+        self._run_max = max(self._run_max, elapsed)
+        self._running -= 1
+        if failed:
+            self._failed += 1
+        else:
+            self._completed += 1
+        self._slots.release()
+
+    def _retry_after(self) -> int:
+        """Estimate seconds until a slot frees up, from the mean run time."""
+        finished = self._completed + self._failed
+        avg_run = self._run_total / finished if finished else 30.0
+        backlog = (self._waiting + 1) / max(self.max_concurrent, 1)
+        return max(1, math.ceil(avg_run * backlog))
+
+
+_scheduler: Optional[CrewScheduler] = None
+
+
+def get_scheduler() -> CrewScheduler:
+    """Return the process-wide scheduler, creating it on first use."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = CrewScheduler()
+    return _scheduler
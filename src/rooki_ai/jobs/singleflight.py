@@ -0,0 +1,43 @@
+import asyncio
+from typing import Any, Coroutine, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key onto one running task.
+
+    The first caller for a key launches the work; everyone arriving while it
+    is still running joins the same task and sees the same result, so side
+    effects (crew runs, database writes) happen once per flight. A key is
+    freed as soon as its task finishes, so later calls start a new flight.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, Tuple[asyncio.Task, Any]] = {}
+
+    def join(self, key: Hashable) -> Optional[Tuple[asyncio.Task, Any]]:
+        """Return the (task, context) of the flight in progress for `key`, if any."""
+        return self._flights.get(key)
+
+    def launch(self, key: Hashable, coro: Coroutine, context: Any = None) -> asyncio.Task:
+        """
+        Start `coro` as the flight for `key`.
+
+        Args:
+            key: Identity of the work being coalesced
+            coro: Coroutine performing the work
+            context: Caller data handed to joiners, e.g. the job id
+
+        Raises:
+            RuntimeError: If a flight for `key` is already in progress
+        """
+        if key in self._flights:
+            coro.close()
+            raise RuntimeError(f"Flight already in progress for {key!r}")
+
+        task = asyncio.create_task(coro)
+        self._flights[key] = (task, context)
+        task.add_done_callback(lambda _: self._flights.pop(key, None))
+        return task
+
+    def __len__(self) -> int:
+        return len(self._flights)
@@ -0,0 +1,76 @@
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from rooki_ai.models.jobs import Job
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobStore:
+    """In-process registry of background jobs.
+
+    Jobs are updated from crew worker threads (stage changes) as well as from
+    the event loop, so every access goes through a lock. Finished jobs are kept
+    for JOB_RETENTION_SECONDS so clients can still poll their result.
+    """
+
+    def __init__(self, retention_seconds: Optional[int] = None):
+        if retention_seconds is None:
+            retention_seconds = int(os.environ.get("JOB_RETENTION_SECONDS", "3600"))
+        self._retention = timedelta(seconds=retention_seconds)
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def create(self, kind: str, key: str, payload: Optional[Dict[str, Any]] = None) -> Job:
+        """Register a new queued job for `key`."""
+        job = Job(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            key=key,
+            payload=payload or {},
+            created_at=_utcnow(),
+        )
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find_active(self, kind: str, key: str) -> Optional[Job]:
+        """Return the queued or running job of `kind` for `key`, if any."""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.kind == kind and job.key == key and job.is_active:
+                    return job
+        return None
+
+    def update(self, job_id: str, **fields) -> Job:
+        """Apply `fields` to a job, stamping start/finish times on transitions."""
+        status = fields.get("status")
+        if status == "running":
+            fields.setdefault("started_at", _utcnow())
+        elif status in ("succeeded", "failed"):
+            fields.setdefault("finished_at", _utcnow())
+
+        with self._lock:
+            job = self._jobs[job_id].model_copy(update=fields)
+            self._jobs[job_id] = job
+        return job
+
+    def _prune(self):
+        cutoff = _utcnow() - self._retention
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,165 @@
+import json
+import logging
+import re
+from typing import Any, Callable, Dict, Optional
+
+from rooki_ai.models import VoiceProfileResponse
+
+logger = logging.getLogger(__name__)
+
+# Fallback values used when the crew omits one of the ContentMetrics fields
+METRIC_DEFAULTS = {
+    "post_metrics": {"avg_sentence_len": 15, "imperative_pct": 20, "emoji_rate": 0.05},
+    "reply_metrics": {"avg_sentence_len": 10, "imperative_pct": 15, "emoji_rate": 0.03},
+    "quoted_metrics": {"avg_sentence_len": 12, "imperative_pct": 18, "emoji_rate": 0.02},
+    "long_form_text_metrics": {
+        "avg_sentence_len": 20,
+        "imperative_pct": 10,
+        "emoji_rate": 0.01,
+    },
+}
+
+# Keys used for each metrics block inside the stored voice_config
+VOICE_CONFIG_METRIC_KEYS = {
+    "post_metrics": "post",
+    "reply_metrics": "reply",
+    "quoted_metrics": "quoted",
+    "long_form_text_metrics": "long_form",
+}
+
+
+def _parse_crew_output(raw: Any) -> Dict[str, Any]:
+    """Parse the raw crew output into a dict, extracting embedded JSON if needed."""
+    if not isinstance(raw, str):
+        # If result.raw is already a dict, use it directly
+        return raw
+
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        # If JSON parsing fails, try to extract the JSON part
+        json_match = re.search(r"({[\s\S]*})", raw)
+        if json_match:
+            try:
+                return json.loads(json_match.group(1))
+            except json.JSONDecodeError:
+                pass
+        raise ValueError("Failed to parse crew output")
+
+
+def _with_defaults(result_dict: Dict[str, Any], field: str) -> Dict[str, Any]:
+    metrics = result_dict[field]
+    return {
+        **metrics,
+        **{
+            name: metrics.get(name, default)
+            for name, default in METRIC_DEFAULTS[field].items()
+        },
+    }
+
+
+def run_voice_profile(
+    x_handle: str,
+    pillar: int = 3,
+    guardrail: int = 3,
+    on_stage: Optional[Callable[[str], None]] = None,
+    save: Optional[Callable[[str, str, Any, Dict[str, Any]], Any]] = None,
+) -> VoiceProfileResponse:
+    """
+    Run the voice profile crew for a handle and queue the resulting config
+    for writing to the Voice table.
+
+    The ContentMetrics are computed locally from the handle's corpus and
+    given to the crew; the crew's own figures are only used when there is
+    no corpus.
+
+    This is blocking and can take several minutes; callers on an event loop
+    must run it in a worker thread.
+
+    Args:
+        x_handle: Twitter handle to profile
+        pillar: Number of content pillars to generate
+        guardrail: Number of "do" and "dont" guardrails to generate
+        on_stage: Optional callback notified as the run moves between stages
+        save: Optional replacement for the write-behind queue's `save`, called
+            with (x_handle, positioning, tone, voice_config); its return value
+            is ignored
+
+    Returns:
+        VoiceProfileResponse: The generated voice profile
+
+    Raises:
+        Exception: If the crew fails or its output cannot be parsed
+    """
+
+    # Deferred so importing this module (and the API) doesn't load crewai
+    from rooki_ai.crews.factory import get_crew
+    from rooki_ai.crews.voice_profile.voice_profile import VoiceProfileCrew
+    from rooki_ai.jobs.write_behind import get_voice_writer
+    from rooki_ai.utils.style_metrics import format_metrics, handle_metrics
+
+    if save is None:
+        save = get_voice_writer().save
+
+    def stage(name: str):
+        if on_stage is not None:
+            on_stage(name)
+
+    inputs = {
+        "x_handle": x_handle,
+        "pillar": pillar,
+        "guardrail": guardrail,
+    }
+
+    try:
+        stage("metrics")
+        content_metrics = handle_metrics(x_handle)
+        inputs["content_metrics"] = format_metrics(content_metrics)
+
+        stage("crew")
+        result = get_crew(VoiceProfileCrew).kickoff(inputs=inputs)
+        print(f"Voice guide generated for {x_handle}: {result}")
+        if not result:
+            raise ValueError("Failed to generate voice profile")
+
+        stage("parsing")
+        result_dict = _parse_crew_output(result.raw)
+        if content_metrics is not None:
+            metrics = content_metrics
+        else:
+            metrics = {field: _with_defaults(result_dict, field) for field in METRIC_DEFAULTS}
+
+        voice_config = {
+            "positioning": result_dict.get("positioning", "N/A"),
+            "tone": result_dict.get("tone", "N/A"),
+            "pillars": result_dict["pillars"],
+            "guardrails": result_dict["guardrails"],
+            "metrics": {
+                VOICE_CONFIG_METRIC_KEYS[field]: values
+                for field, values in metrics.items()
+            },
+        }
+
+        # Construct response using the parsed dictionary
+        response = VoiceProfileResponse(
+            positioning=result_dict["positioning"],
+            tone=result_dict["tone"],
+            pillars=result_dict["pillars"],
+            guardrails=result_dict["guardrails"],
+            **metrics,
+        )
+
+        # Update the voice config in Supabase
+        stage("saving")
+        # Queued, not written: the write-behind queue logs configs it fails to save
+        save(
+            x_handle,
+            result_dict["positioning"],
+            result_dict["tone"],
+            voice_config,
+        )
+
+        return response
+    except Exception as e:
+        raise Exception(f"An error occurred while running the crew: {e}")
+
@@ -0,0 +1,235 @@
+import asyncio
+import concurrent.futures
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from rooki_ai.utils.db import Database, get_db, transient_database_errors
+from rooki_ai.utils.runtime import get_runtime
+from rooki_ai.utils.update_voice_config_in_supabase import (
+    update_voice_configs_in_supabase,
+    upsert_voice_configs,
+    voice_config_rows,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingWrite:
+    __slots__ = ("update", "futures")
+
+    def __init__(self, update: tuple):
+        self.update = update
+        self.futures: List[concurrent.futures.Future] = []
+
+
+class VoiceWriteBehind:
+    """Write-behind queue for generated voice configs.
+
+    `save` has the `update_voice_config_in_supabase` signature and returns as
+    soon as the config is queued, so crew runs and API responses don't wait
+    on the database. A flusher task on the shared runtime loop upserts queued
+    configs in batches of up to VOICE_WRITE_BATCH_SIZE, waiting
+    VOICE_WRITE_MAX_DELAY_MS after the first one for a batch to form. A newer
+    config for a handle that is still queued replaces the older one.
+
+    Transient database errors are retried with exponential backoff, up to
+    VOICE_WRITE_MAX_RETRIES times; anything else fails the batch. `close`
+    (called on API and worker shutdown) flushes everything queued; saves
+    arriving after that are written synchronously.
+    """
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        max_delay: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        db: Optional[Database] = None,
+    ):
+        if batch_size is None:
+            batch_size = int(os.environ.get("VOICE_WRITE_BATCH_SIZE", "50"))
+        if max_delay is None:
+            max_delay = float(os.environ.get("VOICE_WRITE_MAX_DELAY_MS", "100")) / 1000
+        if max_retries is None:
+            max_retries = int(os.environ.get("VOICE_WRITE_MAX_RETRIES", "5"))
+
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+        self._db = db or get_db()
+
+        self._pending: "OrderedDict[str, _PendingWrite]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[concurrent.futures.Future] = None
+        self._closed = False
+
+        self._written = 0
+        self._failed = 0
+        self._retries = 0
+        self._batches = 0
+
+    def save(
+        self, x_handle: str, positioning: str, tone: Any, voice_config: Dict[str, Any]
+    ) -> concurrent.futures.Future:
+        """
+        Queue a voice config for writing and return immediately.
+
+        A config that still can't be written after all retries is logged as
+        an error against its handle.
+
+        Returns:
+            The `enqueue` future
+        """
+        future = self.enqueue(x_handle, positioning, tone, voice_config)
+        future.add_done_callback(lambda f: _log_failed_write(x_handle, f))
+        return future
+
+    def enqueue(
+        self, x_handle: str, positioning: str, tone: Any, voice_config: Dict[str, Any]
+    ) -> concurrent.futures.Future:
+        """
+        Queue a voice config for writing; safe to call from any thread.
+
+        Returns:
+            Future resolving to True once the config is written, or False if
+            writing it failed for good
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        update = (x_handle, positioning, tone, voice_config)
+
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                entry = self._pending.pop(x_handle, None)
+                if entry is None:
+                    entry = _PendingWrite(update)
+                else:
+                    entry.update = update
+                entry.futures.append(future)
+                # Re-queued handles move to the back, behind older writes
+                self._pending[x_handle] = entry
+                self._ensure_flusher()
+
+        if closed:
+            future.set_result(update_voice_configs_in_supabase([update]))
+            return future
+
+        runtime = get_runtime()
+        runtime.loop.call_soon_threadsafe(self._wakeup.set)
+        return future
+
+    async def aclose(self, timeout: float = 30):
+        """Flush queued writes and stop the flusher; usable from any event loop."""
+        flusher = self._stop()
+        if flusher is not None:
+            try:
+                await asyncio.wait_for(asyncio.wrap_future(flusher), timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"Gave up flushing {len(self._pending)} queued voice configs")
+
+    def close(self, timeout: float = 30):
+        """Blocking counterpart of `aclose`."""
+        flusher = self._stop()
+        if flusher is not None:
+            try:
+                flusher.result(timeout)
+            except concurrent.futures.TimeoutError:
+                logger.error(f"Gave up flushing {len(self._pending)} queued voice configs")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "written": self._written,
+            "failed": self._failed,
+            "retries": self._retries,
+            "batches": self._batches,
+            "closed": self._closed,
+        }
+
+    def _ensure_flusher(self):
+        # Called with the lock held
+        if self._flusher is None:
+            self._wakeup = asyncio.Event()
+            self._flusher = get_runtime().run_coroutine(self._run())
+
+    def _stop(self) -> Optional[concurrent.futures.Future]:
+        with self._lock:
+            self._closed = True
+            flusher = self._flusher
+        if flusher is not None and not flusher.done():
+            get_runtime().loop.call_soon_threadsafe(self._wakeup.set)
+        return flusher
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if not self._closed:
+                # Give concurrent runs a moment to join the batch
+                await asyncio.sleep(self.max_delay)
+
+            while True:
+                with self._lock:
+                    handles = list(self._pending)[: self.batch_size]
+                    batch = [self._pending.pop(x_handle) for x_handle in handles]
+                if not batch:
+                    break
+                await self._write(batch)
+
+            if self._closed:
+                return
+
+    async def _write(self, batch: List[_PendingWrite]):
+        rows = voice_config_rows(entry.update for entry in batch)
+        success = False
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._db.run(lambda conn: upsert_voice_configs(conn, rows))
+                success = True
+                break
+            except transient_database_errors() as e:
+                if attempt == self.max_retries:
+                    logger.error(f"Giving up on {len(rows)} voice configs: {e}")
+                    break
+                self._retries += 1
+                delay = min(0.5 * 2**attempt, 30)
+                logger.warning(f"Voice config write failed ({e}); retrying in {delay:g}s")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                logger.error(f"Failed to write {len(rows)} voice configs: {e}")
+                break
+
+        self._batches += 1
+        if success:
+            self._written += len(rows)
+            logger.info(f"Saved voice configs for: {', '.join(rows)}")
+        else:
+            self._failed += len(rows)
+
+        for entry in batch:
+            for future in entry.futures:
+                future.set_result(success)
+
+
+def _log_failed_write(x_handle: str, future: concurrent.futures.Future):
+    if not future.result():
+        logger.error(f"Voice config for {x_handle} was not saved")
+
+
+_writer: Optional[VoiceWriteBehind] = None
+_writer_lock = threading.Lock()
+
+
+def get_voice_writer() -> VoiceWriteBehind:
+    """Return the process-wide voice config write-behind queue."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = VoiceWriteBehind()
+    return _writer
@@ -2,9 +2,13 @@
 import sys
 import warnings
 
+from dotenv import load_dotenv
+
 from rooki_ai.crews import VoiceProfileCrew
 from rooki_ai.flows.coach import CoachFlow
 
+load_dotenv()
+
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
 # This main file is intended to be a way for you to run your
@@ -1,6 +1,14 @@
 from .api import VoiceProfileRequest, VoiceProfileResponse
 from .coach import RouteAnswer
 from .daily_prep import Tweets
+from .jobs import (
+    Job,
+    JobAccepted,
+    JobStatus,
+    VoiceProfileBatchAccepted,
+    VoiceProfileBatchItem,
+)
+from .tweet import Tweet
 from .voice_profile import CorpusOut, GuardrailItem, PillarItem, StyleProfile, VoiceTone
 
 __all__ = [
@@ -12,5 +20,11 @@ __all__ = [
     "StyleProfile",
     "VoiceTone",
     "RouteAnswer",
+    "Tweet",
     "Tweets",
+    "Job",
+    "JobAccepted",
+    "JobStatus",
+    "VoiceProfileBatchAccepted",
+    "VoiceProfileBatchItem",
 ]
@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class Job(BaseModel):
+    """
+    A unit of background work tracked by the job store.
+
+    `key` identifies the resource the job operates on (e.g. the x_handle of a
+    voice profile run) and is what concurrency checks are made against.
+    `payload` holds the job inputs for out-of-process workers; it is not part
+    of the API response.
+    """
+
+    id: str
+    kind: str
+    key: str
+    payload: Dict[str, Any] = Field(default_factory=dict, exclude=True)
+    status: JobStatus = "queued"
+    stage: str = "queued"
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ("queued", "running")
+
+
+class JobAccepted(BaseModel):
+    job_id: str
+    status: JobStatus
+    status_url: str
+
+
+class VoiceProfileBatchItem(BaseModel):
+    """Per-handle outcome of a batch submission: its job, or why none was started."""
+
+    x_handle: str
+    job_id: Optional[str] = None
+    status: Optional[JobStatus] = None
+    status_url: Optional[str] = None
+    error: Optional[str] = None
+
+
+class VoiceProfileBatchAccepted(BaseModel):
+    jobs: List[VoiceProfileBatchItem]
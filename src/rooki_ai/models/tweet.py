@@ -0,0 +1,79 @@
+import sys
+from typing import Any, Dict, Iterable, Iterator, NamedTuple
+
+from rooki_ai.utils import tweet_fields
+
+# The counters Tweet keeps, in field order, with every alias they go by
+_COUNTER_KEYS = (
+    tweet_fields.LIKE_KEYS,
+    tweet_fields.RETWEET_KEYS,
+    tweet_fields.REPLY_KEYS,
+    tweet_fields.QUOTE_KEYS,
+    tweet_fields.VIEW_KEYS,
+)
+
+
+class Tweet(NamedTuple):
+    """One tweet, reduced to the fields the crews use.
+
+    Storage exports carry every key the scraper saw (user objects, entities,
+    media, ...); a Tweet keeps the id, text, type, timestamp and engagement
+    counters, whichever aliases the export used for them. Being a tuple it
+    has no per-instance dict, so a large corpus costs little more than its
+    text.
+    """
+
+    id: str
+    text: str
+    # "post", "reply", "quote" or "retweet"
+    type: str
+    created_at: str
+    likes: int = 0
+    retweets: int = 0
+    replies: int = 0
+    quotes: int = 0
+    views: int = 0
+
+    @classmethod
+    def from_dict(cls, tweet: Dict[str, Any]) -> "Tweet":
+        """Decode a raw tweet object from a storage export."""
+        created_at = tweet.get("created_at")
+        return cls._make(
+            (
+                tweet_fields.tweet_id(tweet),
+                tweet_fields.text(tweet),
+                # A handful of distinct values shared by every tweet
+                sys.intern(tweet_fields.tweet_type(tweet)),
+                created_at if isinstance(created_at, str) else "",
+                *tweet_fields.counts(tweet, _COUNTER_KEYS),
+            )
+        )
+
+    @property
+    def engagement(self) -> int:
+        """Likes + retweets + replies, as ranked by `tweet_fields.engagement`."""
+        return self.likes + self.retweets + self.replies
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the tweet in X API v2 shape, which every tweet_fields alias lookup reads."""
+        return {
+            "id": self.id,
+            "type": self.type,
+            "created_at": self.created_at,
+            "text": self.text,
+            "public_metrics": {
+                "like_count": self.likes,
+                "retweet_count": self.retweets,
+                "reply_count": self.replies,
+                "quote_count": self.quotes,
+                "impression_count": self.views,
+            },
+        }
+
+
+def decode_tweets(records: Iterable[Any]) -> Iterator[Tweet]:
+    """Decode the tweet objects of a parsed export, skipping anything that isn't one."""
+    from_dict = Tweet.from_dict
+    for record in records:
+        if isinstance(record, dict):
+            yield from_dict(record)
@@ -1,13 +1,40 @@
-from .get_trending_tweets_tool import GetTrendingTweetsTool
-from .json_schema_validator_tool import JSONSchemaValidatorTool
-from .supabase_get_voice_tool import SupabaseGetVoiceTool
-from .supabase_user_tweets_storage_url_tool import SupabaseUserTweetsStorageUrlTool
-from .tweet_history_storage_tool import TweetHistoryStorageTool
-from .tweet_mcp_tool import TweetMCPTool
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .get_trending_tweets_tool import GetTrendingTweetsTool
+    from .json_schema_validator_tool import JSONSchemaValidatorTool
+    from .style_metrics_tool import StyleMetricsTool
+    from .supabase_get_voice_tool import SupabaseGetVoiceTool
+    from .supabase_user_tweets_storage_url_tool import SupabaseUserTweetsStorageUrlTool
+    from .text_normalize_tool import TextNormalizeTool
+    from .tweet_history_storage_tool import TweetHistoryStorageTool
+    from .tweet_mcp_tool import TweetMCPTool
+
+# Tools pull in crewai, database drivers and SDKs, so each one is imported on
+# first access rather than when the package is imported
+_LAZY_IMPORTS = {
+    "GetTrendingTweetsTool": ".get_trending_tweets_tool",
+    "JSONSchemaValidatorTool": ".json_schema_validator_tool",
+    "StyleMetricsTool": ".style_metrics_tool",
+    "SupabaseGetVoiceTool": ".supabase_get_voice_tool",
+    "SupabaseUserTweetsStorageUrlTool": ".supabase_user_tweets_storage_url_tool",
+    "TextNormalizeTool": ".text_normalize_tool",
+    "TweetHistoryStorageTool": ".tweet_history_storage_tool",
+    "TweetMCPTool": ".tweet_mcp_tool",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
 # from .jsonl_reader_tool import JSONLReaderTool
-# from .text_normalize_tool import TextNormalizeTool
-# from .style_metrics_tool import StyleMetricsTool
 # from .influencer_metrics_tool import InfluencerMetricsTool
 
 # Creating a mock TemplateLibraryTool as it wasn't implemented yet
@@ -39,9 +66,9 @@ __all__ = [
     "GetTrendingTweetsTool",
     "SupabaseGetVoiceTool",
     "TweetMCPTool",
+    "StyleMetricsTool",
+    "TextNormalizeTool",
     # "JSONLReaderTool",
-    # "TextNormalizeTool",
-    # "StyleMetricsTool",
     # "InfluencerMetricsTool",
     # "TemplateLibraryTool"
 ]
@@ -4,12 +4,18 @@ from typing import Any, Dict, List
 import httpx
 from crewai.tools import BaseTool
 
+from rooki_ai.utils.http_cache import get_http_cache
+from rooki_ai.utils.trending import parse_tweets
+
 
 class GetTrendingTweetsTool(BaseTool):
     """Tool for fetching trending tweets data from a provided URL.
 
     This tool allows agents to fetch trending tweets data from a provided URL
-    and return the data in a format suitable for analysis.
+    and return the data in a format suitable for analysis. Payloads are kept
+    in the HTTP disk cache and revalidated with conditional requests, so most
+    calls are a local read. Request paths should prefer the ranked snapshot
+    kept by `rooki_ai.utils.trending`.
     """
 
     name: str = "GetTrendingTweetsTool"
@@ -29,33 +35,8 @@ class GetTrendingTweetsTool(BaseTool):
             Exception: If there's an error fetching or parsing the data
         """
         try:
-            with httpx.Client(timeout=30.0) as client:
-                response = client.get(url)
-                response.raise_for_status()
-
-                # Handle different response formats
-                content_type = response.headers.get("content-type", "")
-                if "application/json" in content_type:
-                    data = response.json()
-                else:
-                    # Try to parse as JSON anyway
-                    try:
-                        data = response.json()
-                    except json.JSONDecodeError:
-                        # Try to parse as JSONL
-                        lines = response.text.strip().split("\n")
-                        data = [json.loads(line) for line in lines if line.strip()]
-
-                # Normalize the response structure
-                if isinstance(data, dict):
-                    # If it's a single object, convert to list
-                    if "tweets" in data:
-                        return data["tweets"]
-                    return [data]
-                elif isinstance(data, list):
-                    return data
-                else:
-                    raise ValueError(f"Unexpected data format: {type(data)}")
+            body = get_http_cache().get_sync(url)
+            return parse_tweets(body.content, body.content_type)
 
         except httpx.HTTPError as e:
             raise Exception(f"Error fetching trending tweets: {str(e)}")
@@ -78,33 +59,8 @@ class GetTrendingTweetsTool(BaseTool):
             Exception: If there's an error fetching or parsing the data
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-
-                # Handle different response formats
-                content_type = response.headers.get("content-type", "")
-                if "application/json" in content_type:
-                    data = response.json()
-                else:
-                    # Try to parse as JSON anyway
-                    try:
-                        data = response.json()
-                    except json.JSONDecodeError:
-                        # Try to parse as JSONL
-                        lines = response.text.strip().split("\n")
-                        data = [json.loads(line) for line in lines if line.strip()]
-
-                # Normalize the response structure
-                if isinstance(data, dict):
-                    # If it's a single object, convert to list
-                    if "tweets" in data:
-                        return data["tweets"]
-                    return [data]
-                elif isinstance(data, list):
-                    return data
-                else:
-                    raise ValueError(f"Unexpected data format: {type(data)}")
+            body = await get_http_cache().get(url)
+            return parse_tweets(body.content, body.content_type)
 
         except httpx.HTTPError as e:
             raise Exception(f"Error fetching trending tweets: {str(e)}")
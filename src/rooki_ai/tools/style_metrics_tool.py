@@ -0,0 +1,73 @@
+import asyncio
+import json
+from typing import Dict
+
+import httpx
+from crewai.tools import BaseTool
+
+from rooki_ai.utils.style_metrics import corpus_metrics
+
+
+class StyleMetricsTool(BaseTool):
+    """Tool for computing the ContentMetrics of a tweet corpus locally.
+
+    Sentence length, imperative share and emoji rate are counted in code for
+    posts, replies, quotes and long-form tweets, in one pass over the corpus,
+    so agents don't spend LLM calls (and get different numbers) estimating
+    them.
+    """
+
+    name: str = "StyleMetricsTool"
+    description: str = (
+        "Compute avg_sentence_len, imperative_pct and emoji_rate for the posts, "
+        "replies, quotes and long-form tweets of the corpus at a storage URL"
+    )
+
+    def _run(self, storage_url: str) -> Dict[str, Dict[str, float]]:
+        """
+        Compute the ContentMetrics of each content type for a tweet corpus.
+
+        Args:
+            storage_url: URL to the JSON file containing tweet history data
+
+        Returns:
+            dict: post_metrics, reply_metrics, quoted_metrics and
+            long_form_text_metrics
+
+        Raises:
+            Exception: If there's an error fetching or parsing the corpus
+        """
+        try:
+            return corpus_metrics(storage_url)
+
+        except httpx.HTTPError as e:
+            raise Exception(f"Error fetching tweet history: {str(e)}")
+        except json.JSONDecodeError as e:
+            raise Exception(f"Invalid JSON data: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error computing style metrics: {str(e)}")
+
+    async def _arun(self, storage_url: str) -> Dict[str, Dict[str, float]]:
+        """
+        Asynchronously compute the ContentMetrics of each content type for a tweet corpus.
+
+        Args:
+            storage_url: URL to the JSON file containing tweet history data
+
+        Returns:
+            dict: post_metrics, reply_metrics, quoted_metrics and
+            long_form_text_metrics
+
+        Raises:
+            Exception: If there's an error fetching or parsing the corpus
+        """
+        try:
+            # Counting is CPU-bound; keep it off the event loop
+            return await asyncio.to_thread(corpus_metrics, storage_url)
+
+        except httpx.HTTPError as e:
+            raise Exception(f"Error fetching tweet history: {str(e)}")
+        except json.JSONDecodeError as e:
+            raise Exception(f"Invalid JSON data: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error computing style metrics: {str(e)}")
@@ -5,12 +5,10 @@ from typing import Optional
 
 import asyncpg
 import httpx
-import psycopg2
 from crewai.tools import BaseTool
-from dotenv import load_dotenv
 from pydantic import Field
 
-load_dotenv()
+from rooki_ai.utils.voice_cache import get_voice_cache
 
 
 class SupabaseGetVoiceTool(BaseTool):
@@ -29,7 +27,7 @@ class SupabaseGetVoiceTool(BaseTool):
 
     def _run(self, user_id: str) -> str:
         """
-        Query Supabase to get the storage_url for a given userId using asyncpg.
+        Query Supabase for the voice profile of a given userId through the Voice cache.
         Args:
             user_id: The user_id to look up in the voice table
         Returns:
@@ -38,35 +36,18 @@ class SupabaseGetVoiceTool(BaseTool):
             ValueError: If no record is found or if credentials are missing
             Exception: For other errors such as database connection issues
         """
-        # Get PostgreSQL connection string from environment variables or use default
-        db_url = self._get_env_var("DATABASE_URL")
-
         try:
-            # Connect to the PostgreSQL database
-            conn = psycopg2.connect(db_url)
-            cursor = conn.cursor()
-
-            # Query the voice table for the storage_url (lowercase table name)
-            query = 'SELECT * FROM public."Voice" WHERE "userId" = %s'
-            cursor.execute(query, (user_id,))
-
-            # Fetch the result
-            result = cursor.fetchone()
+            # Read through the process-wide Voice cache
+            return get_voice_cache().get_by_user(user_id)
 
-            # Close the database connection
-            cursor.close()
-            conn.close()
-
-            return result
-
-        except psycopg2.Error as e:
+        except asyncpg.PostgresError as e:
             raise Exception(f"Error connecting to PostgreSQL database: {str(e)}")
         except Exception as e:
             raise Exception(f"Error processing request: {str(e)}")
 
     async def _arun(self, user_id: str) -> str:
         """
-        Query Supabase to get the storage_url for a given user_id using asyncpg.
+        Query Supabase for the voice profile of a given user_id through the Voice cache.
         Args:
             user_id: The user_id to look up in the voice table
         Returns:
@@ -76,22 +57,10 @@ class SupabaseGetVoiceTool(BaseTool):
             Exception: For other errors such as database connection issues
         """
 
-        # Get PostgreSQL connection string from environment variables or use default
-        db_url = self._get_env_var("DATABASE_URL")
-        print(
-            f"Connecting to PostgreSQL database asynchronously with user_id: {user_id}"
-        )
+        print(f"Fetching voice profile asynchronously with user_id: {user_id}")
 
         try:
-            # Connect to the PostgreSQL database asynchronously
-            conn = await asyncpg.connect(db_url)
-
-            # Query the voice table for the storage_url (lowercase table name)
-            query = 'SELECT * FROM public."Voice" WHERE "userId" = $1'
-            result = await conn.fetchrow(query, user_id)
-
-            # Close the database connection
-            await conn.close()
+            result = await get_voice_cache().get_by_user_async(user_id)
 
             if not result:
                 raise ValueError(f"No record found for user_id: {user_id}")
@@ -1,15 +1,14 @@
 import os
 import httpx
 import re
-import psycopg2
 import asyncio
 import asyncpg
 from typing import Optional
 from crewai.tools import BaseTool
 from pydantic import Field
-from dotenv import load_dotenv
 
-load_dotenv()
+from rooki_ai.utils.voice_cache import get_voice_cache
+
 
 class SupabaseUserTweetsStorageUrlTool(BaseTool):
     """Tool for querying Supabase to get tweet storage URLs.
@@ -27,7 +26,7 @@ class SupabaseUserTweetsStorageUrlTool(BaseTool):
         
     def _run(self, x_handle: str) -> str:
         """
-        Query Supabase to get the storage_url for a given x_handle using direct PostgreSQL connection.
+        Query Supabase to get the storage_url for a given x_handle through the Voice cache.
         
         Args:
             x_handle: The Twitter handle to look up in the voice table
@@ -39,30 +38,21 @@ class SupabaseUserTweetsStorageUrlTool(BaseTool):
             ValueError: If no record is found or if credentials are missing
             Exception: For other errors such as database connection issues
         """
-        # Get PostgreSQL connection string from environment variables or use default
-        db_url = self._get_env_var("DATABASE_URL")       
-        print(f"Connecting to PostgreSQL database with handle: {x_handle}")
+        print(f"Looking up storage_url with handle: {x_handle}")
             
         try:
-            # Connect to the PostgreSQL database
-            conn = psycopg2.connect(db_url)
-            cursor = conn.cursor()
-            
-            # Query the voice table for the storage_url (lowercase table name)
-            query = "SELECT storage_url FROM public.\"Voice\" WHERE x_handle = %s"
-            cursor.execute(query, (x_handle,))
-            
-            # Fetch the result
-            result = cursor.fetchone()
-            
-            # Close the database connection
-            cursor.close()
-            conn.close()
+            # Read through the process-wide Voice cache
+            cache = get_voice_cache()
+            result = cache.get_by_handle(x_handle)
+            if result and not result["storage_url"]:
+                # The corpus upload may have landed since the row was cached
+                cache.invalidate([x_handle])
+                result = cache.get_by_handle(x_handle)
             
             if not result:
                 raise ValueError(f"No record found for x_handle: {x_handle}")
                 
-            storage_url = result[0]
+            storage_url = result['storage_url']
             
             if not storage_url:
                 raise ValueError(f"Record found for {x_handle}, but storage_url is missing")
@@ -70,7 +60,7 @@ class SupabaseUserTweetsStorageUrlTool(BaseTool):
             print(f"Successfully retrieved storage_url for {x_handle}")
             return storage_url
                 
-        except psycopg2.Error as e:
+        except asyncpg.PostgresError as e:
             raise Exception(f"Error connecting to PostgreSQL database: {str(e)}")
         except Exception as e:
             raise Exception(f"Error processing request: {str(e)}")
@@ -78,7 +68,7 @@ class SupabaseUserTweetsStorageUrlTool(BaseTool):
 
     async def _arun(self, x_handle: str) -> str:
         """
-        Asynchronously query Supabase to get the storage_url for a given x_handle using direct PostgreSQL connection.
+        Asynchronously query Supabase to get the storage_url for a given x_handle through the Voice cache.
         
         Args:
             x_handle: The Twitter handle to look up in the voice table
@@ -90,20 +80,14 @@ class SupabaseUserTweetsStorageUrlTool(BaseTool):
             ValueError: If no record is found or if credentials are missing
             Exception: For other errors such as database connection issues
         """
-        # Get PostgreSQL connection string from environment variables or use default
-        db_url = self._get_env_var("DATABASE_URL")       
-        print(f"Connecting to PostgreSQL database asynchronously with handle: {x_handle}")
+        print(f"Looking up storage_url asynchronously with handle: {x_handle}")
             
         try:
-            # Connect to the PostgreSQL database asynchronously
-            conn = await asyncpg.connect(db_url)
-            
-            # Query the voice table for the storage_url (lowercase table name)
-            query = "SELECT storage_url FROM public.\"Voice\" WHERE x_handle = $1"
-            result = await conn.fetchrow(query, x_handle)
-            
-            # Close the database connection
-            await conn.close()
+            cache = get_voice_cache()
+            result = await cache.get_by_handle_async(x_handle)
+            if result and not result["storage_url"]:
+                cache.invalidate([x_handle])
+                result = await cache.get_by_handle_async(x_handle)
             
             if not result:
                 raise ValueError(f"No record found for x_handle: {x_handle}")
@@ -0,0 +1,81 @@
+import asyncio
+import json
+from typing import Dict, List
+
+import httpx
+from crewai.tools import BaseTool
+
+from rooki_ai.utils.text_normalize import normalize_corpus
+
+
+def _normalized_samples(storage_url: str, mentions: str) -> List[Dict[str, str]]:
+    return [
+        {"id": tweet.id, "type": tweet.type, "text": tweet.text}
+        for tweet in normalize_corpus(storage_url, mentions)
+    ]
+
+
+class TextNormalizeTool(BaseTool):
+    """Tool for getting the cleaned text of a tweet corpus.
+
+    URLs are stripped, whitespace collapsed, reply addressees dropped and
+    mentions kept, masked or dropped, while emojis and hashtags are kept as
+    written. This is done locally in one pass per tweet, so agents don't
+    spend LLM calls cleaning the corpus.
+    """
+
+    name: str = "TextNormalizeTool"
+    description: str = (
+        "Get the normalized text of every tweet in the corpus at a storage URL: "
+        "URLs removed, whitespace collapsed, emojis and hashtags preserved. "
+        "mentions is 'keep', 'mask' or 'drop'"
+    )
+
+    def _run(self, storage_url: str, mentions: str = "keep") -> List[Dict[str, str]]:
+        """
+        Normalize the text of each tweet in a corpus.
+
+        Args:
+            storage_url: URL to the JSON file containing tweet history data
+            mentions: "keep", "mask" or "drop" @mentions in the text
+
+        Returns:
+            list: id, type and normalized text of each tweet that has text left
+
+        Raises:
+            Exception: If there's an error fetching or parsing the corpus
+        """
+        try:
+            return _normalized_samples(storage_url, mentions)
+
+        except httpx.HTTPError as e:
+            raise Exception(f"Error fetching tweet history: {str(e)}")
+        except json.JSONDecodeError as e:
+            raise Exception(f"Invalid JSON data: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error normalizing tweet text: {str(e)}")
+
+    async def _arun(self, storage_url: str, mentions: str = "keep") -> List[Dict[str, str]]:
+        """
+        Asynchronously normalize the text of each tweet in a corpus.
+
+        Args:
+            storage_url: URL to the JSON file containing tweet history data
+            mentions: "keep", "mask" or "drop" @mentions in the text
+
+        Returns:
+            list: id, type and normalized text of each tweet that has text left
+
+        Raises:
+            Exception: If there's an error fetching or parsing the corpus
+        """
+        try:
+            # Normalizing is CPU-bound; keep it off the event loop
+            return await asyncio.to_thread(_normalized_samples, storage_url, mentions)
+
+        except httpx.HTTPError as e:
+            raise Exception(f"Error fetching tweet history: {str(e)}")
+        except json.JSONDecodeError as e:
+            raise Exception(f"Invalid JSON data: {str(e)}")
+        except Exception as e:
+            raise Exception(f"Error normalizing tweet text: {str(e)}")
@@ -1,8 +1,20 @@
+import asyncio
 import httpx
 import json
 from typing import Dict, Any, List 
 from crewai.tools import BaseTool
 
+from rooki_ai.utils.corpus_store import get_corpus_store
+
+
+def _load_tweets(storage_url: str) -> List[Dict[str, Any]]:
+    # Repeat runs over the same corpus read the local columnar copy instead
+    # of downloading and decoding the JSON again. Only the fields a Tweet
+    # keeps are passed on; the rest of the export is noise to the agents.
+    with get_corpus_store().open_sync(storage_url) as corpus:
+        return [tweet.to_dict() for tweet in corpus.tweets()]
+
+
 class TweetHistoryStorageTool(BaseTool):
     """Tool for fetching tweet history data from a storage URL.
     
@@ -21,40 +33,15 @@ class TweetHistoryStorageTool(BaseTool):
             storage_url: URL to the JSON file containing tweet history data
             
         Returns:
-            List of tweet data objects
+            List of tweet data objects with id, type, created_at, text and
+            public_metrics
             
         Raises:
             Exception: If there's an error fetching or parsing the data
         """
         try:
-            with httpx.Client(timeout=30.0) as client:
-                response = client.get(storage_url)
-                response.raise_for_status()
-                
-                # Handle different response formats
-                content_type = response.headers.get('content-type', '')
-                if 'application/json' in content_type:
-                    data = response.json()
-                else:
-                    # Try to parse as JSON anyway
-                    try:
-                        data = response.json()
-                    except json.JSONDecodeError:
-                        # Try to parse as JSONL
-                        lines = response.text.strip().split('\n')
-                        data = [json.loads(line) for line in lines if line.strip()]
+            return _load_tweets(storage_url)
                 
-                # Normalize the response structure
-                if isinstance(data, dict):
-                    # If it's a single object, convert to list
-                    if 'tweets' in data:
-                        return data['tweets']
-                    return [data]
-                elif isinstance(data, list):
-                    return data
-                else:
-                    raise ValueError(f"Unexpected data format: {type(data)}")
-                    
         except httpx.HTTPError as e:
             raise Exception(f"Error fetching tweet history: {str(e)}")
         except json.JSONDecodeError as e:
@@ -70,40 +57,16 @@ class TweetHistoryStorageTool(BaseTool):
             storage_url: URL to the JSON file containing tweet history data
             
         Returns:
-            List of tweet data objects
+            List of tweet data objects with id, type, created_at, text and
+            public_metrics
             
         Raises:
             Exception: If there's an error fetching or parsing the data
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(storage_url)
-                response.raise_for_status()
-                
-                # Handle different response formats
-                content_type = response.headers.get('content-type', '')
-                if 'application/json' in content_type:
-                    data = response.json()
-                else:
-                    # Try to parse as JSON anyway
-                    try:
-                        data = response.json()
-                    except json.JSONDecodeError:
-                        # Try to parse as JSONL
-                        lines = response.text.strip().split('\n')
-                        data = [json.loads(line) for line in lines if line.strip()]
+            # Parsing is CPU-bound; keep it off the event loop
+            return await asyncio.to_thread(_load_tweets, storage_url)
                 
-                # Normalize the response structure
-                if isinstance(data, dict):
-                    # If it's a single object, convert to list
-                    if 'tweets' in data:
-                        return data['tweets']
-                    return [data]
-                elif isinstance(data, list):
-                    return data
-                else:
-                    raise ValueError(f"Unexpected data format: {type(data)}")
-                    
         except httpx.HTTPError as e:
             raise Exception(f"Error fetching tweet history: {str(e)}")
         except json.JSONDecodeError as e:
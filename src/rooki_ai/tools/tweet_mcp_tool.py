@@ -2,7 +2,6 @@
 Tool for generating tweets using the Tweet MCP server.
 """
 
-import asyncio
 import os
 from typing import Annotated, Optional
 
@@ -10,6 +9,8 @@ from crewai.tools import BaseTool
 from dedalus_labs import AsyncDedalus, DedalusRunner
 from pydantic import BaseModel, Field
 
+from rooki_ai.utils.runtime import get_runtime
+
 
 class TweetMCPToolSchema(BaseModel):
     """Schema for TweetMCPTool arguments"""
@@ -54,28 +55,11 @@ class TweetMCPTool(BaseTool):
         server = mcp_server if mcp_server is not None else self.default_mcp_server
 
         try:
-            # Check if we're already in an event loop
-            try:
-                loop = asyncio.get_running_loop()
-                is_running_loop = True
-            except RuntimeError:
-                is_running_loop = False
-
-            # If we're already in an event loop, use it
-            if is_running_loop:
-                # Create a new thread to run the async code without blocking the main thread
-                import concurrent.futures
-
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(
-                        lambda: asyncio.new_event_loop().run_until_complete(
-                            self._async_generate_tweet(input_prompt, server)
-                        )
-                    )
-                    return future.result()
-            else:
-                # No event loop running, we can create one
-                return asyncio.run(self._async_generate_tweet(input_prompt, server))
+            # Run on the shared background loop rather than creating a new
+            # event loop (and thread) for every call
+            return get_runtime().run_sync(
+                self._async_generate_tweet(input_prompt, server)
+            )
         except Exception as e:
             raise Exception(f"Error generating tweet: {str(e)}")
 
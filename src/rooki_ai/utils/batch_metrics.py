@@ -0,0 +1,543 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from itertools import islice
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # the "metrics" extra isn't installed; the scalar engine is used
+    np = None
+
+from rooki_ai.models.tweet import Tweet
+from rooki_ai.utils.corpus_store import Corpus, get_corpus_store
+from rooki_ai.utils.get_storage_urls import get_storage_urls
+from rooki_ai.utils.style_metrics import (
+    IMPERATIVE_OPENERS,
+    LONG_FORM_CHARS,
+    LONG_FORM_FIELD,
+    METRIC_FIELDS,
+    SKIPPED_TYPES,
+    StyleCounts,
+    count_styles,
+)
+from rooki_ai.utils.text_patterns import URL, TAG_PREFIXES
+
+logger = logging.getLogger(__name__)
+
+# Row of each ContentMetrics field in the grouped totals
+FIELDS = (*METRIC_FIELDS.values(), LONG_FORM_FIELD)
+_TYPE_ROWS = {type: FIELDS.index(field) for type, field in METRIC_FIELDS.items()}
+_POST_ROW = FIELDS.index("post_metrics")
+_LONG_FORM_ROW = FIELDS.index(LONG_FORM_FIELD)
+# Columns of the grouped totals, in StyleCounts order
+_STATS = ("texts", "sentences", "words", "imperatives", "emojis")
+
+# Tweets tokenized per array pass; bounds the working set to a few tens of MB
+CHUNK_TWEETS = int(os.environ.get("BATCH_METRICS_CHUNK_TWEETS", "50000"))
+# Processes used by default for batches of handles
+PROCESSES = int(os.environ.get("BATCH_METRICS_PROCESSES", "0")) or os.cpu_count() or 1
+# Concurrent corpus downloads in batch_handle_metrics
+FETCH_THREADS = 8
+
+# Joins the texts of a chunk. It is whitespace, so URLs stop at it, and it
+# ends a sentence like a line break.
+_SEPARATOR = "\x1e"
+# Stands in for a URL: no token, but like the URL's first letter it stops
+# "Stop!https://..." from ending a sentence
+_LINK = "\x1f"
+
+# Character classes, one bit each, looked up per code point
+_WORD = 1  # \w, except pictographs
+_PICTOGRAPH = 2
+_REGIONAL = 4  # regional indicator, half of a flag
+_SKIN_TONE = 8
+_SELECTOR = 16  # emoji presentation selector
+_ZWJ = 32
+_TERMINAL = 64  # . ! ? and the ellipsis
+_BREAK = 128  # line break or text separator
+_JOINER = 256  # joins two word runs into one word
+_TAG = 512  # makes the following word a tag
+_URL_MARK = 1024  # where a URL was
+
+# Characters of WORD_PATTERN that join word runs
+_JOINERS = "'\u2019.,:-"
+# Besides letters and digits, a URL can't start right after these
+_NO_URL_AFTER = "_" + TAG_PREFIXES
+
+_PICTOGRAPH_RANGES = (
+    (0x1F000, 0x1FAFF),
+    (0x2600, 0x27BF),
+    (0x2B1B, 0x2B1C),
+    (0x2B50, 0x2B50),
+    (0x2B55, 0x2B55),
+    (0x231A, 0x231B),
+    (0x23E9, 0x23FA),
+)
+# Openers are looked up as integers: 5 bits per lowercased letter, which
+# fits the longest opener (9 letters) in 64 bits. Longer first words, or
+# ones with other characters, can't be openers.
+_MAX_OPENER = max(map(len, IMPERATIVE_OPENERS))
+_OPENER_ALPHABET = "abcdefghijklmnopqrstuvwxyz'"
+
+_tables = None
+_tables_lock = threading.Lock()
+
+
+def _get_tables() -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    Build (once per process) the class bits and opener letter code of every
+    code point, and the sorted keys of IMPERATIVE_OPENERS.
+    """
+    global _tables
+    if _tables is None:
+        with _tables_lock:
+            if _tables is None:
+                size = 0x110000
+                word = np.fromiter(
+                    (chr(c).isalnum() for c in range(size)), dtype=bool, count=size
+                )
+                word[ord("_")] = True
+                classes = np.where(word, _WORD, 0).astype(np.uint16)
+                for first, last in _PICTOGRAPH_RANGES:
+                    classes[first : last + 1] = _PICTOGRAPH
+                classes[0x1F1E6 : 0x1F1FF + 1] |= _REGIONAL
+                classes[0x1F3FB : 0x1F3FF + 1] |= _SKIN_TONE
+                classes[0xFE0F] = _SELECTOR
+                classes[0x200D] = _ZWJ
+                for char in ".!?\u2026":
+                    classes[ord(char)] |= _TERMINAL
+                for char in "\n" + _SEPARATOR:
+                    classes[ord(char)] = _BREAK
+                for char in _JOINERS:
+                    classes[ord(char)] |= _JOINER
+                for char in TAG_PREFIXES:
+                    classes[ord(char)] |= _TAG
+                classes[ord(_LINK)] = _URL_MARK
+
+                letters = np.zeros(size, dtype=np.uint64)
+                for code, char in enumerate(_OPENER_ALPHABET, 1):
+                    letters[ord(char)] = letters[ord(char.upper())] = code
+                letters[ord("\u2019")] = letters[ord("'")]
+                # The only other character that lowercases to an ASCII letter
+                letters[0x212A] = letters[ord("k")]
+
+                keys = np.array(
+                    [
+                        _opener_key(_OPENER_ALPHABET.index(char) + 1 for char in opener)
+                        for opener in IMPERATIVE_OPENERS
+                    ],
+                    dtype=np.uint64,
+                )
+                _tables = classes, letters, np.sort(keys)
+    return _tables
+
+
+def _opener_key(codes: Iterable[int]) -> int:
+    return sum(code << (5 * i) for i, code in enumerate(codes))
+
+
+def _run_firsts(positions: "np.ndarray") -> "np.ndarray":
+    """For sorted positions, the first position of the consecutive run each is in."""
+    run_starts = np.diff(positions, prepend=-2) != 1
+    return positions[run_starts][np.cumsum(run_starts) - 1]
+
+
+def _blank_urls(joined: str) -> str:
+    """
+    Replace each URL the token scan would skip with _LINK.
+
+    The scan only finds a URL where no word (or tag) is running, so in
+    "rooki.ai/https://..." the URL stays part of the word before it here too.
+    """
+    pieces = []
+    done = 0
+    for match in URL.finditer(joined):
+        start, end = match.span()
+        while start is not None and _inside_word(joined, start):
+            # A URL can still start later on; it runs to the same end
+            inner = URL.search(joined, start + 1, end)
+            start = inner.start() if inner else None
+        if start is None:
+            continue
+        pieces.append(joined[done:start])
+        pieces.append(_LINK)
+        done = end
+    if not pieces:
+        return joined
+    pieces.append(joined[done:])
+    return "".join(pieces)
+
+
+def _inside_word(joined: str, start: int) -> bool:
+    before = joined[start - 1] if start else " "
+    if before.isalnum() or before in _NO_URL_AFTER:
+        return True
+    return before in _JOINERS and start > 1 and _is_word_char(joined[start - 2])
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _count_chunk(texts: List[str]) -> "np.ndarray":
+    """
+    Count sentences, words, imperatives and emojis of each text with array
+    operations over the whole chunk.
+
+    Gives the same counts as `analyze_text` on each text. URLs are blanked
+    first; then word boundaries come from one pass over the class bits of
+    every code point, and sentence ends, tags and emojis from the few
+    positions that aren't plain word characters or spaces.
+
+    Returns:
+        np.ndarray: (len(texts), 4) int64 of sentences, words, imperatives
+        and emojis
+    """
+    joined = _SEPARATOR.join(texts)
+    if _LINK in joined or joined.count(_SEPARATOR) != len(texts) - 1:
+        joined = _SEPARATOR.join(
+            text.replace(_SEPARATOR, " ").replace(_LINK, " ") for text in texts
+        )
+    joined = _blank_urls(joined) + _SEPARATOR
+
+    # One uint32 per code point, so array positions are string positions.
+    # The last one is a separator: position + 1 is always in range, and
+    # position - 1 of the first (index -1) reads as a separator too.
+    points = np.frombuffer(joined.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    class_table, letters, opener_keys = _get_tables()
+    classes = class_table[points]
+    last = len(points) - 1
+    word = (classes & _WORD) != 0
+    special = np.flatnonzero(classes > _WORD)
+    kinds = classes[special]
+    ends = special[points[special] == ord(_SEPARATOR)]
+
+    # Words: runs of word chars, with joiners that sit between two word chars
+    joiners = special[(kinds & _JOINER) != 0]
+    joiners = joiners[word[joiners - 1] & word[joiners + 1]]
+    wordish = word.copy()
+    wordish[joiners] = True
+    edges = np.flatnonzero(wordish[1:] != wordish[:-1]) + 1
+    if wordish[0]:
+        edges = np.concatenate(([0], edges))
+    word_starts, word_ends = edges[0::2], edges[1::2]
+    tags = (classes[word_starts - 1] & _TAG) != 0
+
+    # Sentence ends: breaks, and terminal punctuation not followed by \w (or
+    # a URL). A sentence counts when a word started since the previous end.
+    following = classes[np.minimum(special + 1, last)]
+    marks = special[
+        ((kinds & _BREAK) != 0)
+        | (((kinds & _TERMINAL) != 0) & ((following & (_WORD | _URL_MARK)) == 0))
+    ]
+    words_before = np.searchsorted(word_starts, marks)
+    counted = np.diff(words_before, prepend=0) > 0
+    sentence_ends = marks[counted]
+    sentence_starts = np.concatenate(([-1], marks[:-1]))[counted]
+
+    # Imperatives: the first word that isn't a tag opens a command. Openers
+    # are matched on their packed letter codes.
+    openers = np.flatnonzero(~tags)
+    first = np.searchsorted(word_starts[openers], sentence_starts, side="right")
+    has_opener = first < len(openers)
+    first = openers[first[has_opener]]
+    first = first[word_starts[first] < sentence_ends[has_opener]]
+    lengths = word_ends[first] - word_starts[first]
+    first = first[lengths <= _MAX_OPENER]
+    lengths = lengths[lengths <= _MAX_OPENER]
+    keys = np.zeros(len(first), dtype=np.uint64)
+    spelled = np.ones(len(first), dtype=bool)
+    for i in range(_MAX_OPENER):
+        inside = lengths > i
+        code = letters[points[np.minimum(word_starts[first] + i, last)]]
+        spelled &= ~inside | (code != 0)
+        keys |= np.where(inside, code, 0) << np.uint64(5 * i)
+    found = np.minimum(np.searchsorted(opener_keys, keys), len(opener_keys) - 1)
+    imperatives = word_starts[first[spelled & (opener_keys[found] == keys)]]
+
+    # Emojis: a flag is a pair of regional indicators; any other pictograph
+    # starts an emoji unless it continues the one before it, as a skin tone
+    # or after a ZWJ. Presentation selectors pass on whether the char before
+    # them takes modifiers.
+    pictographs = special[(kinds & _PICTOGRAPH) != 0]
+    pictograph_kinds = classes[pictographs]
+    regional = (pictograph_kinds & _REGIONAL) != 0
+    selectors = special[(kinds & _SELECTOR) != 0]
+    presented = _run_firsts(selectors) - 1
+    takes_modifiers = np.zeros(len(points), dtype=bool)
+
+    def with_selectors():
+        if len(selectors):
+            takes_modifiers[selectors] = takes_modifiers[presented]
+
+    def continuing(at: "np.ndarray") -> "np.ndarray":
+        after_zwj = (classes[at - 1] & _ZWJ) != 0
+        skin = (classes[at] & _SKIN_TONE) != 0
+        return (skin & takes_modifiers[at - 1]) | (after_zwj & takes_modifiers[at - 2])
+
+    takes_modifiers[pictographs[~regional]] = True
+    with_selectors()
+    flags = pictographs[:0]
+    if regional.any():
+        # Whether an indicator is joined on depends on how the ones before it
+        # paired up, so they are walked in order; they are rare
+        flags = np.array(
+            _pair_indicators(pictographs[regional].tolist(), classes, takes_modifiers),
+            dtype=pictographs.dtype,
+        )
+        with_selectors()
+    others = pictographs[~regional]
+    emoji_starts = others[~continuing(others)]
+
+    # Positions up to a text's separator belong to it; emoji starts are
+    # counted as two sorted runs
+    counts = [
+        np.searchsorted(positions, ends, side="right")
+        for positions in (sentence_ends, word_starts, imperatives, emoji_starts, flags)
+    ]
+    counts[3] += counts.pop()
+    return np.diff(np.stack(counts, axis=1), axis=0, prepend=0)
+
+
+def _pair_indicators(
+    indicators: List[int], classes: "np.ndarray", takes_modifiers: "np.ndarray"
+) -> List[int]:
+    """
+    Return the positions where a flag or a lone indicator starts an emoji,
+    marking the indicators that take modifiers.
+
+    As in EMOJI_PATTERN, an indicator joined on by a ZWJ continues that
+    sequence; otherwise it starts a flag with the indicator right after
+    it, or is a pictograph of its own.
+    """
+    starts = []
+    second = None
+    for at in indicators:
+        if at == second:
+            continue
+        before = at - 2
+        # Presentation selectors pass on whether the char before them takes modifiers
+        while classes[before] & _SELECTOR:
+            before -= 1
+        if classes[at - 1] & _ZWJ and takes_modifiers[before]:
+            takes_modifiers[at] = True
+            continue
+        starts.append(at)
+        if classes[at + 1] & _REGIONAL:
+            second = at + 1
+        else:
+            takes_modifiers[at] = True
+    return starts
+
+
+def _count_grouped(corpora: Sequence[Iterable[Tweet]]) -> "np.ndarray":
+    """Sum the counts of each group's tweets into a (groups, fields, stats) array."""
+    width = len(FIELDS)
+    totals = np.zeros((len(corpora) * width, len(_STATS)), dtype=np.int64)
+    texts: List[str] = []
+    keys: List[int] = []
+
+    def flush():
+        counts = _count_chunk(texts)
+        key = np.array(keys, dtype=np.int64)
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+        long_form = lengths > LONG_FORM_CHARS
+        # Every text counts once for its type row, long ones again for long-form
+        key = np.concatenate((key, key[long_form] - key[long_form] % width + _LONG_FORM_ROW))
+        counts = np.concatenate((counts, counts[long_form]))
+        totals[:, 0] += np.bincount(key, minlength=len(totals))
+        for column in range(counts.shape[1]):
+            totals[:, column + 1] += np.bincount(
+                key, weights=counts[:, column], minlength=len(totals)
+            ).astype(np.int64)
+        texts.clear()
+        keys.clear()
+
+    for group, tweets in enumerate(corpora):
+        rows = {type: group * width + row for type, row in _TYPE_ROWS.items()}
+        post = group * width + _POST_ROW
+        tweets = iter(tweets)
+        while True:
+            part = list(islice(tweets, CHUNK_TWEETS))
+            if not part:
+                break
+            part = [tweet for tweet in part if tweet.type not in SKIPPED_TYPES]
+            texts.extend([tweet.text for tweet in part])
+            keys.extend([rows.get(tweet.type, post) for tweet in part])
+            if len(texts) >= CHUNK_TWEETS:
+                flush()
+    if texts:
+        flush()
+    return totals.reshape(len(corpora), width, len(_STATS))
+
+
+def _style_counts(totals: "np.ndarray") -> Dict[str, StyleCounts]:
+    """Turn one group's (fields, stats) totals into StyleCounts."""
+    counts = {}
+    for field, values in zip(FIELDS, totals.tolist()):
+        counts[field] = style = StyleCounts()
+        for name, value in zip(_STATS, values):
+            setattr(style, name, value)
+    return counts
+
+
+def batch_counts(
+    corpora: Mapping[Hashable, Iterable[Tweet]],
+) -> Dict[Hashable, Dict[str, StyleCounts]]:
+    """
+    Tally the tweets of many handles in one vectorized pass, in this process.
+
+    The texts of all handles are tokenized together in chunks of
+    CHUNK_TWEETS, and counts are reduced per handle and ContentMetrics field
+    with grouped sums, so there is no per-tweet Python scan. Without NumPy
+    this falls back to `count_styles` per handle, with the same results.
+
+    Args:
+        corpora: Key (usually the handle) -> that key's tweets
+
+    Returns:
+        dict: key -> ContentMetrics field -> StyleCounts
+    """
+    if np is None:
+        return {key: count_styles(tweets) for key, tweets in corpora.items()}
+
+    keys = list(corpora)
+    totals = _count_grouped([corpora[key] for key in keys])
+    return {key: _style_counts(totals[group]) for group, key in enumerate(keys)}
+
+
+def _count_corpus_files(
+    paths: Mapping[Hashable, str],
+) -> Dict[Hashable, Dict[str, StyleCounts]]:
+    """Worker entry point: count corpus store files, skipping ones that can't be read."""
+    with ExitStack() as stack:
+        corpora = {}
+        for key, path in paths.items():
+            try:
+                corpora[key] = stack.enter_context(Corpus(path)).tweets()
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping corpus {path} for {key}: {e}")
+        return batch_counts(corpora)
+
+
+def _split(items: Sequence, sizes: Sequence[int], parts: int) -> List[list]:
+    """Split items into up to `parts` lists of about the same total size."""
+    batches: List[list] = [[] for _ in range(parts)]
+    loads = [0] * parts
+    # Largest first onto the lightest batch keeps the batches even
+    for size, item in sorted(zip(sizes, items), key=lambda pair: -pair[0]):
+        lightest = loads.index(min(loads))
+        batches[lightest].append(item)
+        loads[lightest] += size
+    return [batch for batch in batches if batch]
+
+
+def _map_batches(function, batches: List[dict], processes: int) -> List[dict]:
+    """Run function over batches in a process pool, or inline for one batch."""
+    if processes <= 1 or len(batches) <= 1:
+        return [function(batch) for batch in batches]
+    # spawn, not fork: the API process runs threads (pools, write-behind queues)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(processes, len(batches)), mp_context=context) as pool:
+        return list(pool.map(function, batches))
+
+
+def _metrics(counts: Dict[str, StyleCounts]) -> Dict[str, Dict[str, float]]:
+    return {field: style.metrics() for field, style in counts.items()}
+
+
+def batch_content_metrics(
+    corpora: Mapping[Hashable, Iterable[Tweet]],
+    processes: Optional[int] = None,
+) -> Dict[Hashable, Dict[str, Dict[str, float]]]:
+    """
+    Compute the ContentMetrics of many handles' tweets at once.
+
+    Handles are spread over `processes` worker processes in batches of about
+    the same number of tweets; each batch is counted with `batch_counts`.
+
+    Args:
+        corpora: Key (usually the handle) -> that key's tweets
+        processes: Worker processes; defaults to BATCH_METRICS_PROCESSES or
+            the CPU count, 1 counts in this process
+
+    Returns:
+        dict: key -> post_metrics, reply_metrics, quoted_metrics and
+        long_form_text_metrics, as `content_metrics` returns them
+    """
+    processes = processes or PROCESSES
+    if processes <= 1 or len(corpora) <= 1:
+        return {key: _metrics(counts) for key, counts in batch_counts(corpora).items()}
+
+    lists = {key: list(tweets) for key, tweets in corpora.items()}
+    keys = list(lists)
+    batches = _split(keys, [len(lists[key]) for key in keys], processes)
+    results: Dict[Hashable, Dict[str, Dict[str, float]]] = {}
+    for counted in _map_batches(
+        batch_counts, [{key: lists[key] for key in batch} for batch in batches], processes
+    ):
+        results.update((key, _metrics(counts)) for key, counts in counted.items())
+    return {key: results[key] for key in keys}
+
+
+def batch_handle_metrics(
+    x_handles: Iterable[str],
+    processes: Optional[int] = None,
+) -> Dict[str, Optional[Dict[str, Dict[str, float]]]]:
+    """
+    Compute the ContentMetrics of many handles from their stored corpora.
+
+    Storage URLs are looked up with one query and the corpora are fetched
+    into the corpus store from this process; the workers then map the corpus
+    files directly, so no tweet data is pickled between processes.
+
+    Args:
+        x_handles: Twitter handles to compute metrics for
+        processes: Worker processes; defaults to BATCH_METRICS_PROCESSES or
+            the CPU count
+
+    Returns:
+        dict: x_handle -> metrics as `handle_metrics` returns them; None for
+        handles without a corpus or whose corpus couldn't be fetched
+
+    Raises:
+        DatabaseNotConfigured: If DATABASE_URL is not set
+    """
+    handles = list(dict.fromkeys(x_handles))
+    storage_urls = get_storage_urls(handles)
+    store = get_corpus_store()
+
+    def fetch(handle: str) -> Optional[Tuple[str, int]]:
+        url = storage_urls.get(handle)
+        if not url:
+            return None
+        try:
+            with store.open_sync(url) as corpus:
+                return corpus.path, len(corpus)
+        except Exception as e:
+            logger.warning(f"Failed to fetch the tweet corpus of {handle}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=FETCH_THREADS) as pool:
+        fetched = dict(zip(handles, pool.map(fetch, handles)))
+    found = [handle for handle in handles if fetched[handle] is not None]
+
+    processes = processes or PROCESSES
+    batches = _split(found, [fetched[handle][1] for handle in found], max(processes, 1))
+    results: Dict[str, Optional[Dict[str, Dict[str, float]]]] = dict.fromkeys(handles)
+    for counted in _map_batches(
+        _count_corpus_files,
+        [{handle: fetched[handle][0] for handle in batch} for batch in batches],
+        processes,
+    ):
+        results.update((handle, _metrics(counts)) for handle, counts in counted.items())
+
+    logger.info(
+        f"Computed content metrics for {sum(r is not None for r in results.values())} "
+        f"of {len(handles)} handles"
+    )
+    return results
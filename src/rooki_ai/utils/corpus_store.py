@@ -0,0 +1,610 @@
+import asyncio
+import bisect
+import hashlib
+import itertools
+import json
+import logging
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import httpx
+
+from rooki_ai.models.tweet import Tweet
+from rooki_ai.utils.http_client import HttpClient, get_http_client
+from rooki_ai.utils.json_stream import CHUNK_SIZE, RecordParser
+from rooki_ai.utils import tweet_fields
+
+logger = logging.getLogger(__name__)
+
+# File layout: header, column table, then each column's bytes at an 8-byte
+# aligned offset. Columns are stored in native byte order; a file written
+# on a machine of the other order is treated as missing and rebuilt.
+MAGIC = b"RKCORPUS"
+VERSION = 2
+_HEADER = struct.Struct("<8sBBxxIQ")  # magic, version, big endian, columns, rows
+_COLUMN = struct.Struct("<32ss7xQQ")  # name, typecode, offset, size in bytes
+_BIG_ENDIAN = sys.byteorder == "big"
+
+# String fields moved out of each record into their own columns. Each is
+# stored as a UTF-8 blob plus "<name>.offsets" (byte) and "<name>.chars"
+# (character) columns of rows + 1 offsets each, so a cell is a slice of
+# the blob and a run of cells can be decoded with one call. The cells hold
+# the values Tweet decodes (e.g. a derived type, an integer id as text);
+# the "fields" bits tell which of them are verbatim keys of the record.
+STRING_COLUMNS = ("id", "created_at", "type", "text")
+# Engagement counters, read through every alias in tweet_fields
+NUMBER_COLUMNS = {
+    "likes": tweet_fields.LIKE_KEYS,
+    "retweets": tweet_fields.RETWEET_KEYS,
+    "replies": tweet_fields.REPLY_KEYS,
+    "quotes": tweet_fields.QUOTE_KEYS,
+    "views": tweet_fields.VIEW_KEYS,
+}
+
+# Bit i of the "fields" column is set when STRING_COLUMNS[i] came from the
+# record itself; _RAW_BIT marks a record that isn't an object at all
+_FIELD_BITS = tuple(1 << i for i in range(len(STRING_COLUMNS)))
+_ALL_FIELDS = sum(_FIELD_BITS)
+_NUMBER_KEYS = tuple(NUMBER_COLUMNS.values())
+_RAW_BIT = 0x80
+
+# Bulk reads decode about this many bytes of a string column per call
+_SLAB_BYTES = 1024 * 1024
+# and this many "extra" cells per json.loads
+_EXTRA_BATCH = 4096
+# json.dumps builds a new encoder on every call that passes options
+_EXTRA_ENCODER = json.JSONEncoder(separators=(",", ":"))
+# A builder moves its columns to temp files whenever this much is buffered,
+# so building a corpus takes about this much memory whatever its size
+_SPOOL_BYTES = 4 * 1024 * 1024
+# Buffered per row besides the strings: fields, two offsets per string
+# column and the counters
+_ROW_BYTES = 1 + 16 * (len(STRING_COLUMNS) + 1) + 8 * len(NUMBER_COLUMNS)
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+class _Spool:
+    """A column that is appended to in memory and moved to a temp file in bulk."""
+
+    __slots__ = ("data", "last", "spilled", "_file")
+
+    def __init__(self, typecode: str, first: Optional[int] = None):
+        self.data = array(typecode, [] if first is None else [first])
+        # The last value appended, for offset columns
+        self.last = first
+        self.spilled = 0
+        self._file = None
+
+    @property
+    def size(self) -> int:
+        return self.spilled + len(self.data) * self.data.itemsize
+
+    def spill(self, directory: Optional[str]):
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(dir=directory)
+        self._file.write(self.data)
+        self.spilled += len(self.data) * self.data.itemsize
+        del self.data[:]
+
+    def copy_to(self, f):
+        if self._file is not None:
+            self._file.seek(0)
+            shutil.copyfileobj(self._file, f, _SPOOL_BYTES)
+        f.write(self.data)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class CorpusBuilder:
+    """Collects tweet records into the columns of a corpus file.
+
+    The string and counter columns hold what `Tweet.from_dict` would decode,
+    so `Corpus.tweets()` needs no JSON. Keys not moved verbatim into a
+    string column go to the "extra" column as compact JSON, so
+    `Corpus.records()` gives the original records back.
+
+    Columns are buffered up to _SPOOL_BYTES and then moved to temp files in
+    `directory` (the system temp directory by default), so a builder holds
+    about _SPOOL_BYTES plus the record being added, however large the
+    corpus. Close it (or use it as a context manager) to remove them.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.rows = 0
+        self.directory = directory
+        self._strings = {
+            name: (_Spool("B"), _Spool("Q", 0), _Spool("Q", 0))
+            for name in (*STRING_COLUMNS, "extra")
+        }
+        self._numbers = [_Spool("q") for _ in NUMBER_COLUMNS]
+        self._fields = _Spool("B")
+        self._buffered = 0
+
+    def __enter__(self) -> "CorpusBuilder":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, record: Any):
+        if not isinstance(record, dict):
+            self._fields.data.append(_RAW_BIT)
+            self._append_strings({"extra": _EXTRA_ENCODER.encode(record)})
+            for column in self._numbers:
+                column.data.append(0)
+            self._added()
+            return
+
+        rest = dict(record)
+        values, fields = {}, 0
+        for name, bit in zip(STRING_COLUMNS, _FIELD_BITS):
+            if isinstance(rest.get(name), str):
+                values[name] = rest.pop(name)
+                fields |= bit
+        if "id" not in values:
+            values["id"] = tweet_fields.tweet_id(rest)
+        if "text" not in values:
+            values["text"] = tweet_fields.text(rest)
+        if "type" not in values:
+            values["type"] = tweet_fields.tweet_type(rest)
+        values["extra"] = _EXTRA_ENCODER.encode(rest)
+
+        self._fields.data.append(fields)
+        self._append_strings(values)
+        for column, value in zip(self._numbers, tweet_fields.counts(record, _NUMBER_KEYS)):
+            column.data.append(value)
+        self._added()
+
+    def extend(self, records: Iterable[Any]):
+        for record in records:
+            self.add(record)
+
+    def write(self, path: str):
+        """Write the corpus file; a temp file is renamed over `path` when complete."""
+        columns = [("fields", "B", self._fields)]
+        for name, (blob, offsets, chars) in self._strings.items():
+            columns.append((name, "B", blob))
+            columns.append((f"{name}.offsets", "Q", offsets))
+            columns.append((f"{name}.chars", "Q", chars))
+        columns.extend(zip(NUMBER_COLUMNS, "q" * len(NUMBER_COLUMNS), self._numbers))
+
+        offset = _align(_HEADER.size + _COLUMN.size * len(columns))
+        table = []
+        for name, typecode, spool in columns:
+            table.append(_COLUMN.pack(name.encode(), typecode.encode(), offset, spool.size))
+            offset = _align(offset + spool.size)
+
+        directory = os.path.dirname(path)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, VERSION, _BIG_ENDIAN, len(columns), self.rows))
+                f.write(b"".join(table))
+                for _, _, spool in columns:
+                    f.write(b"\0" * (_align(f.tell()) - f.tell()))
+                    spool.copy_to(f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def close(self):
+        """Remove the builder's temp files."""
+        for spool in self._spools():
+            spool.close()
+
+    def _append_strings(self, values: Dict[str, str]):
+        for name, (blob, offsets, chars) in self._strings.items():
+            value = values.get(name, "")
+            encoded = value.encode("utf-8", "surrogatepass")
+            blob.data.frombytes(encoded)
+            offsets.last += len(encoded)
+            offsets.data.append(offsets.last)
+            chars.last += len(value)
+            chars.data.append(chars.last)
+            self._buffered += len(encoded)
+
+    def _added(self):
+        self.rows += 1
+        self._buffered += _ROW_BYTES
+        if self._buffered >= _SPOOL_BYTES:
+            for spool in self._spools():
+                spool.spill(self.directory)
+            self._buffered = 0
+
+    def _spools(self) -> Iterator[_Spool]:
+        yield self._fields
+        for spools in self._strings.values():
+            yield from spools
+        yield from self._numbers
+
+
+class Corpus:
+    """Read-only, memory-mapped view of a corpus file.
+
+    Columns are memoryviews over the mapping, so reading the counters or
+    the text bytes copies nothing; the OS pages the file in as it is
+    touched and shares the pages between processes. Close the corpus (or
+    use it as a context manager) when done; views taken from `column()`
+    must be released first.
+
+    Raises:
+        ValueError: If the file is not a corpus file this version can read
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._columns = self._map_columns()
+        except Exception:
+            self._mmap.close()
+            raise
+        self._fields = self._columns["fields"]
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __enter__(self) -> "Corpus":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def column(self, name: str) -> memoryview:
+        """Return a column (e.g. "likes", "text", "text.offsets") as a typed memoryview."""
+        return self._columns[name]
+
+    def string_bytes(self, name: str, index: int) -> memoryview:
+        """Return the UTF-8 bytes of one string cell, without copying."""
+        offsets = self._columns[f"{name}.offsets"]
+        return self._columns[name][offsets[index] : offsets[index + 1]]
+
+    def string(self, name: str, index: int) -> str:
+        return str(self.string_bytes(name, index), "utf-8", "surrogatepass")
+
+    def strings(self, name: str) -> Iterator[str]:
+        """Yield every cell of a string column in order, decoding a slab at a time."""
+        blob = self._columns[name]
+        offsets = self._columns[f"{name}.offsets"]
+        chars = self._columns[f"{name}.chars"]
+        start = 0
+        while start < self.rows:
+            end = bisect.bisect_right(offsets, offsets[start] + _SLAB_BYTES, start + 1, self.rows + 1)
+            end = max(end - 1, start + 1)
+            slab = str(blob[offsets[start] : offsets[end]], "utf-8", "surrogatepass")
+            bounds = chars[start : end + 1].tolist()
+            base = bounds[0]
+            for begin, finish in zip(bounds, bounds[1:]):
+                yield slab[begin - base : finish - base]
+            start = end
+
+    def texts(self) -> Iterator[str]:
+        """Yield the text of every tweet in order."""
+        return self.strings("text")
+
+    def tweets(self) -> Iterator[Tweet]:
+        """Yield every tweet as a Tweet, straight from the columns."""
+        types = map(sys.intern, self.strings("type"))
+        columns = zip(
+            self.strings("id"),
+            self.texts(),
+            types,
+            self.strings("created_at"),
+            *(self._columns[name] for name in NUMBER_COLUMNS),
+        )
+        # Rows that weren't objects have empty cells; decode_tweets skips them too
+        keep = (not fields & _RAW_BIT for fields in self._fields)
+        return itertools.compress(map(Tweet._make, columns), keep)
+
+    def record(self, index: int) -> Any:
+        """Rebuild the record at `index` as it was in the source document."""
+        fields = self._fields[index]
+        extra = json.loads(bytes(self.string_bytes("extra", index)))
+        if fields & _RAW_BIT:
+            return extra
+
+        record = {
+            name: self.string(name, index)
+            for name, bit in zip(STRING_COLUMNS, _FIELD_BITS)
+            if fields & bit
+        }
+        record.update(extra)
+        return record
+
+    def records(self) -> Iterator[Any]:
+        """Rebuild every record in order; faster than calling `record()` per index."""
+        columns = [self.strings(name) for name in STRING_COLUMNS]
+        for fields, extra, *values in zip(self._fields, self._extras(), *columns):
+            if fields == _ALL_FIELDS:
+                record = dict(zip(STRING_COLUMNS, values))
+            elif fields & _RAW_BIT:
+                yield extra
+                continue
+            else:
+                record = {
+                    name: value
+                    for name, bit, value in zip(STRING_COLUMNS, _FIELD_BITS, values)
+                    if fields & bit
+                }
+            record.update(extra)
+            yield record
+
+    def close(self):
+        for view in self._columns.values():
+            view.release()
+        self._columns = {}
+        try:
+            self._mmap.close()
+        except BufferError:
+            # A caller still holds a view; the mapping goes when it does
+            pass
+
+    def _extras(self) -> Iterator[Any]:
+        cells = self.strings("extra")
+        while True:
+            batch = list(itertools.islice(cells, _EXTRA_BATCH))
+            if not batch:
+                return
+            yield from json.loads("[" + ",".join(batch) + "]")
+
+    def _map_columns(self) -> Dict[str, memoryview]:
+        size = len(self._mmap)
+        if size < _HEADER.size:
+            raise ValueError(f"{self.path} is not a corpus file")
+        magic, version, big_endian, count, self.rows = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} corpus file")
+        if bool(big_endian) != _BIG_ENDIAN:
+            raise ValueError(f"{self.path} was written with the other byte order")
+
+        view = memoryview(self._mmap)
+        columns = {}
+        for i in range(count):
+            name, typecode, offset, length = _COLUMN.unpack_from(
+                self._mmap, _HEADER.size + i * _COLUMN.size
+            )
+            if offset + length > size:
+                raise ValueError(f"{self.path} is truncated")
+            columns[name.rstrip(b"\0").decode()] = view[offset : offset + length].cast(typecode.decode())
+        view.release()
+        return columns
+
+
+class CorpusStore:
+    """Local, content-addressed store of downloaded tweet corpora.
+
+    A corpus is stored once per distinct body, under the SHA-256 of the
+    downloaded bytes, as a columnar file that `Corpus` memory-maps. A small
+    index entry per storage URL records which body the URL served, with
+    its ETag and Last-Modified. Within CORPUS_CACHE_MAX_AGE_SECONDS of the
+    last fetch a URL is opened straight from disk, with no request and no
+    JSON decoding; after that the server is asked with a conditional GET
+    and a 304 reuses the stored corpus. A new body is parsed as it streams
+    in. When the server can't be reached the stored copy is used. Corpora
+    beyond CORPUS_CACHE_MAX_MB are evicted, least recently opened first.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_age: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        client: Optional[HttpClient] = None,
+    ):
+        if directory is None:
+            directory = os.environ.get(
+                "CORPUS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "rooki_ai_corpus")
+            )
+        if max_age is None:
+            max_age = float(os.environ.get("CORPUS_CACHE_MAX_AGE_SECONDS", "86400"))
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("CORPUS_CACHE_MAX_MB", "1024")) * 1024 * 1024)
+
+        self.directory = directory
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._client = client or get_http_client()
+
+        self._metrics_lock = threading.Lock()
+        self._counts = {"fresh": 0, "revalidated": 0, "downloaded": 0, "stale": 0}
+        self._evicted = 0
+
+    def open_sync(self, url: str) -> Corpus:
+        """
+        Open the corpus at `url`, from disk when it is fresh or unchanged.
+
+        Returns:
+            Corpus: The memory-mapped corpus; the caller closes it
+
+        Raises:
+            httpx.HTTPError: If the server can't be reached or returns an
+            error and there is no stored copy to fall back on
+            json.JSONDecodeError: If a downloaded document is malformed
+        """
+        meta = self._load_meta(url)
+        if self._is_fresh(meta):
+            return self._hit(meta, "fresh")
+
+        try:
+            with self._client.stream_sync(url, headers=self._validators(meta)) as response:
+                if response.status_code == 304 and meta is not None:
+                    meta["fetched_at"] = time.time()
+                    self._write_meta(url, meta)
+                    return self._hit(meta, "revalidated")
+
+                if response.status_code >= 400:
+                    if meta is not None:
+                        return self._fall_back(url, meta, f"HTTP {response.status_code}")
+                    response.raise_for_status()
+
+                digest, rows = self._build(response)
+                meta = {
+                    "url": url,
+                    "digest": digest,
+                    "rows": rows,
+                    "etag": response.headers.get("etag"),
+                    "last_modified": response.headers.get("last-modified"),
+                    "fetched_at": time.time(),
+                }
+        except httpx.TransportError as e:
+            return self._fall_back(url, meta, e)
+
+        self._write_meta(url, meta)
+        self._evict(keep=meta["digest"])
+        return self._hit(meta, "downloaded")
+
+    async def open(self, url: str) -> Corpus:
+        """Async variant of `open_sync`; the fetch and parse run in a worker thread."""
+        return await asyncio.to_thread(self.open_sync, url)
+
+    def stats(self) -> Dict[str, Any]:
+        """Count how corpora were opened: fresh, revalidated, downloaded or stale."""
+        with self._metrics_lock:
+            counts = dict(self._counts)
+            evicted = self._evicted
+        total = sum(counts.values())
+        return {
+            **counts,
+            "local_ratio": (total - counts["downloaded"]) / total if total else 0.0,
+            "evicted": evicted,
+            "max_age_seconds": self.max_age,
+            "max_mb": self.max_bytes / (1024 * 1024),
+            "directory": self.directory,
+        }
+
+    def _meta_path(self, url: str) -> str:
+        return os.path.join(self.directory, "urls", hashlib.sha256(url.encode()).hexdigest() + ".json")
+
+    def _corpus_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "corpora", digest + ".corpus")
+
+    def _load_meta(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._meta_path(url)) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # The corpus may have been evicted; without it the entry is useless
+        return meta if self._readable(self._corpus_path(meta["digest"])) else None
+
+    @staticmethod
+    def _readable(path: str) -> bool:
+        try:
+            Corpus(path).close()
+        except (OSError, ValueError):
+            return False
+        return True
+
+    def _is_fresh(self, meta: Optional[Dict[str, Any]]) -> bool:
+        return meta is not None and time.time() - meta["fetched_at"] < self.max_age
+
+    @staticmethod
+    def _validators(meta: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def _build(self, response: httpx.Response):
+        # Hash and parse in one pass over the body; identical bodies served
+        # under different URLs share one corpus file. The columns spool to
+        # the corpora directory, so memory stays bounded by _SPOOL_BYTES.
+        sha = hashlib.sha256()
+        parser = RecordParser()
+        directory = os.path.join(self.directory, "corpora")
+        os.makedirs(directory, exist_ok=True)
+        with CorpusBuilder(directory) as builder:
+            for chunk in response.iter_bytes(CHUNK_SIZE):
+                sha.update(chunk)
+                builder.extend(parser.feed(chunk))
+            builder.extend(parser.close())
+
+            digest = sha.hexdigest()
+            path = self._corpus_path(digest)
+            if not self._readable(path):
+                builder.write(path)
+            return digest, builder.rows
+
+    def _write_meta(self, url: str, meta: Dict[str, Any]):
+        path = self._meta_path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _fall_back(self, url: str, meta: Optional[Dict[str, Any]], error) -> Corpus:
+        if meta is None:
+            raise error
+        age = time.time() - meta["fetched_at"]
+        logger.warning(f"Using {age:.0f}s old corpus of {url}: {error}")
+        return self._hit(meta, "stale")
+
+    def _hit(self, meta: Dict[str, Any], outcome: str) -> Corpus:
+        path = self._corpus_path(meta["digest"])
+        corpus = Corpus(path)
+        # The modification time orders eviction
+        os.utime(path)
+        with self._metrics_lock:
+            self._counts[outcome] += 1
+        return corpus
+
+    def _evict(self, keep: str):
+        directory = os.path.join(self.directory, "corpora")
+        entries = []
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".corpus"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if entry.name == keep + ".corpus":
+                continue
+            try:
+                # Processes that have it mapped keep reading the unlinked file
+                os.unlink(entry.path)
+            except OSError:
+                continue
+            total -= size
+            with self._metrics_lock:
+                self._evicted += 1
+
+
+_store: Optional[CorpusStore] = None
+_store_lock = threading.Lock()
+
+
+def get_corpus_store() -> CorpusStore:
+    """Return the process-wide corpus store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CorpusStore()
+    return _store
@@ -0,0 +1,337 @@
+import asyncio
+import concurrent.futures
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Coroutine, Dict, List, Optional, Sequence, TypeVar
+
+from rooki_ai.utils.runtime import get_runtime
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class DatabaseNotConfigured(Exception):
+    """DATABASE_URL is not set."""
+
+
+def database_errors() -> tuple:
+    """Exception types raised when the database is unreachable or rejects a query."""
+    import asyncpg
+
+    return (
+        asyncpg.PostgresError,
+        asyncpg.InterfaceError,
+        OSError,
+        asyncio.TimeoutError,
+        DatabaseNotConfigured,
+    )
+
+
+def transient_database_errors() -> tuple:
+    """Exception types worth retrying: lost connections, timeouts, deadlocks."""
+    import asyncpg
+
+    return (
+        asyncpg.PostgresConnectionError,
+        asyncpg.InterfaceError,
+        asyncpg.exceptions.DeadlockDetectedError,
+        asyncpg.exceptions.SerializationError,
+        asyncpg.exceptions.QueryCanceledError,
+        asyncpg.exceptions.TooManyConnectionsError,
+        asyncpg.exceptions.CannotConnectNowError,
+        OSError,
+        asyncio.TimeoutError,
+    )
+
+
+class Database:
+    """App-lifetime asyncpg connection pool with a sync facade.
+
+    The pool lives on the shared runtime loop (`rooki_ai.utils.runtime`), so
+    coroutines on any event loop and blocking code in crew/tool threads share
+    the same connections. Async callers await `fetch`, `fetchrow`,
+    `fetchval`, `execute`, `executemany` or `run`; sync callers use the
+    `*_sync` variants, which block the calling thread.
+
+    asyncpg prepares each statement on first use and keeps it in a
+    per-connection cache of DB_STATEMENT_CACHE_SIZE entries (set it to 0
+    behind a transaction-mode pgbouncer such as the Supabase pooler). Every
+    connection runs with statement_timeout = DB_STATEMENT_TIMEOUT_MS, and
+    json/jsonb values are encoded and decoded as Python objects.
+    """
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        statement_timeout_ms: Optional[int] = None,
+        statement_cache_size: Optional[int] = None,
+        acquire_timeout: Optional[float] = None,
+    ):
+        env = os.environ.get
+        self._dsn = dsn or env("DATABASE_URL")
+        self.min_size = min_size if min_size is not None else int(env("DB_POOL_MIN_SIZE", "1"))
+        self.max_size = max_size if max_size is not None else int(env("DB_POOL_MAX_SIZE", "10"))
+        self.statement_timeout_ms = (
+            statement_timeout_ms
+            if statement_timeout_ms is not None
+            else int(env("DB_STATEMENT_TIMEOUT_MS", "15000"))
+        )
+        self.statement_cache_size = (
+            statement_cache_size
+            if statement_cache_size is not None
+            else int(env("DB_STATEMENT_CACHE_SIZE", "100"))
+        )
+        self.acquire_timeout = (
+            acquire_timeout
+            if acquire_timeout is not None
+            else float(env("DB_ACQUIRE_TIMEOUT_SECONDS", "10"))
+        )
+
+        self._pool = None
+        self._pool_lock: Optional[asyncio.Lock] = None
+        self._listeners: List[concurrent.futures.Future] = []
+
+        self._metrics_lock = threading.Lock()
+        self._queries = 0
+        self._errors = 0
+        self._query_seconds = 0.0
+        self._acquire_seconds = 0.0
+        self._max_acquire_seconds = 0.0
+
+    @property
+    def configured(self) -> bool:
+        return bool(self._dsn)
+
+    async def run(self, fn: Callable[[Any], Awaitable[T]]) -> T:
+        """
+        Call `fn` with a pooled connection and return its result.
+
+        Use this for several statements on one connection, e.g. inside
+        `async with conn.transaction():`.
+
+        Raises:
+            DatabaseNotConfigured: If DATABASE_URL is not set
+        """
+        return await self._on_runtime(self._with_connection(fn))
+
+    def run_sync(self, fn: Callable[[Any], Awaitable[T]]) -> T:
+        """Blocking counterpart of `run` for code running outside an event loop."""
+        return get_runtime().run_sync(self._with_connection(fn))
+
+    async def fetch(self, query: str, *args) -> List[Any]:
+        return await self.run(lambda conn: conn.fetch(query, *args))
+
+    async def fetchrow(self, query: str, *args) -> Optional[Any]:
+        return await self.run(lambda conn: conn.fetchrow(query, *args))
+
+    async def fetchval(self, query: str, *args) -> Any:
+        return await self.run(lambda conn: conn.fetchval(query, *args))
+
+    async def execute(self, query: str, *args) -> str:
+        return await self.run(lambda conn: conn.execute(query, *args))
+
+    async def executemany(self, query: str, args: Sequence[Sequence[Any]]):
+        return await self.run(lambda conn: conn.executemany(query, args))
+
+    def fetch_sync(self, query: str, *args) -> List[Any]:
+        return self.run_sync(lambda conn: conn.fetch(query, *args))
+
+    def fetchrow_sync(self, query: str, *args) -> Optional[Any]:
+        return self.run_sync(lambda conn: conn.fetchrow(query, *args))
+
+    def fetchval_sync(self, query: str, *args) -> Any:
+        return self.run_sync(lambda conn: conn.fetchval(query, *args))
+
+    def execute_sync(self, query: str, *args) -> str:
+        return self.run_sync(lambda conn: conn.execute(query, *args))
+
+    def executemany_sync(self, query: str, args: Sequence[Sequence[Any]]):
+        return self.run_sync(lambda conn: conn.executemany(query, args))
+
+    def listen(
+        self,
+        channel: str,
+        callback: Callable[[str], None],
+        on_connect: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Call `callback(payload)` on the runtime loop for every NOTIFY on `channel`.
+
+        The listener holds its own connection outside the pool and reconnects
+        with backoff when it drops; `on_connect` runs after every (re)connect,
+        so callers can resync whatever they may have missed. Listeners stop
+        when the database is closed.
+        """
+        self._listeners.append(
+            get_runtime().run_coroutine(self._listen(channel, callback, on_connect))
+        )
+
+    async def aclose(self):
+        """Close the pool and listeners from any event loop; a later query reopens the pool."""
+        if self._pool is not None or self._listeners:
+            await self._on_runtime(self._close())
+
+    def close(self):
+        """Blocking counterpart of `aclose`."""
+        if self._pool is not None or self._listeners:
+            get_runtime().run_sync(self._close())
+
+    def stats(self) -> Dict[str, Any]:
+        """Report pool occupancy, query counts and acquire/query latencies."""
+        with self._metrics_lock:
+            queries = self._queries
+            stats = {
+                "queries": queries,
+                "errors": self._errors,
+                "avg_query_ms": self._query_seconds / queries * 1000 if queries else 0.0,
+                "avg_acquire_ms": self._acquire_seconds / queries * 1000 if queries else 0.0,
+                "max_acquire_ms": self._max_acquire_seconds * 1000,
+            }
+
+        pool = self._pool
+        stats.update(
+            {
+                "open": pool is not None,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": pool.get_size() if pool is not None else 0,
+                "idle": pool.get_idle_size() if pool is not None else 0,
+                "statement_cache_size": self.statement_cache_size,
+                "statement_timeout_ms": self.statement_timeout_ms,
+            }
+        )
+        return stats
+
+    async def _on_runtime(self, coro: Coroutine[Any, Any, T]) -> T:
+        # The pool is bound to the runtime loop; hop there from other loops
+        return await get_runtime().run_async(coro)
+
+    async def _with_connection(self, fn: Callable[[Any], Awaitable[T]]) -> T:
+        pool = await self._get_pool()
+        requested = time.perf_counter()
+        async with pool.acquire(timeout=self.acquire_timeout) as conn:
+            acquired = time.perf_counter()
+            failed = False
+            try:
+                return await fn(conn)
+            except Exception:
+                failed = True
+                raise
+            finally:
+                self._record(acquired - requested, time.perf_counter() - acquired, failed)
+
+    async def _get_pool(self):
+        if self._pool is not None:
+            return self._pool
+
+        if self._pool_lock is None:
+            self._pool_lock = asyncio.Lock()
+        async with self._pool_lock:
+            if self._pool is None:
+                if not self._dsn:
+                    raise DatabaseNotConfigured("DATABASE_URL environment variable not set")
+
+                import asyncpg
+
+                self._pool = await asyncpg.create_pool(
+                    self._dsn,
+                    min_size=self.min_size,
+                    max_size=self.max_size,
+                    statement_cache_size=self.statement_cache_size,
+                    server_settings={
+                        "statement_timeout": str(self.statement_timeout_ms),
+                        "application_name": "rooki_ai",
+                    },
+                    init=self._init_connection,
+                )
+                logger.info(
+                    f"Database pool opened (min {self.min_size}, max {self.max_size})"
+                )
+        return self._pool
+
+    @staticmethod
+    async def _init_connection(conn):
+        encode = functools.partial(json.dumps, default=str)
+        for typename in ("json", "jsonb"):
+            await conn.set_type_codec(
+                typename, encoder=encode, decoder=json.loads, schema="pg_catalog"
+            )
+
+    async def _listen(
+        self,
+        channel: str,
+        callback: Callable[[str], None],
+        on_connect: Optional[Callable[[], None]],
+    ):
+        import asyncpg
+
+        attempt = 0
+        while True:
+            try:
+                conn = await asyncpg.connect(
+                    self._dsn, server_settings={"application_name": "rooki_ai"}
+                )
+            except transient_database_errors() as e:
+                delay = min(0.5 * 2**attempt, 30)
+                attempt += 1
+                logger.warning(f"Listener on {channel} can't connect ({e}); retrying in {delay:g}s")
+                await asyncio.sleep(delay)
+                continue
+
+            attempt = 0
+            lost = asyncio.Event()
+            conn.add_termination_listener(lambda _conn: lost.set())
+            try:
+                await conn.add_listener(
+                    channel, lambda _conn, _pid, _channel, payload: callback(payload)
+                )
+                if on_connect is not None:
+                    on_connect()
+                await lost.wait()
+                logger.warning(f"Listener on {channel} lost its connection; reconnecting")
+            except transient_database_errors() as e:
+                logger.warning(f"Listener on {channel} failed ({e}); reconnecting")
+            finally:
+                conn.terminate()
+
+    async def _close(self):
+        listeners, self._listeners = self._listeners, []
+        for listener in listeners:
+            listener.cancel()
+
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            try:
+                await asyncio.wait_for(pool.close(), timeout=10)
+            except asyncio.TimeoutError:
+                pool.terminate()
+            logger.info("Database pool closed")
+
+    def _record(self, acquire_seconds: float, query_seconds: float, failed: bool):
+        with self._metrics_lock:
+            self._queries += 1
+            self._errors += failed
+            self._query_seconds += query_seconds
+            self._acquire_seconds += acquire_seconds
+            self._max_acquire_seconds = max(self._max_acquire_seconds, acquire_seconds)
+
+
+_db: Optional[Database] = None
+_db_lock = threading.Lock()
+
+
+def get_db() -> Database:
+    """Return the process-wide database pool, configured from the environment on first use."""
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = Database()
+    return _db
@@ -1,116 +1,127 @@
-import os
-import json
 import logging
-import psycopg2
-from datetime import datetime
+from typing import List, Optional, TypedDict
+
+from rooki_ai.utils.db import get_db
+from rooki_ai.utils.message_history import HISTORY_LIMIT, get_message_history
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def get_chat_background(user_id: str) -> str:
-    db_url = os.environ.get("DATABASE_URL")
-    
-    if not db_url:
-        logger.error("DATABASE_URL environment variable not set")
-        return False
+class ChatMessage(TypedDict):
+    id: str
+    role: str
+    channel: str
+    external_chat_id: Optional[str]
+    external_message_id: Optional[str]
+    external_event_id: Optional[str]
+    reply_to_message_id: Optional[str]
+    text: str
+    created_at: Optional[str]
+    edited_at: Optional[str]
+
+
+class SuggestedCategoryRecord(TypedDict):
+    id: str
+    created_at: Optional[str]
+    updated_at: Optional[str]
+
+
+class ChatBackground(TypedDict):
+    messages: List[ChatMessage]
+    convo_summary: str
+    suggested_categories: List[SuggestedCategoryRecord]
+
+
+# Everything the coach needs in one round trip. Postgres builds the JSON
+# (timestamps come out ISO 8601) and the pool's json codec decodes it, so no
+# per-row conversion happens in Python.
+#
+# $2 is the high-water mark of the user's buffered history (see
+# rooki_ai.utils.message_history): only messages created or edited after it
+# are returned, or the latest ones if it is NULL. The lookback catches rows
+# committed slightly out of timestamp order; the merge drops the duplicates.
+CHAT_BACKGROUND_QUERY = f"""
+WITH recent AS (
+    SELECT id, role, channel, external_chat_id, external_message_id,
+           external_event_id, reply_to_message_id, text, created_at, edited_at
+    FROM public."Message"
+    WHERE "userId" = $1
+      AND ($2::text IS NULL
+           OR created_at > $2::text::timestamp - interval '2 seconds'
+           OR edited_at > $2::text::timestamp - interval '2 seconds')
+    ORDER BY created_at DESC
+    LIMIT {HISTORY_LIMIT}
+),
+voice AS (
+    SELECT id FROM public."Voice" WHERE "userId" = $1 LIMIT 1
+)
+SELECT
+    (SELECT coalesce(json_agg(recent ORDER BY created_at DESC), '[]'::json)
+     FROM recent) AS messages,
+    (SELECT summary FROM public."ConvoSummary" WHERE "userId" = $1) AS convo_summary,
+    (SELECT coalesce(
+                json_agg(
+                    json_build_object(
+                        'id', c.id,
+                        'created_at', c."createdAt",
+                        'updated_at', c."updatedAt"
+                    )
+                    ORDER BY c."createdAt" DESC
+                ),
+                '[]'::json
+            )
+     FROM public."SuggestedCategory" c
+     JOIN voice ON c."voiceId" = voice.id) AS suggested_categories
+"""
+
+
+def _empty_background() -> ChatBackground:
+    return {"messages": [], "convo_summary": "", "suggested_categories": []}
+
+
+def _to_background(user_id: str, high_water: Optional[str], row) -> ChatBackground:
+    return {
+        "messages": get_message_history().update(user_id, high_water, row["messages"]),
+        "convo_summary": row["convo_summary"] or "",
+        "suggested_categories": row["suggested_categories"],
+    }
 
+
+def get_chat_background(user_id: str) -> ChatBackground:
+    """
+    Load the user's 50 most recent messages, conversation summary and
+    suggested categories in a single query.
+
+    Messages are kept in a per-user buffer between turns, so after the first
+    turn only new or edited messages are read.
+
+    Args:
+        user_id: The user whose background to load
+
+    Returns:
+        ChatBackground: The background; empty if it could not be loaded
+    """
+    high_water = get_message_history().high_water(user_id)
     try:
-        # Connect to the PostgreSQL database
-        conn = psycopg2.connect(db_url)
-        cursor = conn.cursor()
-        logger.info(f"Connected to database to fetch chat background for user: {user_id}")
-
-        # Get Messages of the user
-        # Get all Message where userId = user_id in Message table
-        messages_query = """
-        SELECT id, role, channel, external_chat_id, external_message_id, 
-               external_event_id, reply_to_message_id, text, created_at, edited_at
-        FROM public."Message" 
-        WHERE "userId" = %s
-        ORDER BY created_at DESC
-        LIMIT 50
-        """
-        cursor.execute(messages_query, (user_id,))
-        message_records = cursor.fetchall()
-        
-        messages = []
-        for record in message_records:
-            messages.append({
-                "id": record[0],
-                "role": record[1],
-                "channel": record[2],
-                "external_chat_id": record[3],
-                "external_message_id": record[4],
-                "external_event_id": record[5],
-                "reply_to_message_id": record[6],
-                "text": record[7],
-                "created_at": record[8].isoformat() if record[8] else None,
-                "edited_at": record[9].isoformat() if record[9] else None
-            })
-
-        # Get ConvoSummary of the user
-        # Get one ConvoSummary where userId = user_id in ConvoSummary table
-        convo_summary_query = """
-        SELECT summary 
-        FROM public."ConvoSummary" 
-        WHERE "userId" = %s
-        """
-        cursor.execute(convo_summary_query, (user_id,))
-        convo_record = cursor.fetchone()
-        
-        convo_summary = convo_record[0] if convo_record else ""
-
-        # Get all SuggestedCategory of the user
-        # Get one voice of the user where userId = user_id in Voice table
-        # Get all SuggestedCategory where voiceId = voice.id in SuggestedCategory table
-        voice_query = """
-        SELECT id 
-        FROM public."Voice" 
-        WHERE "userId" = %s
-        """
-        cursor.execute(voice_query, (user_id,))
-        voice_record = cursor.fetchone()
-        
-        suggested_categories = []
-        if voice_record:
-            voice_id = voice_record[0]
-            categories_query = """
-            SELECT id, "createdAt", "updatedAt" 
-            FROM public."SuggestedCategory" 
-            WHERE "voiceId" = %s
-            ORDER BY "createdAt" DESC
-            """
-            cursor.execute(categories_query, (voice_id,))
-            category_records = cursor.fetchall()
-            
-            for record in category_records:
-                suggested_categories.append({
-                    "id": record[0],
-                    "created_at": record[1].isoformat() if record[1] else None,
-                    "updated_at": record[2].isoformat() if record[2] else None
-                })
-        suggested_categories = []
-
-        response = {
-            "messages": messages,
-            "convo_summary": convo_summary,
-            "suggested_categories": suggested_categories,
-        }
-
-        # Close connection
-        cursor.close()
-        conn.close()
-        logger.info(f"Successfully fetched chat background for user: {user_id}")
-        
-        return response
+        row = get_db().fetchrow_sync(CHAT_BACKGROUND_QUERY, user_id, high_water)
+    except Exception as e:
+        logger.error(f"Error retrieving chat background: {e}")
+        return _empty_background()
+
+    logger.info(f"Successfully fetched chat background for user: {user_id}")
+    return _to_background(user_id, high_water, row)
+
 
+async def get_chat_background_async(user_id: str) -> ChatBackground:
+    """Async variant of `get_chat_background` for code running on an event loop."""
+    high_water = get_message_history().high_water(user_id)
+    try:
+        row = await get_db().fetchrow(CHAT_BACKGROUND_QUERY, user_id, high_water)
     except Exception as e:
         logger.error(f"Error retrieving chat background: {e}")
-        # Ensure connection is closed even if an error occurs
-        if 'cursor' in locals() and cursor:
-            cursor.close()
-        if 'conn' in locals() and conn:
-            conn.close()
-        return False
+        return _empty_background()
+
+    logger.info(f"Successfully fetched chat background for user: {user_id}")
+    return _to_background(user_id, high_water, row)
@@ -0,0 +1,43 @@
+import logging
+from typing import Dict, Iterable, Optional
+
+from rooki_ai.utils.db import get_db
+from rooki_ai.utils.voice_cache import get_voice_cache
+
+logger = logging.getLogger(__name__)
+
+
+def get_storage_urls(x_handles: Iterable[str]) -> Dict[str, Optional[str]]:
+    """
+    Look up the tweet corpus storage URL of several handles with one query.
+
+    The Voice rows found are put in the Voice cache, so the crews started for
+    these handles (SupabaseUserTweetsStorageUrlTool) don't query again.
+
+    Args:
+        x_handles: Twitter handles to look up
+
+    Returns:
+        dict: x_handle -> storage_url for handles that have a Voice row; the
+        URL is None when the row has no corpus yet
+
+    Raises:
+        DatabaseNotConfigured: If DATABASE_URL is not set
+        Exception: If the query fails
+    """
+    handles = list(dict.fromkeys(x_handles))
+    rows = get_db().fetch_sync(
+        'SELECT * FROM public."Voice" WHERE x_handle = ANY($1)',
+        handles,
+    )
+
+    storage_urls: Dict[str, Optional[str]] = {}
+    for row in rows:
+        # Older databases lack the unique index on x_handle; prefer a row that has a corpus
+        if storage_urls.get(row["x_handle"]) is None:
+            storage_urls[row["x_handle"]] = row["storage_url"]
+
+    get_voice_cache().prime(row for row in rows if row["storage_url"])
+
+    logger.info(f"Looked up storage URLs for {len(handles)} handles, {len(rows)} rows")
+    return storage_urls
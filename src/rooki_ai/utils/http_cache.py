@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional
+
+import httpx
+
+from rooki_ai.utils.http_client import HttpClient, get_http_client
+
+logger = logging.getLogger(__name__)
+
+
+class CachedBody(NamedTuple):
+    content: bytes
+    content_type: str
+    # Wall-clock time the body was last confirmed current by the server
+    fetched_at: float
+    # True when the server couldn't be reached and an older copy was served
+    stale: bool
+
+
+class HttpDiskCache:
+    """On-disk HTTP cache for feeds that change far less often than they're read.
+
+    A body is stored under HTTP_CACHE_DIR with its ETag and Last-Modified.
+    Within HTTP_CACHE_MAX_AGE_SECONDS of the last fetch it is served straight
+    from disk. After that the server is asked with If-None-Match /
+    If-Modified-Since; a 304 only refreshes the timestamp. When the server
+    can't be reached or answers with an error, the stored copy is served,
+    marked stale.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_age: Optional[float] = None,
+        client: Optional[HttpClient] = None,
+    ):
+        if directory is None:
+            directory = os.environ.get(
+                "HTTP_CACHE_DIR", os.path.join(tempfile.gettempdir(), "rooki_ai_http_cache")
+            )
+        if max_age is None:
+            max_age = float(os.environ.get("HTTP_CACHE_MAX_AGE_SECONDS", "300"))
+
+        self.directory = directory
+        self.max_age = max_age
+        self._client = client or get_http_client()
+
+        self._metrics_lock = threading.Lock()
+        self._counts = {"fresh": 0, "revalidated": 0, "downloaded": 0, "stale": 0}
+
+    def get_sync(self, url: str) -> CachedBody:
+        """
+        Return the body of `url`, from disk when it is fresh or unchanged.
+
+        Raises:
+            httpx.HTTPError: If the server can't be reached or returns an
+            error and there is no stored copy to fall back on
+        """
+        meta = self._load_meta(url)
+        if self._is_fresh(meta):
+            return self._hit(url, meta, "fresh")
+        try:
+            response = self._client.get_sync(url, headers=self._validators(meta))
+        except httpx.TransportError as e:
+            return self._fall_back(url, meta, e)
+        return self._store(url, meta, response)
+
+    async def get(self, url: str) -> CachedBody:
+        """Async variant of `get_sync`; disk access runs in a worker thread."""
+        meta = await asyncio.to_thread(self._load_meta, url)
+        if self._is_fresh(meta):
+            return await asyncio.to_thread(self._hit, url, meta, "fresh")
+        try:
+            response = await self._client.get(url, headers=self._validators(meta))
+        except httpx.TransportError as e:
+            return await asyncio.to_thread(self._fall_back, url, meta, e)
+        return await asyncio.to_thread(self._store, url, meta, response)
+
+    def stats(self) -> Dict[str, Any]:
+        """Count how requests were answered: fresh, revalidated, downloaded or stale."""
+        with self._metrics_lock:
+            counts = dict(self._counts)
+        total = sum(counts.values())
+        return {
+            **counts,
+            "local_ratio": (total - counts["downloaded"]) / total if total else 0.0,
+            "max_age_seconds": self.max_age,
+            "directory": self.directory,
+        }
+
+    def _path(self, url: str, suffix: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest() + suffix)
+
+    def _load_meta(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(url, ".json")) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # The body is written first, so a missing body means a broken entry
+        return meta if os.path.exists(self._path(url, ".body")) else None
+
+    def _is_fresh(self, meta: Optional[Dict[str, Any]]) -> bool:
+        return meta is not None and time.time() - meta["fetched_at"] < self.max_age
+
+    @staticmethod
+    def _validators(meta: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def _store(self, url: str, meta: Optional[Dict[str, Any]], response: httpx.Response) -> CachedBody:
+        if response.status_code == 304 and meta is not None:
+            meta["fetched_at"] = time.time()
+            self._write(self._path(url, ".json"), json.dumps(meta).encode())
+            return self._hit(url, meta, "revalidated")
+
+        if response.status_code >= 400:
+            if meta is not None:
+                return self._fall_back(url, meta, f"HTTP {response.status_code}")
+            response.raise_for_status()
+
+        meta = {
+            "url": url,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "content_type": response.headers.get("content-type", ""),
+            "fetched_at": time.time(),
+        }
+        self._write(self._path(url, ".body"), response.content)
+        self._write(self._path(url, ".json"), json.dumps(meta).encode())
+        self._count("downloaded")
+        return CachedBody(response.content, meta["content_type"], meta["fetched_at"], False)
+
+    def _fall_back(self, url: str, meta: Optional[Dict[str, Any]], error) -> CachedBody:
+        if meta is None:
+            raise error
+        age = time.time() - meta["fetched_at"]
+        logger.warning(f"Serving {age:.0f}s old copy of {url}: {error}")
+        return self._hit(url, meta, "stale")
+
+    def _hit(self, url: str, meta: Dict[str, Any], outcome: str) -> CachedBody:
+        with open(self._path(url, ".body"), "rb") as f:
+            content = f.read()
+        self._count(outcome)
+        return CachedBody(content, meta["content_type"], meta["fetched_at"], outcome == "stale")
+
+    def _write(self, path: str, data: bytes):
+        # Write then rename so concurrent readers never see a partial file
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _count(self, outcome: str):
+        with self._metrics_lock:
+            self._counts[outcome] += 1
+
+
+_cache: Optional[HttpDiskCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HttpDiskCache:
+    """Return the process-wide HTTP disk cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = HttpDiskCache()
+    return _cache
@@ -0,0 +1,285 @@
+import asyncio
+import contextlib
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+import httpx
+
+from rooki_ai.utils.runtime import get_runtime
+
+logger = logging.getLogger(__name__)
+
+# Worth another attempt for idempotent requests
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HttpClient:
+    """Process-wide pooled HTTP clients for the fetch tools.
+
+    Keeps one `httpx.Client` for blocking callers (crew tool threads) and one
+    `httpx.AsyncClient` on the shared runtime loop for async callers, so
+    repeated fetches from Supabase storage or GitHub reuse warm keep-alive
+    connections instead of paying DNS, TCP and TLS setup every time. HTTP/2
+    is used when the optional `h2` package is installed (the `http2` extra)
+    and HTTP_HTTP2 isn't disabled.
+
+    GET requests that fail with a transport error or a 429/5xx status are
+    retried up to HTTP_MAX_RETRIES times with exponential backoff. Latency
+    of every attempt is recorded per host.
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        http2: Optional[bool] = None,
+    ):
+        env = os.environ.get
+        self.max_connections = (
+            max_connections
+            if max_connections is not None
+            else int(env("HTTP_MAX_CONNECTIONS", "20"))
+        )
+        self.max_keepalive = (
+            max_keepalive if max_keepalive is not None else int(env("HTTP_MAX_KEEPALIVE", "10"))
+        )
+        self.connect_timeout = (
+            connect_timeout
+            if connect_timeout is not None
+            else float(env("HTTP_CONNECT_TIMEOUT_SECONDS", "5"))
+        )
+        self.read_timeout = (
+            read_timeout
+            if read_timeout is not None
+            else float(env("HTTP_READ_TIMEOUT_SECONDS", "30"))
+        )
+        self.max_retries = (
+            max_retries if max_retries is not None else int(env("HTTP_MAX_RETRIES", "2"))
+        )
+        if http2 is None:
+            http2 = env("HTTP_HTTP2", "true").lower() in ("1", "true", "yes")
+        self.http2 = http2 and _http2_available()
+
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+
+        self._metrics_lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, float]] = {}
+        self._retries = 0
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """
+        GET `url` through the pooled async client, retrying transient failures.
+
+        Returns:
+            httpx.Response: The final response; callers check its status
+
+        Raises:
+            httpx.HTTPError: If every attempt failed with a transport error
+        """
+        return await get_runtime().run_async(self._get_async(url, **kwargs))
+
+    def get_sync(self, url: str, **kwargs) -> httpx.Response:
+        """Blocking counterpart of `get` for code running outside an event loop."""
+        client = self._sync_client()
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                response = client.get(url, **kwargs)
+            except httpx.TransportError as e:
+                delay = self._retry_delay(url, attempt, started, error=e)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(url, attempt, started, response=response)
+                if delay is None:
+                    return response
+            time.sleep(delay)
+
+    @contextlib.contextmanager
+    def stream_sync(self, url: str, **kwargs) -> Iterator[httpx.Response]:
+        """
+        GET `url` without reading the body, for consumers of `iter_bytes()`.
+
+        Failures before the body starts are retried like `get_sync`; the
+        recorded latency is the time to the response headers.
+
+        Raises:
+            httpx.HTTPError: If every attempt failed with a transport error
+        """
+        client = self._sync_client()
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                response = client.send(client.build_request("GET", url, **kwargs), stream=True)
+            except httpx.TransportError as e:
+                delay = self._retry_delay(url, attempt, started, error=e)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(url, attempt, started, response=response)
+                if delay is None:
+                    try:
+                        yield response
+                    finally:
+                        response.close()
+                    return
+                response.close()
+            time.sleep(delay)
+
+    async def aclose(self):
+        """Close both clients from any event loop; later requests reopen them."""
+        client, self._client = self._client, None
+        if client is not None:
+            client.close()
+        if self._async_client is not None:
+            await get_runtime().run_async(self._close_async())
+
+    def close(self):
+        """Blocking counterpart of `aclose`."""
+        client, self._client = self._client, None
+        if client is not None:
+            client.close()
+        if self._async_client is not None:
+            get_runtime().run_sync(self._close_async())
+
+    def stats(self) -> Dict[str, Any]:
+        """Report per-host request counts, errors and latencies."""
+        with self._metrics_lock:
+            hosts = {
+                host: {
+                    "requests": int(m["requests"]),
+                    "errors": int(m["errors"]),
+                    "avg_ms": m["seconds"] / m["requests"] * 1000,
+                    "max_ms": m["max_seconds"] * 1000,
+                }
+                for host, m in self._hosts.items()
+            }
+            retries = self._retries
+        return {
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "max_keepalive": self.max_keepalive,
+            "retries": retries,
+            "hosts": hosts,
+        }
+
+    async def _get_async(self, url: str, **kwargs) -> httpx.Response:
+        client = self._get_async_client()
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                response = await client.get(url, **kwargs)
+            except httpx.TransportError as e:
+                delay = self._retry_delay(url, attempt, started, error=e)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(url, attempt, started, response=response)
+                if delay is None:
+                    return response
+            await asyncio.sleep(delay)
+
+    def _client_options(self) -> Dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "follow_redirects": True,
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=30,
+            ),
+            "timeout": httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+        }
+
+    def _sync_client(self) -> httpx.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(**self._client_options())
+        return self._client
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        # Only called on the runtime loop, so no lock is needed
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(**self._client_options())
+        return self._async_client
+
+    async def _close_async(self):
+        client, self._async_client = self._async_client, None
+        if client is not None:
+            await client.aclose()
+
+    def _retry_delay(
+        self,
+        url: str,
+        attempt: int,
+        started: float,
+        response: Optional[httpx.Response] = None,
+        error: Optional[Exception] = None,
+    ) -> Optional[float]:
+        """
+        Record a GET attempt and return how long to wait before retrying it,
+        or None if it is final. Every request path goes through here so they
+        all retry the same failures with the same backoff; a Retry-After
+        given in seconds is honoured.
+        """
+        self._record(url, started, failed=response is None or response.status_code >= 400)
+        if attempt == self.max_retries:
+            return None
+        if response is not None and response.status_code not in RETRY_STATUS_CODES:
+            return None
+
+        with self._metrics_lock:
+            self._retries += 1
+        delay = min(0.5 * 2**attempt, 30)
+        if response is None:
+            logger.warning(f"GET {url} failed ({error}); retrying in {delay:g}s")
+            return delay
+
+        retry_after = response.headers.get("retry-after", "")
+        if retry_after.isdigit():
+            delay = min(float(retry_after), 30)
+        logger.warning(f"GET {url} returned {response.status_code}; retrying in {delay:g}s")
+        return delay
+
+    def _record(self, url: str, started: float, failed: bool):
+        elapsed = time.perf_counter() - started
+        host = httpx.URL(url).host
+        with self._metrics_lock:
+            m = self._hosts.setdefault(
+                host, {"requests": 0, "errors": 0, "seconds": 0.0, "max_seconds": 0.0}
+            )
+            m["requests"] += 1
+            m["errors"] += failed
+            m["seconds"] += elapsed
+            m["max_seconds"] = max(m["max_seconds"], elapsed)
+
+
+_http_client: Optional[HttpClient] = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Return the process-wide HTTP client, configured from the environment on first use."""
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = HttpClient()
+    return _http_client
@@ -0,0 +1,152 @@
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator, List
+
+from rooki_ai.utils.http_client import get_http_client
+
+CHUNK_SIZE = 64 * 1024
+
+# {"tweets": [ ... ]} exports are streamed like a bare array
+_TWEETS_WRAPPER = re.compile(r'\{\s*"tweets"\s*:\s*\[')
+_WHITESPACE = re.compile(r"\s*")
+_SEPARATORS = re.compile(r"[\s,]*")
+# Enough of an object's start to tell whether it is the tweets wrapper
+_WRAPPER_LOOKAHEAD = 64
+# What can still follow a number at the end of the buffer: "4." + "5e10"
+_NUMBER_TAIL = re.compile(r"[-+.eE0-9]*\Z")
+
+
+class RecordParser:
+    """Incremental parser for tweet corpora in JSON or JSONL form.
+
+    Feed it the raw body in chunks of any size; it returns the records that
+    became complete. Accepted layouts:
+
+    - a JSON array of records, or an object whose first key is "tweets"
+      holding one, parsed element by element
+    - JSONL, or any sequence of concatenated JSON values; a value that is an
+      object with a "tweets" list contributes that list's items
+
+    Only the unparsed tail is buffered, so memory stays around one chunk
+    plus the largest record, whatever the corpus size. An object whose
+    "tweets" key isn't first is buffered whole before it is split.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        # utf-8-sig drops a leading byte order mark; split characters are held back
+        self._text = codecs.getincrementaldecoder("utf-8-sig")()
+        self._buffer = ""
+        self._mode = None  # "array", "values" or "done"
+        # Buffered characters needed before an incomplete record is retried;
+        # doubling keeps re-parsing a huge record linear overall
+        self._retry_at = 0
+        self.records = 0
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Add the next chunk of the body and return the records it completed."""
+        self._buffer += self._text.decode(chunk)
+        if len(self._buffer) < self._retry_at:
+            return []
+        return self._drain(final=False)
+
+    def close(self) -> List[Any]:
+        """
+        Signal the end of the body and return the remaining records.
+
+        Raises:
+            json.JSONDecodeError: If the body ends inside a record
+            ValueError: If the body ends inside an array, or a top-level value
+            is not an object or array
+        """
+        self._buffer += self._text.decode(b"", final=True)
+        records = self._drain(final=True)
+        if self._mode == "array":
+            raise ValueError("Unterminated JSON array")
+        return records
+
+    def _drain(self, final: bool) -> List[Any]:
+        buffer, pos, out = self._buffer, 0, []
+
+        while self._mode != "done":
+            if self._mode is None:
+                pos = _WHITESPACE.match(buffer, pos).end()
+                if pos == len(buffer):
+                    break
+                if buffer[pos] == "{" and len(buffer) - pos < _WRAPPER_LOOKAHEAD and not final:
+                    break
+                match = _TWEETS_WRAPPER.match(buffer, pos)
+                if match:
+                    self._mode, pos = "array", match.end()
+                elif buffer[pos] == "[":
+                    self._mode, pos = "array", pos + 1
+                else:
+                    self._mode = "values"
+                continue
+
+            skip = _SEPARATORS if self._mode == "array" else _WHITESPACE
+            pos = skip.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            if self._mode == "array" and buffer[pos] == "]":
+                # Anything after the array (the rest of a wrapper object) is ignored
+                self._mode = "done"
+                break
+
+            try:
+                value, end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                # The record continues in the next chunk
+                self._retry_at = 2 * (len(buffer) - pos)
+                break
+            if not final and _NUMBER_TAIL.match(buffer, end):
+                # A number at the very end may still have digits, a fraction
+                # or an exponent to come
+                break
+            pos = end
+            self._retry_at = 0
+
+            if self._mode == "array":
+                out.append(value)
+            elif isinstance(value, dict) and isinstance(value.get("tweets"), list):
+                out.extend(value["tweets"])
+            elif isinstance(value, list):
+                out.extend(value)
+            elif isinstance(value, dict):
+                out.append(value)
+            else:
+                raise ValueError(f"Unexpected data format: {type(value)}")
+
+        self._buffer = "" if self._mode == "done" else buffer[pos:]
+        self.records += len(out)
+        return out
+
+
+def iter_records(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield the records of a JSON or JSONL body as its chunks arrive."""
+    parser = RecordParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+def iter_url_records(url: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Stream the records of a JSON or JSONL document over the shared HTTP client.
+
+    Raises:
+        httpx.HTTPError: If the request fails or returns an error status
+        json.JSONDecodeError: If the document is malformed
+    """
+    with get_http_client().stream_sync(url) as response:
+        response.raise_for_status()
+        yield from iter_records(response.iter_bytes(chunk_size))
+
+
+def iter_file_records(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Stream the records of a JSON or JSONL file."""
+    with open(path, "rb") as f:
+        yield from iter_records(iter(lambda: f.read(chunk_size), b""))
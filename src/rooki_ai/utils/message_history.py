@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+# Rows the chat background query returns per user; also the ring buffer size
+HISTORY_LIMIT = 50
+
+
+class _History:
+    __slots__ = ("messages", "high_water", "seeded_at")
+
+    def __init__(self, limit: int):
+        # Newest first, like the query returns them
+        self.messages: Deque[Dict[str, Any]] = deque(maxlen=limit)
+        self.high_water: Optional[str] = None
+        self.seeded_at = time.monotonic()
+
+
+class MessageHistory:
+    """Per-user ring buffers of recent chat messages.
+
+    The first chat turn for a user loads their HISTORY_LIMIT latest
+    messages; later turns only fetch messages created or edited after the
+    buffer's high-water mark and merge them in, dropping the oldest. Buffers
+    are reseeded from scratch after MESSAGE_HISTORY_TTL_SECONDS so deleted
+    messages eventually disappear, and only the MESSAGE_HISTORY_USERS most
+    recently active users are kept.
+
+    Timestamps are the ISO 8601 strings Postgres produces for the JSON
+    column, which sort correctly as strings.
+    """
+
+    def __init__(
+        self,
+        max_users: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        limit: int = HISTORY_LIMIT,
+    ):
+        if max_users is None:
+            max_users = int(os.environ.get("MESSAGE_HISTORY_USERS", "1000"))
+        if ttl_seconds is None:
+            ttl_seconds = float(os.environ.get("MESSAGE_HISTORY_TTL_SECONDS", "600"))
+
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self.limit = limit
+
+        self._users: "OrderedDict[str, _History]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._seeds = 0
+        self._updates = 0
+        self._rows = 0
+        self._evictions = 0
+
+    def high_water(self, user_id: str) -> Optional[str]:
+        """
+        Return the newest created_at/edited_at buffered for the user.
+
+        None means the user has no usable buffer and the caller should load
+        their full recent history.
+        """
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return None
+            if entry.seeded_at + self.ttl_seconds < time.monotonic():
+                del self._users[user_id]
+                return None
+            return entry.high_water
+
+    def update(
+        self, user_id: str, high_water: Optional[str], messages: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Merge freshly loaded messages into the user's buffer.
+
+        Args:
+            user_id: The user the messages belong to
+            high_water: What `high_water` returned before the messages were
+                loaded; None if `messages` is the full recent history
+            messages: Messages newer than `high_water`, newest first
+
+        Returns:
+            list: The user's buffered messages, newest first
+        """
+        with self._lock:
+            entry = self._users.pop(user_id, None)
+            # A full page of changes may have skipped some; start over from it
+            if entry is None or high_water is None or len(messages) >= self.limit:
+                entry = _History(self.limit)
+                self._seeds += 1
+            else:
+                self._updates += 1
+            self._rows += len(messages)
+
+            for message in reversed(messages):
+                self._merge(entry, message)
+                for stamp in (message["created_at"], message["edited_at"]):
+                    if stamp and (entry.high_water is None or stamp > entry.high_water):
+                        entry.high_water = stamp
+
+            self._users[user_id] = entry
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+                self._evictions += 1
+            return list(entry.messages)
+
+    def stats(self) -> Dict[str, Any]:
+        """Report buffered users and how many loads were incremental."""
+        with self._lock:
+            loads = self._seeds + self._updates
+            return {
+                "users": len(self._users),
+                "max_users": self.max_users,
+                "seeds": self._seeds,
+                "updates": self._updates,
+                "incremental_ratio": self._updates / loads if loads else 0.0,
+                "avg_rows_per_load": self._rows / loads if loads else 0.0,
+                "evictions": self._evictions,
+            }
+
+    @staticmethod
+    def _merge(entry: _History, message: Dict[str, Any]):
+        messages = entry.messages
+        for i, buffered in enumerate(messages):
+            if buffered["id"] == message["id"]:
+                # Edited since we buffered it
+                messages[i] = message
+                return
+        if not messages or message["created_at"] >= messages[0]["created_at"]:
+            messages.appendleft(message)
+            return
+        # Committed late with an older timestamp; keep the buffer ordered
+        ordered = sorted([*messages, message], key=lambda m: m["created_at"], reverse=True)
+        messages.clear()
+        messages.extend(ordered[: messages.maxlen])
+
+
+_history: Optional[MessageHistory] = None
+_history_lock = threading.Lock()
+
+
+def get_message_history() -> MessageHistory:
+    """Return the process-wide message history cache."""
+    global _history
+    if _history is None:
+        with _history_lock:
+            if _history is None:
+                _history = MessageHistory()
+    return _history
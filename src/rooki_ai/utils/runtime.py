@@ -0,0 +1,163 @@
+import asyncio
+import concurrent.futures
+import logging
+import os
+import threading
+from typing import Any, Callable, Coroutine, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _InstrumentedExecutor(concurrent.futures.ThreadPoolExecutor):
+    """ThreadPoolExecutor that tracks how many submitted calls are executing."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._count_lock = threading.Lock()
+        self.active = 0
+        self.completed = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        def tracked():
+            with self._count_lock:
+                self.active += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._count_lock:
+                    self.active -= 1
+                    self.completed += 1
+
+        return super().submit(tracked)
+
+
+class Runtime:
+    """Shared execution layer for blocking crew work and background coroutines.
+
+    Owns one sized thread pool (CREW_WORKER_THREADS, defaulting to a few more
+    than MAX_CONCURRENT_JOBS) and one long-lived event loop running in its own
+    thread. Sync code that needs to await something (tools calling async SDKs)
+    submits coroutines to that loop instead of spinning up a loop per call.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        if max_workers is None:
+            max_concurrent = int(os.environ.get("MAX_CONCURRENT_JOBS", "5"))
+            max_workers = int(
+                os.environ.get("CREW_WORKER_THREADS", str(max_concurrent + 4))
+            )
+        self.max_workers = max_workers
+        self._executor: Optional[_InstrumentedExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    @property
+    def executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        self.start()
+        return self._executor
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        self.start()
+        return self._loop
+
+    def start(self):
+        """Create the thread pool and background loop; safe to call repeatedly."""
+        with self._lock:
+            if self._executor is not None:
+                return
+
+            self._executor = _InstrumentedExecutor(
+                max_workers=self.max_workers, thread_name_prefix="rooki-worker"
+            )
+            self._loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(self._loop)
+                self._loop.call_soon(ready.set)
+                self._loop.run_forever()
+
+            self._loop_thread = threading.Thread(
+                target=run_loop, name="rooki-loop", daemon=True
+            )
+            self._loop_thread.start()
+            ready.wait()
+            logger.info(f"Runtime started with {self.max_workers} worker threads")
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> concurrent.futures.Future:
+        """Run a blocking callable on the shared thread pool."""
+        return self.executor.submit(fn, *args, **kwargs)
+
+    def run_coroutine(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Schedule a coroutine on the background loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def run_async(self, coro: Coroutine) -> Any:
+        """Await a coroutine on the background loop from any event loop.
+
+        For resources bound to the runtime loop (the database pool, the
+        shared HTTP client) used from request or flow loops.
+        """
+        if asyncio.get_running_loop() is self.loop:
+            return await coro
+        return await asyncio.wrap_future(self.run_coroutine(coro))
+
+    def run_sync(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the background loop and block until it finishes.
+
+        Raises:
+            RuntimeError: If called from the background loop itself, which
+            would deadlock
+        """
+        if threading.current_thread() is self._loop_thread:
+            coro.close()
+            raise RuntimeError("run_sync() cannot be called from the runtime loop")
+        return self.run_coroutine(coro).result(timeout)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the background loop and drain the thread pool."""
+        with self._lock:
+            if self._executor is None:
+                return
+
+            loop, thread, executor = self._loop, self._loop_thread, self._executor
+            self._executor = self._loop = self._loop_thread = None
+
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+        loop.close()
+        executor.shutdown(wait=wait, cancel_futures=not wait)
+        logger.info("Runtime shut down")
+
+    def stats(self) -> Dict[str, Any]:
+        """Report thread pool utilisation and background loop load."""
+        if self._executor is None:
+            return {"started": False, "max_workers": self.max_workers}
+
+        executor = self._executor
+        return {
+            "started": True,
+            "max_workers": self.max_workers,
+            "threads": len(executor._threads),
+            "active": executor.active,
+            "queued": executor._work_queue.qsize(),
+            "completed": executor.completed,
+            "utilisation": executor.active / self.max_workers,
+            "loop_tasks": len(asyncio.all_tasks(self._loop)),
+        }
+
+
+_runtime = Runtime()
+
+
+def get_runtime() -> Runtime:
+    """Return the process-wide runtime, starting it on first use."""
+    _runtime.start()
+    return _runtime
@@ -0,0 +1,184 @@
+import json
+import logging
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from rooki_ai.models.tweet import Tweet
+from rooki_ai.utils.corpus_store import get_corpus_store
+from rooki_ai.utils.text_patterns import STYLE_TOKENS, TAG_PREFIXES
+from rooki_ai.utils.voice_cache import get_voice_cache
+
+logger = logging.getLogger(__name__)
+
+# ContentMetrics field of VoiceProfileResponse for each tweet type; retweets
+# aren't the user's writing and are left out
+METRIC_FIELDS = {
+    "post": "post_metrics",
+    "reply": "reply_metrics",
+    "quote": "quoted_metrics",
+}
+LONG_FORM_FIELD = "long_form_text_metrics"
+# Tweets longer than this also count towards the long-form metrics
+LONG_FORM_CHARS = 280
+SKIPPED_TYPES = frozenset({"retweet"})
+
+# Sentence openers that make a command or request ("Join us", "Stop
+# guessing", "Don't ship on Fridays"). Verbs that mostly open statements
+# in tweets ("Love this", "Thanks") are deliberately left out.
+IMPERATIVE_OPENERS = frozenset(
+    """
+    add apply ask avoid be book bookmark bring build buy call check choose click come
+    comment consider contact create cut dm do don't download drop email enter explore
+    find fix focus follow forget get give go grab guess have hit imagine install invest
+    join keep learn leave let let's listen look make meet never note pay pick plan play
+    please post put quit read reach register remember reply repost retweet review run
+    save say see send set share ship show sign skip start stay steal stop subscribe
+    take talk tell test think try turn use visit wait watch write
+    """.split()
+)
+
+FALLBACK_METRICS_NOTE = (
+    "not available for this handle; estimate them from the tweet data, "
+    "following the ContentMetrics definitions"
+)
+
+
+class TextStats(NamedTuple):
+    sentences: int
+    words: int
+    imperatives: int
+    emojis: int
+
+
+def analyze_text(text: str) -> TextStats:
+    """
+    Count the sentences, words, imperative sentences and emojis of a text in
+    one scan, as defined on ContentMetrics.
+
+    URLs are skipped. Hashtags, mentions and cashtags are words; an emoji is
+    a token but not a word. A sentence needs at least one word, and is
+    imperative when its first word that isn't a tag opens a command.
+    """
+    sentences = words = imperatives = emojis = 0
+    sentence_words = 0
+    opener = None
+
+    for match in STYLE_TOKENS.finditer(text):
+        kind = match.lastgroup
+        if kind == "word":
+            words += 1
+            sentence_words += 1
+            if opener is None:
+                word = match.group()
+                if word[0] not in TAG_PREFIXES:
+                    opener = word
+        elif kind == "emoji":
+            emojis += 1
+        elif kind == "end":
+            if sentence_words:
+                sentences += 1
+                if opener is not None and _is_imperative(opener):
+                    imperatives += 1
+            sentence_words = 0
+            opener = None
+
+    if sentence_words:
+        sentences += 1
+        if opener is not None and _is_imperative(opener):
+            imperatives += 1
+    return TextStats(sentences, words, imperatives, emojis)
+
+
+def _is_imperative(word: str) -> bool:
+    return word.lower().replace("’", "'") in IMPERATIVE_OPENERS
+
+
+class StyleCounts:
+    """Running totals for one content type; merge partial counts with `merge`."""
+
+    __slots__ = ("texts", "sentences", "words", "imperatives", "emojis")
+
+    def __init__(self):
+        self.texts = 0
+        self.sentences = 0
+        self.words = 0
+        self.imperatives = 0
+        self.emojis = 0
+
+    def add(self, stats: TextStats):
+        self.texts += 1
+        self.sentences += stats.sentences
+        self.words += stats.words
+        self.imperatives += stats.imperatives
+        self.emojis += stats.emojis
+
+    def merge(self, other: "StyleCounts"):
+        self.texts += other.texts
+        self.sentences += other.sentences
+        self.words += other.words
+        self.imperatives += other.imperatives
+        self.emojis += other.emojis
+
+    def metrics(self) -> Dict[str, float]:
+        """Return the ContentMetrics fields; all 0 when no text was counted."""
+        tokens = self.words + self.emojis
+        return {
+            "avg_sentence_len": round(self.words / self.sentences, 4) if self.sentences else 0.0,
+            "imperative_pct": round(self.imperatives / self.sentences, 4) if self.sentences else 0.0,
+            "emoji_rate": round(self.emojis / tokens, 4) if tokens else 0.0,
+        }
+
+
+def count_styles(tweets: Iterable[Tweet]) -> Dict[str, StyleCounts]:
+    """Tally every tweet's text into the counts of its ContentMetrics fields."""
+    counts = {field: StyleCounts() for field in (*METRIC_FIELDS.values(), LONG_FORM_FIELD)}
+    long_form = counts[LONG_FORM_FIELD]
+    for tweet in tweets:
+        if tweet.type in SKIPPED_TYPES:
+            continue
+        stats = analyze_text(tweet.text)
+        counts[METRIC_FIELDS.get(tweet.type, "post_metrics")].add(stats)
+        if len(tweet.text) > LONG_FORM_CHARS:
+            long_form.add(stats)
+    return counts
+
+
+def content_metrics(tweets: Iterable[Tweet]) -> Dict[str, Dict[str, float]]:
+    """
+    Compute the ContentMetrics of each content type in one pass over `tweets`.
+
+    Returns:
+        dict: post_metrics, reply_metrics, quoted_metrics and
+        long_form_text_metrics, each with avg_sentence_len, imperative_pct
+        and emoji_rate
+    """
+    return {field: counts.metrics() for field, counts in count_styles(tweets).items()}
+
+
+def corpus_metrics(storage_url: str) -> Dict[str, Dict[str, float]]:
+    """
+    Compute the ContentMetrics of a stored tweet corpus through the corpus store.
+
+    Raises:
+        httpx.HTTPError: If the corpus can't be fetched
+        json.JSONDecodeError: If the corpus is malformed
+    """
+    with get_corpus_store().open_sync(storage_url) as corpus:
+        return content_metrics(corpus.tweets())
+
+
+def handle_metrics(x_handle: str) -> Optional[Dict[str, Dict[str, float]]]:
+    """Compute the ContentMetrics of a handle's corpus; None if it has none or it fails."""
+    try:
+        row = get_voice_cache().get_by_handle(x_handle)
+        if not row or not row["storage_url"]:
+            logger.info(f"No tweet corpus for {x_handle}; content metrics left to the crew")
+            return None
+        return corpus_metrics(row["storage_url"])
+    except Exception as e:
+        logger.warning(f"Failed to compute content metrics for {x_handle}: {e}")
+        return None
+
+
+def format_metrics(metrics: Optional[Dict[str, Dict[str, float]]]) -> str:
+    """Render metrics for a task prompt, or say they must be estimated."""
+    return json.dumps(metrics) if metrics is not None else FALLBACK_METRICS_NOTE
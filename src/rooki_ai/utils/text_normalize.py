@@ -0,0 +1,158 @@
+import re
+from typing import Iterable, Iterator
+
+from rooki_ai.models.tweet import Tweet
+from rooki_ai.utils.corpus_store import get_corpus_store
+from rooki_ai.utils.text_patterns import (
+    HTML_ENTITY_PATTERN,
+    INVISIBLE_CHARS,
+    LINE_BREAK,
+    MENTION_PATTERN,
+    URL_PATTERN,
+    URL_REST_PATTERN,
+)
+
+# How @mentions in the text are treated: kept as written, replaced by
+# MENTION_MASK, or dropped. The addressees X puts in front of a reply
+# ("@a @b thanks!") aren't the user's writing and are always dropped.
+MENTION_MODES = ("keep", "mask", "drop")
+MENTION_MASK = "@user"
+
+_ENTITIES = {"&amp;": "&", "&lt;": "<", "&gt;": ">"}
+# A gap right before these goes without a space: "see https://t.co/x." -> "see."
+_CLOSING = frozenset(".,!?;:)]}\u2026")
+# Every character \s matches in a str pattern
+_WHITESPACE = (
+    "\t\n\v\f\r\x1c\x1d\x1e\x1f \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005"
+    "\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000"
+)
+_ADDRESSEES = re.compile(f"(?:[\\s{INVISIBLE_CHARS}]*{MENTION_PATTERN})+")
+
+
+def _compile(mentions: str) -> "re.Pattern":
+    """
+    Build the single-pass normalizer for a mention mode.
+
+    Runs of whitespace, URLs and invisible characters (and mentions, when
+    they are dropped) form one gap, so removing a URL or mention never
+    leaves a double space. Every alternative starts with a literal
+    character, so the scanner jumps straight between candidates and turns
+    down a lone space, the common case, on the character after it.
+    """
+    gap_parts = [URL_PATTERN, f"[\\s{INVISIBLE_CHARS}]"]
+    if mentions == "drop":
+        gap_parts.append(MENTION_PATTERN)
+    gap = f"(?:{'|'.join(gap_parts)})"
+
+    # A lone space is already normal
+    branches = [f" {gap}+"]
+    branches += [f"{re.escape(char)}{gap}*" for char in _WHITESPACE + INVISIBLE_CHARS if char != " "]
+    branches += [
+        f"https?://{URL_REST_PATTERN}{gap}*",
+        f"www\\.{URL_REST_PATTERN}{gap}*",
+        HTML_ENTITY_PATTERN,
+    ]
+    if mentions == "mask":
+        branches.append("@(?<!\\w@)\\w+")
+    elif mentions == "drop":
+        branches.append(f"@(?<!\\w@)\\w+{gap}*")
+    return re.compile("|".join(branches))
+
+
+def _replace(match: "re.Match") -> str:
+    text = match.group()
+    entity = _ENTITIES.get(text)
+    if entity is not None:
+        return entity
+    if LINE_BREAK.search(text):
+        return "\n"
+    # Invisible characters alone leave nothing, nor does a gap before
+    # closing punctuation
+    end = match.end()
+    if not text.strip(INVISIBLE_CHARS) or match.string[end : end + 1] in _CLOSING:
+        return ""
+    return " "
+
+
+def _replace_masking(match: "re.Match") -> str:
+    if match.group()[0] == "@":
+        return MENTION_MASK
+    return _replace(match)
+
+
+_NORMALIZERS = {
+    mentions: (_compile(mentions), _replace_masking if mentions == "mask" else _replace)
+    for mentions in MENTION_MODES
+}
+
+
+def _drop_addressees(text: str) -> str:
+    addressees = _ADDRESSEES.match(text)
+    return text[addressees.end() :] if addressees else text
+
+
+def normalize_text(text: str, mentions: str = "keep", reply: bool = False) -> str:
+    """
+    Normalize a tweet's text in one scan.
+
+    URLs are removed; whitespace runs collapse to a space, or to a line
+    break if they contain one; zero-width junk is dropped and the HTML
+    entities of the X API are unescaped. Emojis (including ZWJ sequences,
+    skin tones and flags), hashtags and cashtags are left exactly as
+    written.
+
+    Args:
+        text: Tweet text
+        mentions: "keep", "mask" (as MENTION_MASK) or "drop" @mentions
+        reply: Whether the text is a reply, whose leading addressees are dropped
+
+    Returns:
+        str: The normalized text, without leading or trailing whitespace
+
+    Raises:
+        ValueError: If mentions is not one of MENTION_MODES
+    """
+    normalizer = _NORMALIZERS.get(mentions)
+    if normalizer is None:
+        raise ValueError(f"mentions must be one of {MENTION_MODES}, not {mentions!r}")
+    pattern, replace = normalizer
+    if reply:
+        text = _drop_addressees(text)
+    return pattern.sub(replace, text).strip()
+
+
+def normalize_tweets(tweets: Iterable[Tweet], mentions: str = "keep") -> Iterator[Tweet]:
+    """
+    Lazily normalize the text of each tweet; tweets left without text are skipped.
+
+    Raises:
+        ValueError: If mentions is not one of MENTION_MODES
+    """
+    if mentions not in MENTION_MODES:
+        raise ValueError(f"mentions must be one of {MENTION_MODES}, not {mentions!r}")
+    return _normalized(tweets, *_NORMALIZERS[mentions])
+
+
+def _normalized(tweets: Iterable[Tweet], pattern: "re.Pattern", replace) -> Iterator[Tweet]:
+    sub = pattern.sub
+    for tweet in tweets:
+        text = _drop_addressees(tweet.text) if tweet.type == "reply" else tweet.text
+        text = sub(replace, text).strip()
+        if text:
+            yield tweet._replace(text=text)
+
+
+def normalize_corpus(storage_url: str, mentions: str = "keep") -> Iterator[Tweet]:
+    """
+    Stream the normalized tweets of a stored corpus through the corpus store.
+
+    The corpus file stays mapped while the generator runs and is released
+    when it is exhausted or closed.
+
+    Raises:
+        httpx.HTTPError: If the corpus can't be fetched
+        json.JSONDecodeError: If the corpus is malformed
+        ValueError: If mentions is not one of MENTION_MODES
+    """
+    with get_corpus_store().open_sync(storage_url) as corpus:
+        yield from normalize_tweets(corpus.tweets(), mentions)
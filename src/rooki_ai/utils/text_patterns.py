@@ -0,0 +1,57 @@
+import re
+
+# Compiled once at import; the style metrics and text normalization scan
+# every tweet of a corpus with these.
+
+# A URL runs to the next whitespace but doesn't end on punctuation, so
+# "see https://x.co/a." still ends the sentence and "(https://x.co/a)"
+# keeps its closing parenthesis
+URL_REST_PATTERN = "\\S*[^\\s.,!?;:)\\]}'\"\u2026]"
+URL_PATTERN = f"(?:https?://|www\\.){URL_REST_PATTERN}"
+
+# One emoji as a reader sees it: a flag (pair of regional indicators), or a
+# pictograph with optional skin tone / presentation selector, joined into a
+# ZWJ sequence such as a family or a profession
+_PICTOGRAPH = "[\U0001F000-\U0001FAFF\u2600-\u27BF\u2B1B\u2B1C\u2B50\u2B55\u231A\u231B\u23E9-\u23FA]"
+_EMOJI_MODIFIER = "[\U0001F3FB-\U0001F3FF\uFE0F]"
+EMOJI_PATTERN = (
+    "(?:[\U0001F1E6-\U0001F1FF]{2}"
+    f"|{_PICTOGRAPH}{_EMOJI_MODIFIER}*(?:\u200D{_PICTOGRAPH}{_EMOJI_MODIFIER}*)*)"
+)
+
+# A word, hashtag, mention or cashtag; inner apostrophes, dots, commas,
+# colons and hyphens keep "don't", "3.5", "10,000" and "e-mail" whole
+WORD_PATTERN = "[#@$]?\\w+(?:['\u2019.,:\\-]\\w+)*"
+# Characters that mark a word as a tag rather than prose
+TAG_PREFIXES = "#@$"
+
+# Terminal punctuation not followed by a word character (so "3.5" and
+# "rooki.ai" don't end a sentence), or a line break
+SENTENCE_END_PATTERN = "[.!?\u2026]+(?!\\w)|\\n+"
+
+# Zero-width characters that carry nothing in a tweet: zero width space,
+# word joiner and byte order mark. ZWJ, ZWNJ and variation selectors stay,
+# emoji sequences and some scripts need them.
+INVISIBLE_CHARS = "\u200b\u2060\ufeff"
+
+# An @handle not preceded by a word character, so e-mail addresses aren't
+# mentions
+MENTION_PATTERN = "(?<!\\w)@\\w+"
+
+# The only entities the X API escapes in tweet text
+HTML_ENTITY_PATTERN = "&(?:amp|lt|gt);"
+
+URL = re.compile(URL_PATTERN)
+EMOJI = re.compile(EMOJI_PATTERN)
+WORD = re.compile(WORD_PATTERN)
+LINE_BREAK = re.compile("[\n\r\v\f\x85\u2028\u2029]")
+
+# Everything the style metrics need from a text in one left-to-right scan;
+# `match.lastgroup` names the kind of token. URLs come first so their
+# words and dots are skipped.
+STYLE_TOKENS = re.compile(
+    f"(?P<url>{URL_PATTERN})"
+    f"|(?P<end>{SENTENCE_END_PATTERN})"
+    f"|(?P<emoji>{EMOJI_PATTERN})"
+    f"|(?P<word>{WORD_PATTERN})"
+)
@@ -0,0 +1,190 @@
+import asyncio
+import concurrent.futures
+import hashlib
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from rooki_ai.utils.http_cache import get_http_cache
+from rooki_ai.utils.runtime import get_runtime
+from rooki_ai.utils.tweet_fields import engagement
+
+logger = logging.getLogger(__name__)
+
+TRENDING_TWEETS_URL = "https://raw.githubusercontent.com/RookiAi/rooki-app/refs/heads/main/public/tweets/Ycombinator.json"
+
+
+def parse_tweets(content: bytes, content_type: str) -> List[Dict[str, Any]]:
+    """Decode a tweets payload (JSON or JSONL) into a list of tweets."""
+    if "application/json" in content_type:
+        data = json.loads(content)
+    else:
+        # Try to parse as JSON anyway
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError:
+            # Try to parse as JSONL
+            lines = content.decode().strip().split("\n")
+            data = [json.loads(line) for line in lines if line.strip()]
+
+    # Normalize the response structure
+    if isinstance(data, dict):
+        # If it's a single object, convert to list
+        if "tweets" in data:
+            return data["tweets"]
+        return [data]
+    elif isinstance(data, list):
+        return data
+    else:
+        raise ValueError(f"Unexpected data format: {type(data)}")
+
+
+class TrendingSnapshot(NamedTuple):
+    """Top tweets of one trending source, ranked by engagement.
+
+    Snapshots are replaced, never modified; treat the tweets as read-only.
+    """
+
+    url: str
+    tweets: Tuple[Dict[str, Any], ...]
+    # Wall-clock time the source was last confirmed current
+    fetched_at: float
+    # True if the source couldn't be reached and an older copy was ranked
+    stale: bool
+    digest: str
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class TrendingFeed:
+    """Keeps ranked snapshots of the trending tweet sources in memory.
+
+    A background task on the shared runtime loop refetches every source in
+    TRENDING_SOURCES each TRENDING_REFRESH_SECONDS through the HTTP disk
+    cache, keeps the TRENDING_TOP_N tweets with the most engagement and
+    swaps the new snapshot in with a single assignment. Request handlers
+    read it with `snapshot()`: a dict lookup, no I/O. A failed refresh keeps
+    the previous snapshot, which then shows its age.
+    """
+
+    def __init__(
+        self,
+        urls: Optional[List[str]] = None,
+        interval: Optional[float] = None,
+        top_n: Optional[int] = None,
+    ):
+        if urls is None:
+            urls = [
+                url.strip()
+                for url in os.environ.get("TRENDING_SOURCES", TRENDING_TWEETS_URL).split(",")
+                if url.strip()
+            ]
+        if interval is None:
+            interval = float(os.environ.get("TRENDING_REFRESH_SECONDS", "300"))
+        if top_n is None:
+            top_n = int(os.environ.get("TRENDING_TOP_N", "50"))
+
+        self.urls = urls
+        self.interval = interval
+        self.top_n = top_n
+
+        # Replaced wholesale on every refresh, so readers never see a partial update
+        self._snapshots: Dict[str, TrendingSnapshot] = {}
+        self._task: Optional[concurrent.futures.Future] = None
+        self._lock = threading.Lock()
+
+        self._refreshes = 0
+        self._failures = 0
+
+    def snapshot(self, url: str = TRENDING_TWEETS_URL) -> Optional[TrendingSnapshot]:
+        """Return the latest snapshot of a source, or None before its first refresh."""
+        return self._snapshots.get(url)
+
+    def start(self):
+        """Start refreshing in the background; the first refresh runs right away."""
+        with self._lock:
+            if self._task is None:
+                self._task = get_runtime().run_coroutine(self._run())
+                logger.info(f"Refreshing {len(self.urls)} trending sources every {self.interval:g}s")
+
+    async def aclose(self):
+        """Stop the background refresh; usable from any event loop."""
+        with self._lock:
+            task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+
+    def close(self):
+        """Blocking counterpart of `aclose`."""
+        with self._lock:
+            task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+
+    async def refresh(self):
+        """Refetch and rerank every source now."""
+        await asyncio.gather(*(self._refresh_source(url) for url in self.urls))
+
+    def stats(self) -> Dict[str, Any]:
+        snapshots = self._snapshots
+        return {
+            "running": self._task is not None,
+            "refreshes": self._refreshes,
+            "failures": self._failures,
+            "sources": {
+                url: {
+                    "tweets": len(snapshot.tweets),
+                    "age_seconds": snapshot.age_seconds,
+                    "stale": snapshot.stale,
+                }
+                for url, snapshot in snapshots.items()
+            },
+        }
+
+    async def _run(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    async def _refresh_source(self, url: str):
+        try:
+            body = await get_http_cache().get(url)
+            digest = hashlib.sha256(body.content).hexdigest()
+            previous = self._snapshots.get(url)
+            if previous is not None and previous.digest == digest:
+                # Unchanged; keep the ranking and just note it is current
+                snapshot = previous._replace(fetched_at=body.fetched_at, stale=body.stale)
+            else:
+                tweets = await asyncio.to_thread(self._rank, body.content, body.content_type)
+                snapshot = TrendingSnapshot(url, tweets, body.fetched_at, body.stale, digest)
+        except Exception as e:
+            self._failures += 1
+            logger.warning(f"Failed to refresh trending source {url}: {e}")
+            return
+
+        self._snapshots = {**self._snapshots, url: snapshot}
+        self._refreshes += 1
+
+    def _rank(self, content: bytes, content_type: str) -> Tuple[Dict[str, Any], ...]:
+        tweets = [tweet for tweet in parse_tweets(content, content_type) if isinstance(tweet, dict)]
+        return tuple(heapq.nlargest(self.top_n, tweets, key=engagement))
+
+
+_feed: Optional[TrendingFeed] = None
+_feed_lock = threading.Lock()
+
+
+def get_trending_feed() -> TrendingFeed:
+    """Return the process-wide trending feed."""
+    global _feed
+    if _feed is None:
+        with _feed_lock:
+            if _feed is None:
+                _feed = TrendingFeed()
+    return _feed
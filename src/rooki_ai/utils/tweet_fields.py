@@ -0,0 +1,112 @@
+from typing import Any, Dict, List, Sequence
+
+# Tweet exports name engagement counters differently (X API v2 nests them
+# under public_metrics, scrapers and v1.1 exports use flat keys)
+LIKE_KEYS = ("like_count", "likes", "favorite_count", "favorites", "likeCount", "favoriteCount")
+RETWEET_KEYS = ("retweet_count", "retweets", "retweetCount")
+REPLY_KEYS = ("reply_count", "replyCount")
+QUOTE_KEYS = ("quote_count", "quotes", "quoteCount")
+VIEW_KEYS = ("impression_count", "view_count", "views", "viewCount", "impressions")
+TEXT_KEYS = ("text", "full_text", "content")
+ID_KEYS = ("id", "id_str", "tweet_id", "tweetId")
+
+# How exports mark replies, quotes and retweets when there is no "type" key
+REFERENCE_TYPES = {"replied_to": "reply", "quoted": "quote", "retweeted": "retweet"}
+REPLY_MARKERS = ("in_reply_to_status_id", "in_reply_to_status_id_str", "inReplyToId", "isReply")
+QUOTE_MARKERS = ("quoted_status", "quoted_status_id", "quoted_tweet", "isQuote")
+RETWEET_MARKERS = ("retweeted_status", "retweeted_tweet", "isRetweet")
+
+NESTED_METRIC_KEYS = ("public_metrics", "metrics")
+
+
+def count(tweet: Dict[str, Any], keys: Sequence[str]) -> int:
+    """
+    Read an engagement counter from a tweet, whichever alias it uses.
+
+    Flat keys are checked first, then the nested metrics objects. Missing or
+    non-numeric values count as 0.
+    """
+    return _count(_sources(tweet), keys)
+
+
+def counts(tweet: Dict[str, Any], key_sets: Sequence[Sequence[str]]) -> List[int]:
+    """Read several counters at once, like `count` for each set of aliases."""
+    sources = _sources(tweet)
+    return [_count(sources, keys) for keys in key_sets]
+
+
+def _sources(tweet: Dict[str, Any]) -> List[Dict[str, Any]]:
+    sources = [tweet]
+    for nested in NESTED_METRIC_KEYS:
+        metrics = tweet.get(nested)
+        if isinstance(metrics, dict):
+            sources.append(metrics)
+    return sources
+
+
+def _count(sources: List[Dict[str, Any]], keys: Sequence[str]) -> int:
+    for source in sources:
+        for key in keys:
+            value = source.get(key)
+            if value is None or isinstance(value, bool):
+                continue
+            if isinstance(value, (int, float)):
+                return int(value)
+            if isinstance(value, str):
+                try:
+                    return int(float(value.replace(",", "")))
+                except ValueError:
+                    continue
+    return 0
+
+
+def engagement(tweet: Dict[str, Any]) -> int:
+    """Likes + retweets + replies, the engagement score the crews rank by."""
+    return sum(counts(tweet, (LIKE_KEYS, RETWEET_KEYS, REPLY_KEYS)))
+
+
+def text(tweet: Dict[str, Any]) -> str:
+    """Return a tweet's text, whichever key it is under; "" if there is none."""
+    for key in TEXT_KEYS:
+        value = tweet.get(key)
+        if isinstance(value, str):
+            return value
+    return ""
+
+
+def tweet_id(tweet: Dict[str, Any]) -> str:
+    """Return a tweet's id as a string; "" if there is none."""
+    for key in ID_KEYS:
+        value = tweet.get(key)
+        if isinstance(value, str):
+            return value
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value)
+    return ""
+
+
+def tweet_type(tweet: Dict[str, Any]) -> str:
+    """
+    Classify a tweet as "post", "reply", "quote" or "retweet".
+
+    An explicit "type" key wins; otherwise X API v2 referenced_tweets and
+    the v1.1/scraper reply, quote and retweet markers are checked.
+    """
+    value = tweet.get("type")
+    if isinstance(value, str) and value:
+        return value
+
+    referenced = tweet.get("referenced_tweets")
+    if isinstance(referenced, list):
+        for reference in referenced:
+            if isinstance(reference, dict) and reference.get("type") in REFERENCE_TYPES:
+                return REFERENCE_TYPES[reference["type"]]
+
+    for markers, kind in (
+        (RETWEET_MARKERS, "retweet"),
+        (REPLY_MARKERS, "reply"),
+        (QUOTE_MARKERS, "quote"),
+    ):
+        if any(tweet.get(key) for key in markers):
+            return kind
+    return "post"
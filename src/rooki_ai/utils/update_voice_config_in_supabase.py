@@ -1,118 +1,178 @@
 import os
-import json
 import logging
-import psycopg2
+import uuid
 from datetime import datetime
 
+from rooki_ai.utils.db import get_db
+from rooki_ai.utils.voice_cache import NOTIFY_VOICE_CHANGED_QUERY, get_voice_cache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+UPDATE_VOICE_QUERY = '''
+UPDATE public."Voice"
+SET positioning = $1,
+    tone = $2,
+    voice_config = $3,
+    "updatedAt" = $4
+WHERE x_handle = $5
+'''
+
+INSERT_VOICE_QUERY = '''
+INSERT INTO public."Voice" (
+    id, "userId", x_handle, positioning, tone, voice_config, "createdAt", "updatedAt"
+) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+'''
+
+EXISTING_HANDLES_QUERY = 'SELECT DISTINCT x_handle FROM public."Voice" WHERE x_handle = ANY($1)'
+
+# Needs the unique index on Voice.x_handle from
+# migrations/20261017000000_voice_x_handle_unique
+UPSERT_VOICE_QUERY = '''
+INSERT INTO public."Voice" AS v (
+    id, "userId", x_handle, positioning, tone, voice_config, "createdAt", "updatedAt"
+) VALUES ($1, $2, $3, $4, $5, $6, $7, $7)
+ON CONFLICT (x_handle) DO UPDATE
+SET positioning = EXCLUDED.positioning,
+    tone = EXCLUDED.tone,
+    voice_config = EXCLUDED.voice_config,
+    "updatedAt" = EXCLUDED."updatedAt"
+'''
+
+_upsert_supported = True
+
+
+def voice_config_rows(updates) -> dict:
+    """
+    Map (x_handle, positioning, tone, voice_config) tuples to Voice column
+    values keyed by handle; the last config wins if a handle repeats.
+    """
+    return {
+        x_handle: (positioning, {"description": tone}, voice_config)
+        for x_handle, positioning, tone, voice_config in updates
+    }
+
+
+async def upsert_voice_configs(conn, rows: dict):
+    """
+    Insert or update the Voice rows for `rows` (see `voice_config_rows`) in
+    one transaction with INSERT ... ON CONFLICT (x_handle).
+
+    Databases without the unique index on x_handle (the migration has not
+    been applied) fall back to a check-then-write. Afterwards the handles
+    are dropped from the Voice cache and announced on the `voice_changed`
+    channel for other workers.
+    """
+    global _upsert_supported
+    import asyncpg
+
+    written = False
+    if _upsert_supported:
+        # Voice columns are timestamp without time zone, stored as UTC
+        now = datetime.utcnow()
+        default_user_id = os.environ.get("DEFAULT_USER_ID", "system")
+        try:
+            async with conn.transaction():
+                await conn.executemany(
+                    UPSERT_VOICE_QUERY,
+                    [
+                        (str(uuid.uuid4()), default_user_id, x_handle, *values, now)
+                        for x_handle, values in rows.items()
+                    ],
+                )
+            written = True
+        except asyncpg.exceptions.InvalidColumnReferenceError:
+            logger.warning(
+                'No unique index on "Voice".x_handle (apply '
+                'migrations/20261017000000_voice_x_handle_unique); '
+                'falling back to check-then-write'
+            )
+            _upsert_supported = False
+
+    if not written:
+        await _save_voice_configs(conn, rows)
+
+    get_voice_cache().invalidate(rows)
+    await conn.execute(NOTIFY_VOICE_CHANGED_QUERY, list(rows))
+
+
+async def _save_voice_configs(conn, rows: dict) -> tuple:
+    # Voice columns are timestamp without time zone, stored as UTC
+    now = datetime.utcnow()
+    async with conn.transaction():
+        existing = {
+            record["x_handle"]
+            for record in await conn.fetch(EXISTING_HANDLES_QUERY, list(rows))
+        }
+
+        if existing:
+            await conn.executemany(
+                UPDATE_VOICE_QUERY,
+                [(*rows[x_handle], now, x_handle) for x_handle in existing],
+            )
+
+        new_handles = [x_handle for x_handle in rows if x_handle not in existing]
+        if new_handles:
+            # This assumes there's a default user ID to associate with new records
+            # Adjust this as needed for your specific requirements
+            default_user_id = os.environ.get("DEFAULT_USER_ID", "system")
+            await conn.executemany(
+                INSERT_VOICE_QUERY,
+                [
+                    (str(uuid.uuid4()), default_user_id, x_handle, *rows[x_handle], now, now)
+                    for x_handle in new_handles
+                ],
+            )
+
+    return len(existing), len(new_handles)
+
+
 def update_voice_config_in_supabase(x_handle: str, positioning: str, tone: str, voice_config: dict):
     """
     Update the voice table in Supabase with the generated voice config.
-    
+
     Args:
         x_handle: Twitter handle to update
         positioning: Positioning statement
         tone: Tone description
         voice_config: Complete voice configuration JSON
-        
+
     Returns:
         bool: True if successful, False otherwise
-        
-    Raises:
-        Exception: If there's an error updating the database
     """
-    # Get PostgreSQL connection string from environment variables
-    print("111")
-    db_url = os.environ.get("DATABASE_URL")
-    
-    if not db_url:
+    return update_voice_configs_in_supabase([(x_handle, positioning, tone, voice_config)])
+
+
+def update_voice_configs_in_supabase(updates):
+    """
+    Write several generated voice configs to the Voice table in one transaction.
+
+    Rows are upserted with one pipelined statement on a single pooled
+    connection. This blocks until the write is done; request paths should
+    queue writes with `rooki_ai.jobs.write_behind` instead.
+
+    Args:
+        updates: List of (x_handle, positioning, tone, voice_config) tuples
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    if not updates:
+        return True
+
+    db = get_db()
+    if not db.configured:
         logger.error("DATABASE_URL environment variable not set")
         return False
-        
-    print("222")
+
+    rows = voice_config_rows(updates)
+
     try:
-        # Connect to the PostgreSQL database
-        conn = psycopg2.connect(db_url)
-        cursor = conn.cursor()
-        print("333")
-        
-        # Check if record exists for this x_handle
-        check_query = 'SELECT id FROM public."Voice" WHERE x_handle = %s'
-        cursor.execute(check_query, (x_handle,))
-        existing_record = cursor.fetchone()
-        print("444")
-        
-        now = datetime.utcnow()
-        
-        if existing_record:
-            print("555")
-            # Update existing record
-            update_query = '''
-            UPDATE public."Voice" 
-            SET positioning = %s, 
-                tone = %s, 
-                voice_config = %s, 
-                "updatedAt" = %s
-            WHERE x_handle = %s
-            '''
-            cursor.execute(
-                update_query, 
-                (
-                    positioning, 
-                    json.dumps({"description": tone}), 
-                    json.dumps(voice_config), 
-                    now, 
-                    x_handle
-                )
-            )
-            print("666")
-            logger.info(f"Updated voice config for x_handle: {x_handle}")
-        else:
-            # Insert new record with a generated UUID
-            import uuid
-            new_id = str(uuid.uuid4())
-            
-            print("777")
-            # This assumes there's a default user ID to associate with new records
-            # Adjust this as needed for your specific requirements
-            default_user_id = os.environ.get("DEFAULT_USER_ID", "system")
-            
-            insert_query = '''
-            INSERT INTO public."Voice" (
-                id, "userId", x_handle, positioning, tone, voice_config, "createdAt", "updatedAt"
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            '''
-            cursor.execute(
-                insert_query,
-                (
-                    new_id, 
-                    default_user_id,
-                    x_handle,
-                    positioning, 
-                    json.dumps({"description": tone}), 
-                    json.dumps(voice_config), 
-                    now, 
-                    now
-                )
-            )
-            print("888")
-            logger.info(f"Created new voice config for x_handle: {x_handle}")
-        
-        # Commit the transaction
-        conn.commit()
-        
-        # Close the connection
-        cursor.close()
-        conn.close()
-        
+        db.run_sync(lambda conn: upsert_voice_configs(conn, rows))
+        logger.info(f"Saved voice configs for: {', '.join(rows)}")
         return True
-        
-    except psycopg2.Error as e:
-        logger.error(f"Database error updating voice config: {str(e)}")
-        return False
+
     except Exception as e:
         logger.error(f"Error updating voice config: {str(e)}")
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,241 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from rooki_ai.utils.db import Database, get_db
+
+logger = logging.getLogger(__name__)
+
+VOICE_BY_USER_QUERY = 'SELECT * FROM public."Voice" WHERE "userId" = $1'
+VOICE_BY_HANDLE_QUERY = 'SELECT * FROM public."Voice" WHERE x_handle = $1'
+
+# Channel carrying the x_handle of every Voice row this app writes
+VOICE_CHANGED_CHANNEL = "voice_changed"
+
+NOTIFY_VOICE_CHANGED_QUERY = (
+    f"SELECT pg_notify('{VOICE_CHANGED_CHANNEL}', x_handle) FROM unnest($1::text[]) AS x_handle"
+)
+
+CacheKey = Tuple[str, str]
+
+
+class VoiceCache:
+    """Read-through TTL/LRU cache of Voice rows.
+
+    Rows are cached under ("user", userId) and ("handle", x_handle), so the
+    coach crew (by user) and the tweet corpus tools (by handle) share one
+    copy. Entries live for VOICE_CACHE_TTL_SECONDS and the least recently
+    used ones are evicted past VOICE_CACHE_SIZE. Lookups that find no row
+    are not cached, so a newly created Voice shows up right away.
+
+    `invalidate` drops every entry for a handle; the Voice writers call it
+    after each write. With VOICE_CACHE_NOTIFY enabled, writes are also
+    announced on the `voice_changed` Postgres channel and every worker
+    listening there invalidates its own copy. The cache is cleared whenever
+    the listener reconnects, since notifications may have been missed.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        max_size: Optional[int] = None,
+        db: Optional[Database] = None,
+    ):
+        if ttl_seconds is None:
+            ttl_seconds = float(os.environ.get("VOICE_CACHE_TTL_SECONDS", "300"))
+        if max_size is None:
+            max_size = int(os.environ.get("VOICE_CACHE_SIZE", "1024"))
+
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._db = db or get_db()
+
+        # key -> (row, cached_at)
+        self._entries: "OrderedDict[CacheKey, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        # x_handle -> keys whose row has that handle
+        self._keys_by_handle: Dict[str, Set[CacheKey]] = {}
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so lookups racing a write don't cache stale rows
+        self._generation = 0
+        self._listening = False
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._hit_age_seconds = 0.0
+        self._max_hit_age_seconds = 0.0
+
+    def get_by_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the Voice row of a user, querying the database on a miss.
+
+        Args:
+            user_id: The user whose Voice row to load
+
+        Returns:
+            dict: A copy of the row, or None if the user has no Voice row
+
+        Raises:
+            DatabaseNotConfigured: If DATABASE_URL is not set
+            Exception: If the query fails
+        """
+        return self._read_through(
+            ("user", user_id), lambda: self._db.fetchrow_sync(VOICE_BY_USER_QUERY, user_id)
+        )
+
+    def get_by_handle(self, x_handle: str) -> Optional[Dict[str, Any]]:
+        """Return the Voice row of a Twitter handle; see `get_by_user`."""
+        return self._read_through(
+            ("handle", x_handle), lambda: self._db.fetchrow_sync(VOICE_BY_HANDLE_QUERY, x_handle)
+        )
+
+    async def get_by_user_async(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Async variant of `get_by_user` for code running on an event loop."""
+        key = ("user", user_id)
+        found, row = self._lookup(key)
+        if found:
+            return row
+        generation = self._generation
+        return self._store(key, await self._db.fetchrow(VOICE_BY_USER_QUERY, user_id), generation)
+
+    async def get_by_handle_async(self, x_handle: str) -> Optional[Dict[str, Any]]:
+        """Async variant of `get_by_handle` for code running on an event loop."""
+        key = ("handle", x_handle)
+        found, row = self._lookup(key)
+        if found:
+            return row
+        generation = self._generation
+        return self._store(key, await self._db.fetchrow(VOICE_BY_HANDLE_QUERY, x_handle), generation)
+
+    def prime(self, rows: Iterable[Any]):
+        """Cache Voice rows fetched elsewhere under their x_handle."""
+        generation = self._generation
+        for row in rows:
+            if row["x_handle"]:
+                self._store(("handle", row["x_handle"]), row, generation)
+
+    def invalidate(self, x_handles: Iterable[str]):
+        """Drop every cached row for these handles."""
+        with self._lock:
+            self._generation += 1
+            for x_handle in x_handles:
+                keys = self._keys_by_handle.pop(x_handle, set())
+                keys.add(("handle", x_handle))
+                for key in keys:
+                    if self._entries.pop(key, None) is not None:
+                        self._invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._invalidations += len(self._entries)
+            self._entries.clear()
+            self._keys_by_handle.clear()
+
+    def listen(self):
+        """Start invalidating on `voice_changed` notifications from other workers."""
+        with self._lock:
+            if self._listening or not self._db.configured:
+                return
+            self._listening = True
+        self._db.listen(
+            VOICE_CHANGED_CHANNEL,
+            lambda x_handle: self.invalidate([x_handle]),
+            on_connect=self.clear,
+        )
+        logger.info(f"Listening for Voice changes on {VOICE_CHANGED_CHANNEL}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Report hit ratio, evictions and the age of the rows served from cache."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+                "avg_hit_age_seconds": self._hit_age_seconds / self._hits if self._hits else 0.0,
+                "max_hit_age_seconds": self._max_hit_age_seconds,
+                "listening": self._listening,
+            }
+
+    def _read_through(self, key: CacheKey, fetch) -> Optional[Dict[str, Any]]:
+        found, row = self._lookup(key)
+        if found:
+            return row
+        generation = self._generation
+        return self._store(key, fetch(), generation)
+
+    def _lookup(self, key: CacheKey) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                row, cached_at = entry
+                age = now - cached_at
+                if age <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    self._hit_age_seconds += age
+                    self._max_hit_age_seconds = max(self._max_hit_age_seconds, age)
+                    return True, dict(row)
+                self._remove(key)
+                self._expirations += 1
+            self._misses += 1
+        return False, None
+
+    def _store(self, key: CacheKey, row: Any, generation: int) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        row = dict(row)
+        with self._lock:
+            if generation != self._generation:
+                # A write landed while we were querying; don't cache what we read
+                return dict(row)
+            self._remove(key)
+            self._entries[key] = (row, time.monotonic())
+            if row.get("x_handle"):
+                self._keys_by_handle.setdefault(row["x_handle"], set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+        return dict(row)
+
+    def _remove(self, key: CacheKey):
+        # Called with the lock held
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        x_handle = entry[0].get("x_handle")
+        keys = self._keys_by_handle.get(x_handle)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_handle[x_handle]
+
+
+_cache: Optional[VoiceCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_voice_cache() -> VoiceCache:
+    """Return the process-wide Voice cache, listening for changes if VOICE_CACHE_NOTIFY is set."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                cache = VoiceCache()
+                if os.environ.get("VOICE_CACHE_NOTIFY", "false").lower() in ("1", "true", "yes"):
+                    cache.listen()
+                _cache = cache
+    return _cache
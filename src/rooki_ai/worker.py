@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""
+Crew worker process.
+
+Pulls voice profile and coach jobs from the Postgres job queue (the
+`crew_jobs` table) and runs them, so API servers started with
+JOB_BACKEND=postgres only enqueue and poll. Run as many workers, on as many
+nodes, as the LLM budget allows; each one runs at most MAX_CONCURRENT_JOBS
+jobs at a time.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+from typing import Any, Callable, Dict, Set
+
+from dotenv import load_dotenv
+
+from rooki_ai.flows.coach import CoachFlow
+from rooki_ai.jobs import PostgresJobStore, get_scheduler
+from rooki_ai.jobs.scheduler import TIMED_OUT_STAGE, JobTimeout
+from rooki_ai.jobs.voice_profile import run_voice_profile
+from rooki_ai.jobs.write_behind import get_voice_writer
+from rooki_ai.models.jobs import Job
+from rooki_ai.utils.db import get_db
+from rooki_ai.utils.http_client import get_http_client
+from rooki_ai.utils.runtime import get_runtime
+from rooki_ai.utils.trending import get_trending_feed
+
+logger = logging.getLogger(__name__)
+
+
+def _voice_profile(store: PostgresJobStore, job: Job) -> Dict[str, Any]:
+    payload = job.payload
+    response = run_voice_profile(
+        payload["x_handle"],
+        payload.get("pillar", 3),
+        payload.get("guardrail", 3),
+        on_stage=lambda stage: store.update(job.id, stage=stage),
+    )
+    return response.model_dump(mode="json")
+
+
+async def _coach(store: PostgresJobStore, job: Job) -> Dict[str, Any]:
+    # Runs on the worker's loop; only the crews inside take a thread
+    result = await CoachFlow().kickoff_async(job.payload)
+    return result.model_dump(mode="json")
+
+
+# Blocking handlers run in a worker thread, async ones on the worker's loop
+JOB_HANDLERS: Dict[str, Callable[[PostgresJobStore, Job], Any]] = {
+    "voice_profile": _voice_profile,
+    "coach": _coach,
+}
+
+
+async def _execute(store: PostgresJobStore, job: Job):
+    """Run a claimed job through the scheduler and record its outcome."""
+    logger.info(f"Running {job.kind} job {job.id} for {job.key}")
+    try:
+        result = await get_scheduler().submit(job.kind, JOB_HANDLERS[job.kind], store, job)
+    except Exception as e:
+        logger.error(f"{job.kind} job {job.id} failed: {e}")
+        stage = TIMED_OUT_STAGE if isinstance(e, JobTimeout) else "failed"
+        await asyncio.to_thread(
+            store.update, job.id, status="failed", stage=stage, error=str(e)
+        )
+        return
+
+    await asyncio.to_thread(
+        store.update, job.id, status="succeeded", stage="done", result=result
+    )
+    logger.info(f"Finished {job.kind} job {job.id}")
+
+
+async def _heartbeat(store: PostgresJobStore, worker_id: str, interval: float):
+    """Keep this worker's jobs alive and fail those of workers that died."""
+    while True:
+        try:
+            await asyncio.to_thread(store.heartbeat, worker_id)
+            await asyncio.to_thread(store.reap, interval * 6)
+        except Exception as e:
+            logger.warning(f"Heartbeat failed: {e}")
+        await asyncio.sleep(interval)
+
+
+async def serve(kinds, worker_id: str):
+    """Claim and run jobs until SIGINT/SIGTERM, then drain running jobs."""
+    store = PostgresJobStore()
+    scheduler = get_scheduler()
+    poll_interval = float(os.environ.get("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+    heartbeat_interval = float(os.environ.get("JOB_HEARTBEAT_SECONDS", "10"))
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    # Crews started from async flows (kickoff_async) share the runtime's threads
+    loop.set_default_executor(get_runtime().executor)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    running: Set[asyncio.Task] = set()
+    heartbeat = asyncio.create_task(_heartbeat(store, worker_id, heartbeat_interval))
+    logger.info(f"Worker {worker_id} pulling {', '.join(kinds)} jobs")
+
+    while not stop.is_set():
+        # Only claim what can start right away so idle workers get the rest
+        if scheduler.has_capacity():
+            try:
+                job = await asyncio.to_thread(store.claim, kinds, worker_id)
+            except Exception as e:
+                logger.warning(f"Failed to claim a job: {e}")
+                job = None
+            if job is not None:
+                task = asyncio.create_task(_execute(store, job))
+                running.add(task)
+                task.add_done_callback(running.discard)
+                continue
+
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    logger.info(f"Worker {worker_id} stopping; waiting for {len(running)} jobs")
+    scheduler.close()
+    await asyncio.gather(*running, return_exceptions=True)
+    heartbeat.cancel()
+
+
+def run():
+    """Entry point for the `worker` script."""
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    kinds = [
+        kind.strip()
+        for kind in os.environ.get("JOB_WORKER_KINDS", ",".join(JOB_HANDLERS)).split(",")
+        if kind.strip() in JOB_HANDLERS
+    ]
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+    runtime = get_runtime()
+    if "coach" in kinds and os.environ.get("TRENDING_REFRESH", "true").lower() == "true":
+        get_trending_feed().start()
+    try:
+        asyncio.run(serve(kinds, worker_id))
+    finally:
+        get_trending_feed().close()
+        get_voice_writer().close()
+        get_db().close()
+        get_http_client().close()
+        runtime.shutdown()
+
+
+if __name__ == "__main__":
+    run()
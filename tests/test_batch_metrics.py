@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from rooki_ai.utils.style_metrics import analyze_text
+
+pytest.importorskip("numpy")
+
+from rooki_ai.utils.batch_metrics import _count_chunk  # noqa: E402
+
+# Pieces that exercise every rule of the token scan: joiners, tags, sentence
+# ends, URLs next to words and punctuation, and emoji sequences
+PIECES = [
+    "a", "Stop", "join", "Don't", "let\u2019s", "3", "5", "_", "e", "\u212aeep",
+    " ", " ", "\n", ".", "!", "?", "\u2026", ",", "'", "\u2019", "-", ":", "(", ")", "/",
+    "#", "@", "$", "https://x.co/a", "www.", "http://", "\x1e", "\x1f",
+    "\u200d", "\ufe0f", "\U0001F3FD", "\U0001F1FA", "\U0001F1F8", "\u2764",
+    "\U0001F468", "\U0001F680", "\u2b50",
+]
+
+
+def test_count_chunk_matches_analyze_text():
+    rng = random.Random(2024)
+    texts = ["".join(rng.choices(PIECES, k=rng.randint(0, 16))) for _ in range(20000)]
+    counts = _count_chunk(texts).tolist()
+    for text, got in zip(texts, counts):
+        stats = analyze_text(text)
+        assert got == [stats.sentences, stats.words, stats.imperatives, stats.emojis], text
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "\U0001F1F8\u200d\U0001F1FAhttps://x.co/a,\u2764b!",
+        "\U0001F1F8\u200d\U0001F1FA\U0001F1F8",
+        "\U0001F1F8\ufe0f\u200d\U0001F1FA",
+        "\U0001F1FA\U0001F1F8\u200d\U0001F1FA",
+        "\u2764\u200d\U0001F1FA\U0001F1F8",
+        "\U0001F1F8\U0001F3FD\u200d\U0001F1FA\U0001F1FA",
+    ],
+)
+def test_count_chunk_regional_indicators(text):
+    stats = analyze_text(text)
+    assert _count_chunk([text]).tolist() == [
+        [stats.sentences, stats.words, stats.imperatives, stats.emojis]
+    ]
@@ -0,0 +1,37 @@
+import os
+
+from rooki_ai.utils import corpus_store
+from rooki_ai.utils.corpus_store import Corpus, CorpusBuilder
+
+RECORDS = [
+    *(
+        {
+            "id": str(i),
+            "text": "caf\u00e9 \U0001F680 " * (i % 7),
+            "created_at": "2024-05-01T12:00:00Z",
+            "public_metrics": {"like_count": i},
+            "lang": "en",
+        }
+        for i in range(500)
+    ),
+    {"id_str": "9", "full_text": "legacy shape", "favorite_count": 3},
+    ["not", "a", "tweet"],
+]
+
+
+def test_builder_round_trips_spooled_columns(tmp_path, monkeypatch):
+    # Spill to the temp files every few rows
+    monkeypatch.setattr(corpus_store, "_SPOOL_BYTES", 1024)
+    path = str(tmp_path / "a.corpus")
+    with CorpusBuilder(str(tmp_path)) as builder:
+        builder.extend(RECORDS)
+        builder.write(path)
+
+    assert os.listdir(tmp_path) == ["a.corpus"]
+    with Corpus(path) as corpus:
+        assert len(corpus) == len(RECORDS)
+        assert list(corpus.records()) == RECORDS
+        tweets = list(corpus.tweets())
+        assert [tweet.id for tweet in tweets[:3]] == ["0", "1", "2"]
+        assert tweets[-1].text == "legacy shape"
+        assert sum(corpus.column("likes")) == sum(range(500)) + 3
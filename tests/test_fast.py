@@ -0,0 +1,123 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException  # noqa: E402
+
+from rooki_ai import fast  # noqa: E402
+from rooki_ai.jobs import JobStore, scheduler  # noqa: E402
+from rooki_ai.jobs.scheduler import TIMED_OUT_STAGE, CrewScheduler  # noqa: E402
+from rooki_ai.jobs.singleflight import SingleFlight  # noqa: E402
+
+
+class FakeProfile:
+    def __init__(self, x_handle):
+        self.x_handle = x_handle
+
+    def model_dump(self, **kwargs):
+        return {"x_handle": self.x_handle}
+
+
+@pytest.fixture
+def voice_app(monkeypatch):
+    """In-process job store, scheduler and flights with a stubbed crew run."""
+    jobs = JobStore()
+    saves = []
+
+    def run_voice_profile(x_handle, pillar, guardrail, on_stage=None, save=None):
+        time.sleep(0.1)
+        saves.append((x_handle, pillar, guardrail))
+        return FakeProfile(x_handle)
+
+    monkeypatch.setattr(fast, "USE_JOB_QUEUE", False)
+    monkeypatch.setattr(fast, "voice_guide_jobs", jobs)
+    monkeypatch.setattr(fast, "voice_profile_flights", SingleFlight())
+    monkeypatch.setattr(scheduler, "_scheduler", CrewScheduler(max_concurrent=2))
+    monkeypatch.setattr(fast, "run_voice_profile", run_voice_profile)
+    return jobs, saves
+
+
+def test_wait_mode_timeout_is_504(monkeypatch):
+    jobs = JobStore()
+    monkeypatch.setattr(fast, "voice_guide_jobs", jobs)
+    monkeypatch.setattr(scheduler, "_scheduler", CrewScheduler(timeout=0.05))
+    monkeypatch.setattr(fast, "run_voice_profile", lambda *args, **kwargs: time.sleep(0.3))
+
+    request = fast.VoiceProfileRequest(x_handle="slow_handle")
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(fast._submit_voice_profile(request, wait=True))
+
+    assert error.value.status_code == 504
+    (job,) = jobs._jobs.values()
+    assert (job.status, job.stage) == ("failed", TIMED_OUT_STAGE)
+
+
+def test_submit_releases_ticket_when_job_setup_fails(monkeypatch):
+    class BrokenStore(JobStore):
+        def create(self, kind, key, payload=None):
+            raise RuntimeError("job store unavailable")
+
+    crew_scheduler = CrewScheduler(max_concurrent=1, max_queued=0)
+    monkeypatch.setattr(fast, "voice_guide_jobs", BrokenStore())
+    monkeypatch.setattr(scheduler, "_scheduler", crew_scheduler)
+    request = fast.VoiceProfileRequest(x_handle="some_handle")
+    with pytest.raises(RuntimeError):
+        asyncio.run(fast._submit_voice_profile(request, wait=False))
+    assert crew_scheduler.stats()["queue_depth"] == 0
+    assert crew_scheduler.has_capacity()
+
+
+def test_saturated_submit_is_429_with_retry_after(monkeypatch):
+    crew_scheduler = CrewScheduler(max_concurrent=1, max_queued=0)
+    crew_scheduler.reserve()
+    monkeypatch.setattr(fast, "voice_guide_jobs", JobStore())
+    monkeypatch.setattr(scheduler, "_scheduler", crew_scheduler)
+    request = fast.VoiceProfileRequest(x_handle="busy_handle")
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(fast._submit_voice_profile(request, wait=False))
+    assert error.value.status_code == 429
+    assert int(error.value.headers["Retry-After"]) >= 1
+    assert not fast.voice_guide_jobs._jobs
+
+
+def test_identical_submissions_share_one_job(voice_app):
+    jobs, saves = voice_app
+    request = fast.VoiceProfileRequest(x_handle="same_handle", config={"pillar": 2})
+
+    async def scenario():
+        return await asyncio.gather(
+            fast._submit_voice_profile(request, wait=True),
+            fast._submit_voice_profile(request, wait=True),
+            fast._submit_voice_profile(request, wait=False),
+        )
+
+    first, second, accepted = asyncio.run(scenario())
+    assert first == second == (200, {"x_handle": "same_handle"})
+    (job,) = jobs._jobs.values()
+    assert accepted.body["job_id"] == job.id
+    assert saves == [("same_handle", 2, 3)]
+
+
+def test_other_config_for_an_active_handle_is_409(voice_app):
+    jobs, saves = voice_app
+
+    async def scenario():
+        await fast._submit_voice_profile(
+            fast.VoiceProfileRequest(x_handle="busy_handle"), wait=False
+        )
+        with pytest.raises(HTTPException) as error:
+            await fast._submit_voice_profile(
+                fast.VoiceProfileRequest(x_handle="busy_handle", config={"pillar": 5}),
+                wait=False,
+            )
+        # Let the first run finish before the loop closes
+        await asyncio.gather(*(task for task, _ in fast.voice_profile_flights._flights.values()))
+        return error.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 409
+    assert len(jobs._jobs) == 1
+    assert saves == [("busy_handle", 3, 3)]
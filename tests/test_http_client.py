@@ -0,0 +1,85 @@
+import asyncio
+import time
+import types
+
+import httpx
+import pytest
+
+from rooki_ai.utils import http_client
+from rooki_ai.utils.http_client import HttpClient
+
+URL = "https://storage.example.com/corpus.jsonl"
+
+
+class Server:
+    """Answers each request with the next scripted status, or raises a transport error."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.requests = 0
+
+    def __call__(self, request):
+        self.requests += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        status_code, headers = outcome if isinstance(outcome, tuple) else (outcome, {})
+        return httpx.Response(status_code, headers=headers, content=b"body")
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    fake_time = types.SimpleNamespace(perf_counter=time.perf_counter, sleep=sleeps.append)
+    monkeypatch.setattr(http_client, "time", fake_time)
+    return sleeps
+
+
+def client_for(server, max_retries=2):
+    client = HttpClient(max_retries=max_retries, http2=False)
+    client._client = httpx.Client(transport=httpx.MockTransport(server))
+    client._async_client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+    return client
+
+
+def test_get_sync_retries_transient_failures_with_backoff(sleeps):
+    server = Server(httpx.ConnectError("refused"), (503, {"Retry-After": "7"}), 200)
+    client = client_for(server)
+    assert client.get_sync(URL).status_code == 200
+    assert sleeps == [0.5, 7.0]
+
+    stats = client.stats()
+    host = stats["hosts"]["storage.example.com"]
+    assert (stats["retries"], host["requests"], host["errors"]) == (2, 3, 2)
+
+
+def test_final_attempt_is_returned_or_raised(sleeps):
+    client = client_for(Server(502, 502, 502))
+    assert client.get_sync(URL).status_code == 502
+    assert sleeps == [0.5, 1.0]
+
+    with pytest.raises(httpx.ConnectError):
+        client_for(Server(*[httpx.ConnectError("refused")] * 2), max_retries=1).get_sync(URL)
+
+
+def test_client_errors_are_not_retried(sleeps):
+    server = Server(404)
+    assert client_for(server).get_sync(URL).status_code == 404
+    assert (server.requests, sleeps) == (1, [])
+
+
+def test_stream_sync_retries_before_the_body(sleeps):
+    server = Server(500, 200)
+    with client_for(server).stream_sync(URL) as response:
+        assert b"".join(response.iter_bytes()) == b"body"
+    assert (server.requests, sleeps) == (2, [0.5])
+
+
+def test_async_get_retries_like_the_sync_paths():
+    server = Server((429, {"Retry-After": "0"}), 200)
+    client = client_for(server)
+    try:
+        assert asyncio.run(client.get(URL)).status_code == 200
+    finally:
+        client.close()
+    assert (server.requests, client.stats()["retries"]) == (2, 1)
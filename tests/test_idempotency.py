@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+from rooki_ai.jobs.idempotency import CachedResponse, IdempotencyCache
+from rooki_ai.utils.db import Database
+
+OK = CachedResponse(200, {"positioning": "builder"})
+
+
+class FakeTable:
+    """Stands in for the idempotency_cache table behind `_db_call`."""
+
+    def __init__(self):
+        self.rows = {}
+        self.calls = []
+
+    async def db_call(self, func, *args):
+        self.calls.append(func.__name__)
+        key = args[0]
+        if func.__name__ == "_claim_in_db":
+            if key not in self.rows:
+                self.rows[key] = None
+                return "claimed"
+            return self.rows[key] or "pending"
+        if func.__name__ == "_store":
+            self.rows[key] = args[1]
+        elif func.__name__ == "_release" and self.rows.get(key) is None:
+            self.rows.pop(key, None)
+
+
+def cache_on(table: FakeTable) -> IdempotencyCache:
+    cache = IdempotencyCache(ttl_seconds=60, max_entries=8, db=Database("postgresql://stub"))
+    cache._db_call = table.db_call
+    cache._poll_interval = 0.01
+    return cache
+
+
+class Producer:
+    def __init__(self, response=OK, error=None):
+        self.response = response
+        self.error = error
+        self.calls = 0
+        self.gate = None
+
+    async def __call__(self):
+        self.calls += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+def test_completed_response_is_replayed():
+    table = FakeTable()
+    cache = cache_on(table)
+    produce = Producer()
+
+    async def scenario():
+        first = await cache.run("key", produce)
+        second = await cache.run("key", produce)
+        # Another worker, with nothing in memory, replays the stored row
+        third = await cache_on(table).run("key", produce)
+        return first, second, third
+
+    assert asyncio.run(scenario()) == ((OK, False), (OK, True), (OK, True))
+    assert produce.calls == 1
+    assert table.rows == {"key": OK}
+
+
+def test_second_caller_attaches_to_the_inflight_run():
+    table = FakeTable()
+    cache = cache_on(table)
+    produce = Producer()
+
+    async def scenario():
+        produce.gate = asyncio.Event()
+        first = asyncio.ensure_future(cache.run("key", produce))
+        second = asyncio.ensure_future(cache.run("key", produce))
+        await asyncio.sleep(0.01)
+        produce.gate.set()
+        return await first, await second
+
+    assert asyncio.run(scenario()) == ((OK, False), (OK, True))
+    assert produce.calls == 1
+    assert table.calls.count("_claim_in_db") == 1
+
+
+def test_other_worker_waits_for_a_pending_claim():
+    table = FakeTable()
+    produce = Producer()
+
+    async def scenario():
+        produce.gate = asyncio.Event()
+        first = asyncio.ensure_future(cache_on(table).run("key", produce))
+        second = asyncio.ensure_future(cache_on(table).run("key", produce))
+        await asyncio.sleep(0.03)
+        produce.gate.set()
+        return await first, await second
+
+    assert asyncio.run(scenario()) == ((OK, False), (OK, True))
+    assert produce.calls == 1
+
+
+def test_claim_is_released_when_produce_fails():
+    table = FakeTable()
+    cache = cache_on(table)
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await cache.run("key", Producer(error=RuntimeError("crew failed")))
+        assert "key" not in table.rows
+        assert not cache._inflight
+        return await cache.run("key", Producer())
+
+    assert asyncio.run(scenario()) == (OK, False)
+    assert table.calls.count("_release") == 1
+
+
+def test_falls_back_to_memory_without_a_database(monkeypatch):
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    cache = IdempotencyCache(ttl_seconds=60, max_entries=1, db=Database())
+    produce = Producer()
+
+    async def scenario():
+        return [
+            await cache.run("a", produce),
+            await cache.run("a", produce),
+            # Evicts "a" from the one-entry LRU
+            await cache.run("b", produce),
+            await cache.run("a", produce),
+        ]
+
+    assert asyncio.run(scenario()) == [(OK, False), (OK, True), (OK, False), (OK, False)]
+    assert produce.calls == 3
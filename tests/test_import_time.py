@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Keep in step with benchmarks/import_time.py
+BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "1500"))
+DEFERRED_PACKAGES = ("crewai", "litellm", "dedalus_labs", "asyncpg", "psycopg2", "jsonschema")
+
+
+@pytest.mark.slow
+def test_api_import_time_budget():
+    """Importing the API stays under budget and leaves crew/LLM/DB packages unloaded."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path), PYTHONDONTWRITEBYTECODE="1")
+    # A fresh interpreter, so nothing is imported already
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import rooki_ai.fast"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    assert proc.returncode == 0, proc.stderr
+
+    total_us = 0
+    packages = set()
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Top-level entries (no leading indentation) add up to the total
+        if name[1:2] != " ":
+            total_us += int(cumulative)
+        packages.add(name.strip().split(".")[0])
+
+    assert not packages & set(DEFERRED_PACKAGES)
+    assert total_us / 1000 <= BUDGET_MS
@@ -0,0 +1,206 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from rooki_ai.jobs import JobConflict, JobStore, PostgresJobStore, pg_store, store
+
+asyncpg = pytest.importorskip("asyncpg")
+
+COLUMNS = [name.strip() for name in pg_store.JOB_COLUMNS.split(",")]
+ASSIGNMENT = re.compile(r"(\w+) = (\$\d+|now\(\))")
+
+
+class Clock:
+    def __init__(self):
+        self.now = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += timedelta(seconds=seconds)
+
+
+class FakeDatabase:
+    """Runs the PostgresJobStore queries against an in-memory crew_jobs table."""
+
+    def __init__(self, clock: Clock):
+        self.now = clock
+        self.rows = {}
+
+    def execute_sync(self, query, *args):
+        if query == pg_store.CREATE_TABLE_QUERY:
+            return
+        if query == pg_store.HEARTBEAT_QUERY:
+            (worker_id,) = args
+            for row in self._running():
+                if row["worker_id"] == worker_id:
+                    row["heartbeat_at"] = self.now()
+        elif query == pg_store.REAP_QUERY:
+            cutoff = self.now() - timedelta(seconds=args[0])
+            for row in self._running():
+                if row["heartbeat_at"] < cutoff:
+                    row.update(
+                        status="failed",
+                        stage="failed",
+                        error="Worker stopped responding",
+                        finished_at=self.now(),
+                    )
+        elif query == pg_store.PURGE_QUERY:
+            cutoff = self.now() - timedelta(seconds=args[0])
+            for job_id, row in list(self.rows.items()):
+                if row["finished_at"] is not None and row["finished_at"] < cutoff:
+                    del self.rows[job_id]
+        else:
+            raise AssertionError(f"Unexpected query: {query}")
+
+    def fetchval_sync(self, query, *args):
+        assert query == pg_store.QUEUE_DEPTH_QUERY
+        return len(self._queued(args[0]))
+
+    def fetchrow_sync(self, query, *args):
+        if query == pg_store.INSERT_QUERY:
+            job_id, kind, key, payload = args
+            if kind == "voice_profile" and self._active(kind, key):
+                raise asyncpg.exceptions.UniqueViolationError("crew_jobs_active_voice_profile_idx")
+            row = dict.fromkeys(COLUMNS + ["worker_id", "heartbeat_at"])
+            row.update(
+                id=job_id,
+                kind=kind,
+                key=key,
+                payload=payload,
+                status="queued",
+                stage="queued",
+                created_at=self.now(),
+            )
+            self.rows[job_id] = row
+        elif query == pg_store.SELECT_QUERY:
+            row = self.rows.get(args[0])
+        elif query == pg_store.SELECT_ACTIVE_QUERY:
+            row = next(iter(self._active(*args)), None)
+        elif query == pg_store.CLAIM_QUERY:
+            worker_id, kinds = args
+            row = next(iter(self._queued(kinds)), None)
+            if row is not None:
+                row.update(
+                    status="running",
+                    stage="starting",
+                    worker_id=worker_id,
+                    started_at=self.now(),
+                    heartbeat_at=self.now(),
+                )
+        elif query.startswith("UPDATE public.crew_jobs SET"):
+            row = self.rows.get(args[-1])
+            if row is not None:
+                for name, value in ASSIGNMENT.findall(query.split(" WHERE ")[0]):
+                    row[name] = self.now() if value == "now()" else args[int(value[1:]) - 1]
+        else:
+            raise AssertionError(f"Unexpected query: {query}")
+        return {name: row[name] for name in COLUMNS} if row else None
+
+    def _running(self):
+        return [row for row in self.rows.values() if row["status"] == "running"]
+
+    def _queued(self, kinds):
+        rows = [
+            row for row in self.rows.values()
+            if row["status"] == "queued" and row["kind"] in kinds
+        ]
+        return sorted(rows, key=lambda row: row["created_at"])
+
+    def _active(self, kind, key):
+        rows = [
+            row for row in self.rows.values()
+            if row["kind"] == kind and row["key"] == key
+            and row["status"] in ("queued", "running")
+        ]
+        return sorted(rows, key=lambda row: row["created_at"])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(store, "_utcnow", clock)
+    return clock
+
+
+def test_memory_store_prunes_finished_jobs_after_retention(clock):
+    jobs = JobStore(retention_seconds=60)
+    old = jobs.create("voice_profile", "old_handle")
+    jobs.update(old.id, status="failed", stage="failed")
+    running = jobs.create("voice_profile", "running_handle")
+    jobs.update(running.id, status="running")
+
+    clock.advance(30)
+    jobs.create("coach", "user")
+    assert jobs.get(old.id) is not None
+
+    clock.advance(31)
+    jobs.create("coach", "user")
+    assert jobs.get(old.id) is None
+    # Unfinished jobs are never pruned
+    assert jobs.find_active("voice_profile", "running_handle").id == running.id
+
+
+def test_memory_store_stamps_transitions(clock):
+    jobs = JobStore()
+    job = jobs.create("voice_profile", "handle", {"pillar": 2})
+    assert (job.status, job.stage, job.payload) == ("queued", "queued", {"pillar": 2})
+
+    clock.advance(1)
+    job = jobs.update(job.id, status="running", stage="crew")
+    assert job.started_at == clock.now and job.finished_at is None
+
+    clock.advance(1)
+    job = jobs.update(job.id, status="succeeded", stage="done", result={"ok": True})
+    assert job.finished_at == clock.now
+    assert jobs.find_active("voice_profile", "handle") is None
+
+
+def test_postgres_store_refuses_a_second_active_voice_profile(clock):
+    jobs = PostgresJobStore(db=FakeDatabase(clock))
+    job = jobs.create("voice_profile", "handle", {"x_handle": "handle"})
+    assert jobs.find_active("voice_profile", "handle") == job
+    with pytest.raises(JobConflict):
+        jobs.create("voice_profile", "handle")
+
+    # Other kinds may repeat a key, and a finished job frees it
+    jobs.create("coach", "handle")
+    jobs.create("coach", "handle")
+    jobs.update(job.id, status="failed", stage="failed", error="crew failed")
+    assert jobs.get(job.id).finished_at == clock.now
+    jobs.create("voice_profile", "handle")
+
+
+def test_postgres_claim_heartbeat_and_reap(clock):
+    jobs = PostgresJobStore(db=FakeDatabase(clock), retention_seconds=600)
+    first = jobs.create("voice_profile", "first")
+    clock.advance(1)
+    jobs.create("coach", "user")
+    clock.advance(1)
+    second = jobs.create("voice_profile", "second")
+    assert jobs.queue_depth(["voice_profile"]) == 2
+
+    # Oldest queued job of the requested kinds first
+    claimed = jobs.claim(["voice_profile"], "worker-a")
+    assert (claimed.id, claimed.status, claimed.stage) == (first.id, "running", "starting")
+    assert jobs.claim(["voice_profile"], "worker-b").id == second.id
+    assert jobs.claim(["voice_profile"], "worker-c") is None
+    assert jobs.queue_depth(["voice_profile", "coach"]) == 1
+
+    # worker-a keeps heartbeating, worker-b has gone quiet
+    clock.advance(50)
+    jobs.heartbeat("worker-a")
+    clock.advance(20)
+    jobs.reap(60)
+    assert jobs.get(first.id).status == "running"
+    reaped = jobs.get(second.id)
+    assert (reaped.status, reaped.error) == ("failed", "Worker stopped responding")
+
+    # Reaped jobs are purged once past retention
+    clock.advance(601)
+    jobs.heartbeat("worker-a")
+    jobs.reap(60)
+    assert jobs.get(second.id) is None
+    assert jobs.get(first.id).status == "running"
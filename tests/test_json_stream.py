@@ -0,0 +1,124 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from rooki_ai.utils.json_stream import RecordParser, iter_file_records
+
+RECORDS = [
+    {"id": "1", "text": "Shipping today \U0001F680"},
+    {"id": "2", "text": "caf\u00e9 na\u00efve \u2014 \u65e5\u672c\u8a9e", "likes": 12},
+    {"id": "3", "text": "", "score": 1.5e3},
+]
+
+
+def parse(body: bytes, chunk_size: int):
+    parser = RecordParser()
+    records = []
+    for start in range(0, len(body), chunk_size):
+        records.extend(parser.feed(body[start : start + chunk_size]))
+    records.extend(parser.close())
+    assert parser.records == len(records)
+    return records
+
+
+# Chunks of one byte split every multi-byte UTF-8 character
+CHUNK_SIZES = [1, 2, 3, 7, 64 * 1024]
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize(
+    "body",
+    [
+        json.dumps(RECORDS, ensure_ascii=False),
+        "\n".join(json.dumps(record, ensure_ascii=False) for record in RECORDS) + "\n",
+        "\n".join(json.dumps(record, ensure_ascii=False) for record in RECORDS),
+        "".join(json.dumps(record, ensure_ascii=False) for record in RECORDS),
+        json.dumps({"tweets": RECORDS, "next_token": "abc"}, ensure_ascii=False),
+        json.dumps({"meta": {"count": 3}, "tweets": RECORDS}, ensure_ascii=False),
+        "  \r\n" + json.dumps(RECORDS, indent=2, ensure_ascii=False) + "\n\n",
+    ],
+    ids=["array", "jsonl", "jsonl-no-final-newline", "concatenated", "wrapper", "wrapper-late-key", "indented"],
+)
+def test_layouts(body, chunk_size):
+    assert parse(body.encode("utf-8"), chunk_size) == RECORDS
+    # A byte order mark is dropped
+    assert parse(b"\xef\xbb\xbf" + body.encode("utf-8"), chunk_size) == RECORDS
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_trailing_numbers(chunk_size):
+    # A number split across chunks must not be cut short
+    assert parse(b"[1, 22, 333]", chunk_size) == [1, 22, 333]
+    assert parse(b"[4.5e10,\n-7]", chunk_size) == [4.5e10, -7]
+
+
+def test_jsonl_lists_are_flattened():
+    body = b'{"id": "1"}\n[{"id": "2"}, {"id": "3"}]\n{"tweets": [{"id": "4"}]}'
+    assert parse(body, 1) == [{"id": str(i)} for i in range(1, 5)]
+
+
+def test_unterminated_array():
+    with pytest.raises(ValueError, match="Unterminated"):
+        parse(b'[{"id": "1"}, {"id": "2"}', 5)
+
+
+def test_truncated_record():
+    with pytest.raises(json.JSONDecodeError):
+        parse(b'{"id": "1"}\n{"id": "2", "te', 4)
+
+
+def test_scalar_value():
+    with pytest.raises(ValueError, match="Unexpected data format"):
+        parse(b'{"id": "1"}\n42', 64)
+
+
+def test_empty_body():
+    assert parse(b"", 64) == []
+    assert parse(b"\xef\xbb\xbf \n", 1) == []
+
+
+def test_large_record_across_many_chunks():
+    record = {"id": "1", "text": "\u00e9" * 200_000}
+    assert parse(json.dumps([record, record], ensure_ascii=False).encode(), 1000) == [record, record]
+
+
+def test_iter_file_records(tmp_path):
+    path = tmp_path / "corpus.jsonl"
+    path.write_text("\n".join(json.dumps(record) for record in RECORDS))
+    assert list(iter_file_records(str(path), chunk_size=5)) == RECORDS
+
+
+PEAK_SCRIPT = """
+import resource, sys
+from rooki_ai.utils.json_stream import iter_file_records
+records = sum(1 for _ in iter_file_records(sys.argv[1]))
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(records, peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024)
+"""
+
+
+@pytest.mark.slow
+def test_streaming_peak_memory(tmp_path):
+    """Parsing a 200 MB corpus stays well under the size of the corpus."""
+    path = tmp_path / "corpus.jsonl"
+    line = json.dumps({"id": "1", "text": "Shipping the new onboarding flow today. " * 4}) + "\n"
+    count = 200 * 1024 * 1024 // len(line)
+    with open(path, "w") as f:
+        for _ in range(count // 1000):
+            f.write(line * 1000)
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    # A fresh interpreter, so the peak is the parse's alone
+    proc = subprocess.run(
+        [sys.executable, "-c", PEAK_SCRIPT, str(path)],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    records, peak_mb = proc.stdout.split()
+    assert int(records) == count // 1000 * 1000
+    assert float(peak_mb) < 96
@@ -0,0 +1,75 @@
+import types
+
+import pytest
+
+from rooki_ai.utils import message_history
+from rooki_ai.utils.message_history import MessageHistory
+
+
+def message(n, edited=None):
+    return {
+        "id": f"m{n}",
+        "text": f"message {n}" + (" (edited)" if edited else ""),
+        "created_at": f"2024-05-01T12:00:{n:02d}",
+        "edited_at": f"2024-05-01T12:00:{edited:02d}" if edited else None,
+    }
+
+
+def ids(messages):
+    return [m["id"] for m in messages]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        message_history, "time", types.SimpleNamespace(monotonic=lambda: clock.now)
+    )
+    return clock
+
+
+def test_merges_messages_after_the_high_water_mark(clock):
+    history = MessageHistory(max_users=8, ttl_seconds=60, limit=5)
+    seeded = history.update("u", None, [message(3), message(2), message(1)])
+    assert ids(seeded) == ["m3", "m2", "m1"]
+    high_water = history.high_water("u")
+    assert high_water == message(3)["created_at"]
+
+    # m2 was edited and m4, m5 arrived; the query's overlap window re-sends m3
+    changes = [message(5), message(4), message(2, edited=4), message(3)]
+    merged = history.update("u", high_water, changes)
+    assert ids(merged) == ["m5", "m4", "m3", "m2", "m1"]
+    assert merged[3]["text"] == "message 2 (edited)"
+    assert history.high_water("u") == message(5)["created_at"]
+
+    # The ring buffer keeps the newest `limit` messages
+    merged = history.update("u", history.high_water("u"), [message(7), message(6)])
+    assert ids(merged) == ["m7", "m6", "m5", "m4", "m3"]
+    assert history.stats()["updates"] == 2
+
+
+def test_late_commit_with_an_older_timestamp_keeps_order(clock):
+    history = MessageHistory(max_users=8, ttl_seconds=60, limit=4)
+    history.update("u", None, [message(5), message(3), message(1)])
+    merged = history.update("u", history.high_water("u"), [message(6), message(4)])
+    assert ids(merged) == ["m6", "m5", "m4", "m3"]
+
+
+def test_full_page_of_changes_reseeds(clock):
+    history = MessageHistory(max_users=8, ttl_seconds=60, limit=3)
+    history.update("u", None, [message(3), message(2), message(1)])
+    merged = history.update("u", history.high_water("u"), [message(9), message(8), message(7)])
+    assert ids(merged) == ["m9", "m8", "m7"]
+    assert history.stats()["seeds"] == 2
+
+
+def test_buffers_expire_and_least_recent_users_are_dropped(clock):
+    history = MessageHistory(max_users=2, ttl_seconds=60, limit=5)
+    for user_id in ("a", "b", "c"):
+        history.update(user_id, None, [message(1)])
+    assert history.high_water("a") is None
+    assert history.stats()["evictions"] == 1
+
+    clock.now += 61
+    assert history.high_water("b") is None
+    assert history.stats()["users"] == 1
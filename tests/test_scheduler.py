@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from rooki_ai.jobs.scheduler import (
+    CrewScheduler,
+    JobTimeout,
+    SchedulerSaturated,
+    SchedulerUnavailable,
+)
+
+
+def test_reserve_rejects_when_slots_and_queue_are_full():
+    crew_scheduler = CrewScheduler(max_concurrent=1, max_queued=1)
+    first = crew_scheduler.reserve()
+    assert not crew_scheduler.has_capacity()
+    crew_scheduler.reserve()
+
+    with pytest.raises(SchedulerSaturated) as error:
+        crew_scheduler.reserve("voice_profile")
+    assert error.value.status_code == 429
+    assert error.value.retry_after >= 1
+    assert "voice_profile" in error.value.detail
+
+    crew_scheduler.release(first)
+    crew_scheduler.release(first)
+    stats = crew_scheduler.stats()
+    assert (stats["queue_depth"], stats["admitted"], stats["rejected"]) == (1, 2, 1)
+    crew_scheduler.reserve()
+
+
+def test_queue_timeout_is_unavailable_and_frees_the_place():
+    crew_scheduler = CrewScheduler(max_concurrent=1, max_queued=1, queue_timeout=0.05)
+
+    async def scenario():
+        running = asyncio.ensure_future(crew_scheduler.submit("crew", asyncio.sleep, 0.3))
+        await asyncio.sleep(0)
+        with pytest.raises(SchedulerUnavailable) as error:
+            await crew_scheduler.submit("crew", asyncio.sleep, 0)
+        assert error.value.status_code == 503
+        assert crew_scheduler.stats()["queue_depth"] == 0
+        await running
+
+    asyncio.run(scenario())
+    stats = crew_scheduler.stats()
+    assert (stats["running"], stats["completed"], stats["rejected"]) == (0, 1, 1)
+
+
+def test_failed_job_releases_its_slot():
+    crew_scheduler = CrewScheduler(max_concurrent=1, max_queued=0)
+
+    def fail():
+        raise ValueError("crew failed")
+
+    async def scenario():
+        with pytest.raises(ValueError):
+            await crew_scheduler.submit("crew", fail)
+        assert crew_scheduler.has_capacity()
+        return await crew_scheduler.submit("crew", lambda: "ok")
+
+    assert asyncio.run(scenario()) == "ok"
+    stats = crew_scheduler.stats()
+    assert (stats["running"], stats["failed"], stats["completed"]) == (0, 1, 1)
+
+
+def test_timed_out_coroutine_is_cancelled_and_frees_its_slot():
+    crew_scheduler = CrewScheduler(max_concurrent=1, max_queued=0, timeout=0.05)
+
+    async def scenario():
+        with pytest.raises(JobTimeout):
+            await crew_scheduler.submit("crew", asyncio.sleep, 1)
+        # Let the cancellation and its done-callback run
+        await asyncio.sleep(0.01)
+        assert crew_scheduler.has_capacity()
+
+    asyncio.run(scenario())
+    stats = crew_scheduler.stats()
+    assert (stats["running"], stats["failed"], stats["timeouts"]) == (0, 1, 1)
+
+
+def test_closed_scheduler_refuses_new_jobs():
+    crew_scheduler = CrewScheduler(max_concurrent=1, max_queued=0)
+    crew_scheduler.close()
+    assert not crew_scheduler.has_capacity()
+    with pytest.raises(SchedulerUnavailable):
+        crew_scheduler.reserve()
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from rooki_ai.jobs.singleflight import SingleFlight
+
+
+def test_joiners_share_the_launched_task():
+    flights = SingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def scenario():
+        assert flights.join("key") is None
+        task = flights.launch("key", work(), context="job-1")
+        assert flights.join("key") == (task, "job-1")
+        assert len(flights) == 1
+
+        with pytest.raises(RuntimeError):
+            flights.launch("key", work())
+
+        results = await asyncio.gather(task, flights.join("key")[0])
+        # The key is freed once the task is done, so the next call runs afresh
+        await asyncio.sleep(0)
+        assert flights.join("key") is None
+        return results
+
+    assert asyncio.run(scenario()) == ["done", "done"]
+    assert len(runs) == 1
+
+
+def test_failed_flight_frees_its_key():
+    flights = SingleFlight()
+
+    async def fail():
+        raise ValueError("crew failed")
+
+    async def scenario():
+        task = flights.launch("key", fail())
+        with pytest.raises(ValueError):
+            await task
+        await asyncio.sleep(0)
+        assert len(flights) == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,22 @@
+import pytest
+
+from rooki_ai.utils.style_metrics import TextStats, analyze_text
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Shipping the new onboarding flow today.", TextStats(1, 6, 0, 0)),
+        ("Stop guessing and measure it", TextStats(1, 5, 1, 0)),
+        ("v3.5 is live\u2026 finally", TextStats(2, 4, 0, 0)),
+        ("Stop!https://x.co/a go", TextStats(1, 2, 1, 0)),
+        # A link ending a sentence leaves its punctuation to the sentence
+        ("Read it at https://x.co/a. Join us.", TextStats(2, 5, 2, 0)),
+        ("Read it (https://x.co/a). Join us.", TextStats(2, 4, 2, 0)),
+        ("See www.rooki.ai/docs! Then ship it.", TextStats(2, 4, 1, 0)),
+        ("Thoughts? https://x.co/a, reply below.", TextStats(2, 3, 1, 0)),
+        ("Love this \u2764\ufe0f #buildinpublic", TextStats(1, 3, 0, 1)),
+    ],
+)
+def test_analyze_text(text, expected):
+    assert analyze_text(text) == expected
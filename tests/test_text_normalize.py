@@ -0,0 +1,78 @@
+import pytest
+
+from rooki_ai.models.tweet import Tweet
+from rooki_ai.utils.text_normalize import normalize_text, normalize_tweets
+
+FAMILY = "\U0001F468\u200d\U0001F469\u200d\U0001F467"
+DEV = "\U0001F469\U0001F3FD\u200d\U0001F4BB"
+THUMBS = "\U0001F44D\U0001F3FD"
+FLAG = "\U0001F1FA\U0001F1F8"
+HEART = "\u2764\ufe0f"
+KEYCAP = "1\ufe0f\u20e3"
+
+# (text, normalize_text keyword arguments, expected)
+CASES = [
+    ("Shipping  today\t\tfor real", {}, "Shipping today for real"),
+    ("  lead and trail  ", {}, "lead and trail"),
+    ("a\u00a0\u00a0b\u3000c", {}, "a b c"),
+    ("line1\n\n\nline2", {}, "line1\nline2"),
+    ("a \r\n b", {}, "a\nb"),
+    ("a\u2028b", {}, "a\nb"),
+    ("see https://t.co/abc now", {}, "see now"),
+    ("see https://t.co/abc", {}, "see"),
+    ("https://t.co/abc", {}, ""),
+    ("line1\nhttps://t.co/x more", {}, "line1\nmore"),
+    ("Docs at www.rooki.ai/docs today", {}, "Docs at today"),
+    ("Out now https://t.co/x !", {}, "Out now!"),
+    # A URL leaves the punctuation after it
+    ("see https://t.co/x.", {}, "see."),
+    ("see www.x.com.", {}, "see."),
+    ("(https://t.co/x)", {}, "()"),
+    ("Read it at https://x.co/a. Join us.", {}, "Read it at. Join us."),
+    ("Thoughts? https://x.co/a, reply below", {}, "Thoughts?, reply below"),
+    ("he\u200bllo\ufeff w\u2060orld", {}, "hello world"),
+    ("x \u200b y", {}, "x y"),
+    (f"Family {FAMILY}  trip", {}, f"Family {FAMILY} trip"),
+    (f"{FAMILY}{FAMILY}", {}, f"{FAMILY}{FAMILY}"),
+    (f"{DEV} ships", {}, f"{DEV} ships"),
+    (f"nice {THUMBS}\U0001F44D\U0001F3FF!", {}, f"nice {THUMBS}\U0001F44D\U0001F3FF!"),
+    (f"{FAMILY} https://t.co/x {THUMBS}", {}, f"{FAMILY} {THUMBS}"),
+    (f"{FLAG} {HEART} {KEYCAP}", {}, f"{FLAG} {HEART} {KEYCAP}"),
+    ("caf\u00e9  nai\u0308ve", {}, "caf\u00e9 nai\u0308ve"),
+    ("#buildinpublic  $BTC #\U0001F680", {}, "#buildinpublic $BTC #\U0001F680"),
+    ("Q&amp;A &lt;3 &gt;", {}, "Q&A <3 >"),
+    ("thanks @rooki and @dev!", {}, "thanks @rooki and @dev!"),
+    ("thanks @rooki and @dev!", {"mentions": "mask"}, "thanks @user and @user!"),
+    ("thanks @rooki and @dev!", {"mentions": "drop"}, "thanks and!"),
+    ("mail me@rooki.ai", {"mentions": "drop"}, "mail me@rooki.ai"),
+    ("@a @b_c  thanks @d", {"reply": True}, "thanks @d"),
+    ("@a @b thanks @d", {"reply": True, "mentions": "mask"}, "thanks @user"),
+    ("@a @b", {"reply": True}, ""),
+    ("@rooki is great", {}, "@rooki is great"),
+]
+
+
+@pytest.mark.parametrize("text, kwargs, expected", CASES)
+def test_normalize_text(text, kwargs, expected):
+    assert normalize_text(text, **kwargs) == expected
+
+
+def test_normalize_text_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        normalize_text("hi", mentions="hide")
+
+
+def test_normalize_tweets():
+    tweets = [
+        Tweet("1", "Out now  https://t.co/x", "post", ""),
+        Tweet("2", "@a @b thanks @c!", "reply", ""),
+        Tweet("3", "https://t.co/x", "quote", ""),
+        Tweet("4", "@a @b thanks @c!", "post", ""),
+    ]
+    normalized = list(normalize_tweets(tweets, mentions="mask"))
+    assert [(tweet.id, tweet.text) for tweet in normalized] == [
+        ("1", "Out now"),
+        ("2", "thanks @user!"),
+        ("4", "@user @user thanks @user!"),
+    ]
+    assert normalized[1].type == "reply"
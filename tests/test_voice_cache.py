@@ -0,0 +1,112 @@
+import asyncio
+import types
+
+import pytest
+
+from rooki_ai.utils import voice_cache
+from rooki_ai.utils.voice_cache import VOICE_BY_HANDLE_QUERY, VoiceCache
+
+
+class FakeDatabase:
+    """Voice rows by handle and user, counting the queries that reach it."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+        self.during_query = None
+
+    def fetchrow_sync(self, query, value):
+        self.queries += 1
+        row = None
+        for candidate in self.rows:
+            field = "x_handle" if query == VOICE_BY_HANDLE_QUERY else "userId"
+            if candidate[field] == value:
+                row = dict(candidate)
+        if self.during_query is not None:
+            self.during_query()
+        return row
+
+    async def fetchrow(self, query, value):
+        await asyncio.sleep(0)
+        return self.fetchrow_sync(query, value)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(voice_cache, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def voice(x_handle, user_id="user", tone="direct"):
+    return {"x_handle": x_handle, "userId": user_id, "tone": tone}
+
+
+def test_entries_expire_after_ttl(clock):
+    db = FakeDatabase([voice("alice")])
+    cache = VoiceCache(ttl_seconds=10, max_size=8, db=db)
+
+    assert cache.get_by_handle("alice") == voice("alice")
+    clock.now += 10
+    assert cache.get_by_handle("alice") == voice("alice")
+    assert db.queries == 1
+
+    clock.now += 1
+    cache.get_by_handle("alice")
+    assert db.queries == 2
+    assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    db = FakeDatabase([voice("a"), voice("b"), voice("c")])
+    cache = VoiceCache(ttl_seconds=60, max_size=2, db=db)
+
+    cache.get_by_handle("a")
+    cache.get_by_handle("b")
+    cache.get_by_handle("a")
+    cache.get_by_handle("c")
+    assert db.queries == 3
+
+    cache.get_by_handle("a")
+    assert db.queries == 3
+    cache.get_by_handle("b")
+    assert db.queries == 4
+    assert cache.stats()["evictions"] == 2
+
+
+def test_misses_are_not_cached_and_rows_are_copies(clock):
+    db = FakeDatabase([])
+    cache = VoiceCache(ttl_seconds=60, max_size=8, db=db)
+    assert cache.get_by_handle("new") is None
+    db.rows.append(voice("new"))
+    row = cache.get_by_handle("new")
+    row["tone"] = "changed"
+    assert cache.get_by_handle("new") == voice("new")
+
+
+def test_invalidate_drops_user_and_handle_entries(clock):
+    db = FakeDatabase([voice("alice", user_id="u1")])
+    cache = VoiceCache(ttl_seconds=60, max_size=8, db=db)
+    cache.get_by_user("u1")
+    cache.get_by_handle("alice")
+
+    db.rows[0]["tone"] = "playful"
+    cache.invalidate(["alice"])
+    assert cache.get_by_user("u1")["tone"] == "playful"
+    assert cache.get_by_handle("alice")["tone"] == "playful"
+    assert db.queries == 4
+
+
+def test_invalidation_during_a_load_is_not_undone(clock):
+    db = FakeDatabase([voice("alice")])
+    cache = VoiceCache(ttl_seconds=60, max_size=8, db=db)
+
+    # A write lands after the row was read but before it is cached
+    db.during_query = lambda: cache.invalidate(["alice"])
+    assert cache.get_by_handle("alice") == voice("alice")
+    assert asyncio.run(cache.get_by_handle_async("alice")) == voice("alice")
+    db.during_query = None
+
+    db.rows[0]["tone"] = "playful"
+    assert cache.get_by_handle("alice")["tone"] == "playful"
+    assert cache.stats()["size"] == 1